@@ -0,0 +1,165 @@
+import asyncio
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+
+from backend.brain.llm_cache import LLMCache, cache_key
+from backend.brain.llm_client import parse_json_response
+
+# Async Ollama client for the request path.
+# - One pooled httpx.AsyncClient (keep-alive connections to the Ollama endpoint)
+# - Connect / read timeouts, and retries with backoff on transport errors and 5xx
+# - A semaphore caps concurrent upstream calls so a burst can't queue up the GPU box
+# - Identical in-flight prompts are coalesced: later callers await the first call
+# - stream() yields tokens as Ollama produces them (NDJSON from /api/chat)
+# Like LLMClient, failures are logged and return "" (or {} from generate_json).
+
+DEFAULT_HOST = "http://localhost:11434"
+DEFAULT_TIMEOUT = 60.0 # Seconds to wait for the model; generation can be slow
+CONNECT_TIMEOUT = 5.0
+MAX_CONCURRENCY = 4
+MAX_CONNECTIONS = 8
+RETRIES = 1
+BACKOFF = 0.25 # Seconds, doubled per retry
+
+class AsyncLLMClient:
+    def __init__(self, model: str = "llama3", host: str = DEFAULT_HOST, timeout: float = DEFAULT_TIMEOUT,
+                 connect_timeout: float = CONNECT_TIMEOUT, max_concurrency: int = MAX_CONCURRENCY,
+                 max_connections: int = MAX_CONNECTIONS, retries: int = RETRIES, cache: Optional[LLMCache] = None):
+        self.model = model
+        self.host = host
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self.max_concurrency = max_concurrency
+        self.retries = retries
+        self.cache = cache
+        self._client: Optional[httpx.AsyncClient] = None # Created on first use, inside the running loop
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.requests = 0 # Upstream calls made
+        self.coalesced = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.retried = 0
+        self.active = 0
+
+    def _http(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(base_url=self.host, timeout=self.timeout, limits=self.limits)
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _messages(self, prompt: str, system: str) -> List[Dict[str, str]]:
+        return [{'role': 'system', 'content': system}, {'role': 'user', 'content': prompt}]
+
+    async def generate(self, prompt: str, system: str = "", cache_reply: bool = True) -> str:
+        if self.cache:
+            cached = self.cache.get(self.model, system, prompt)
+            if cached is not None:
+                return cached
+        key = cache_key(self.model, system, prompt)
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.coalesced += 1
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        content = ""
+        try:
+            content = await self._chat(self._messages(prompt, system))
+            if self.cache and cache_reply:
+                self.cache.put(self.model, system, prompt, content)
+        except httpx.TimeoutException as e:
+            self.timeouts += 1
+            print(f"LLM Generate Timeout: {e!r}")
+        except Exception as e:
+            self.errors += 1
+            print(f"LLM Generate Error: {e}")
+        finally:
+            del self._inflight[key]
+            future.set_result(content)
+        return content
+
+    async def generate_json(self, prompt: str, schema: Dict[str, Any], system: str = "") -> Dict[str, Any]:
+        """Same contract as LLMClient.generate_json."""
+        system_prompt = f"{system}\nYou MUST output valid JSON only. No markdown formatting."
+        response = await self.generate(prompt, system_prompt, cache_reply=False)
+        parsed = parse_json_response(response)
+        if self.cache and parsed:
+            # Only replies that parse: a malformed one would otherwise be served until its TTL
+            self.cache.put(self.model, system_prompt, prompt, response)
+        return parsed
+
+    async def stream(self, prompt: str, system: str = "") -> AsyncIterator[str]:
+        """Yields the response token by token (not cached or coalesced: each caller gets its own stream)."""
+        client = self._http()
+        payload = {"model": self.model, "messages": self._messages(prompt, system), "stream": True}
+        try:
+            async with self._semaphore:
+                self.requests += 1
+                self.active += 1
+                try:
+                    async with client.stream("POST", "/api/chat", json=payload) as response:
+                        response.raise_for_status()
+                        async for line in response.aiter_lines():
+                            if not line.strip():
+                                continue
+                            chunk = json.loads(line)
+                            token = chunk.get("message", {}).get("content", "")
+                            if token:
+                                yield token
+                            if chunk.get("done"):
+                                break
+                finally:
+                    self.active -= 1
+        except httpx.TimeoutException as e:
+            self.timeouts += 1
+            print(f"LLM Stream Timeout: {e!r}")
+        except httpx.HTTPError as e:
+            self.errors += 1
+            print(f"LLM Stream Error: {e}")
+
+    async def _chat(self, messages: List[Dict[str, str]]) -> str:
+        client = self._http()
+        payload = {"model": self.model, "messages": messages, "stream": False}
+        delay = BACKOFF
+        for attempt in range(self.retries + 1):
+            try:
+                async with self._semaphore:
+                    self.requests += 1
+                    self.active += 1
+                    try:
+                        response = await client.post("/api/chat", json=payload)
+                    finally:
+                        self.active -= 1
+                if response.status_code < 500 or attempt == self.retries:
+                    response.raise_for_status()
+                    return response.json()['message']['content']
+            except httpx.TransportError as e:
+                # Timeouts are TransportErrors too: retried like a dropped connection
+                if attempt == self.retries:
+                    raise
+                print(f"LLM request failed ({e!r}), retrying")
+            self.retried += 1
+            await asyncio.sleep(delay)
+            delay *= 2
+        return ""
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._inflight),
+            "active": self.active,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "retries": self.retried,
+            "max_concurrency": self.max_concurrency,
+        }
@@ -0,0 +1,147 @@
+import difflib
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from backend.engine.abilities import DB
+
+# Rule-based intent parser that runs ahead of the LLM.
+# Common commands - "move to 2, 2", "attack E1", "hit the bear", "cast focused
+# blast on the bear", "say surrender!" - are resolved locally in microseconds with
+# fuzzy matching of entity names / ids and ability names (the actor's known skills
+# first, then the whole AbilityDatabase). Every intent carries a confidence;
+# ParserAgent only asks the LLM when it is below its threshold or nothing matched.
+# Rules match the whole utterance, and anything negated ("don't attack the bear") or
+# holding more than one order ("hit the bear then move to 3, 3") is left to the LLM.
+# Intents use the LLM parser's format: {"action": ..., "params": {...}}.
+
+FUZZY_CUTOFF = 0.6 # Weakest difflib ratio still considered a name match
+AMBIGUITY_MARGIN = 0.05 # Two candidates this close: don't guess
+
+_FILLER = re.compile(r"\b(please|i want to|i'd like to|i will|i'll|let's|lets|can you|try to|now)\b")
+_NEGATION = re.compile(r"\b(?:don't|dont|do not|won't|wont|will not|can't|cant|cannot|not|never|no|stop)\b")
+# Clause breaks: ; / a comma not inside coordinates / joining words
+_CLAUSES = re.compile(r";|,(?!\s*-?\d)|\b(?:then|and|after|before|while|afterwards)\b")
+_SPEAK = re.compile(r"^(?:say|shout|yell|whisper|tell \w+)\s*[:,]?\s+(?P<text>.+)$")
+_MOVE = re.compile(r"^(?:move|go|walk|run|step|head)(?:\s+(?:to|towards|toward))?\s*\(?\s*(?P<x>-?\d+)\s*[,\s]\s*(?P<y>-?\d+)\s*\)?$")
+_ATTACK = re.compile(r"^(?:attack|hit|strike|stab|slash|punch|smash|kill|fight)(?:\s+(?P<target>.+))?$")
+_USE = re.compile(r"^(?:use|cast|activate)\s+(?P<ability>.+?)(?:\s+(?:on|at|against)\s+(?P<target>.+))?$")
+_ARTICLES = re.compile(r"^(?:the|a|an|that|this)\s+")
+
+def normalize(text: str) -> str:
+    text = text.casefold().strip()
+    text = _FILLER.sub(" ", text)
+    text = re.sub(r"[^\w\s,\-()'\":!?]", " ", text)
+    return re.sub(r"\s+", " ", text).strip(" .!?")
+
+def _name(text: str) -> str:
+    return _ARTICLES.sub("", text.strip(" \"'.,!?")).replace("_", " ")
+
+def _score(query: str, names: Tuple[str, ...]) -> float:
+    """How well a query names something (1.0 exact, 0.9 whole words of it, else fuzzy)."""
+    best = 0.0
+    words = set(query.split())
+    for name in names:
+        if query == name:
+            return 1.0
+        if words and words <= set(name.split()):
+            best = max(best, 0.9)
+        else:
+            best = max(best, difflib.SequenceMatcher(None, query, name).ratio())
+    return best
+
+def _pick(query: str, candidates: List[Tuple[Any, Tuple[str, ...]]]) -> Tuple[Optional[Any], float]:
+    """Best candidate and its confidence (halved if another one scores about the same)."""
+    scored = sorted(((_score(query, names), i) for i, (_, names) in enumerate(candidates)), reverse=True)
+    if not scored or scored[0][0] < FUZZY_CUTOFF:
+        return None, 0.0
+    best, i = scored[0]
+    if len(scored) > 1 and scored[1][0] >= FUZZY_CUTOFF and best - scored[1][0] < AMBIGUITY_MARGIN:
+        return candidates[i][0], best * 0.5
+    return candidates[i][0], best
+
+class FastParser:
+    def __init__(self):
+        self._by_name: Dict[str, str] = {} # Every ability name / spelled-out id -> id, per DB.version
+        self._version: Optional[int] = None
+
+    def parse(self, text: str, actor: Any, visible: List[Any]) -> Optional[Dict[str, Any]]:
+        """Intent with a "confidence" in [0, 1], or None if no rule applies."""
+        raw = text.strip()
+        said = _SPEAK.match(raw.casefold())
+        if said:
+            return self._intent("Speak", {"text": raw[len(raw) - len(said.group("text")):].strip()}, 1.0)
+
+        cmd = normalize(raw)
+        if _NEGATION.search(cmd) or _CLAUSES.search(cmd):
+            return None # Negated or several orders: the LLM reads these
+        move = _MOVE.match(cmd)
+        if move:
+            return self._intent("Move", {"target_pos": [int(move.group("x")), int(move.group("y"))]}, 1.0)
+
+        use = _USE.match(cmd)
+        if use:
+            return self._ability(_name(use.group("ability")), use.group("target"), actor, visible)
+
+        # "<ability> on <target>" without a verb (before attack verbs: "concussive strike on the bear")
+        bare = re.match(r"^(?P<ability>.+?)\s+(?:on|at)\s+(?P<target>.+)$", cmd)
+        if bare:
+            intent = self._ability(_name(bare.group("ability")), bare.group("target"), actor, visible)
+            if intent:
+                intent["confidence"] = round(intent["confidence"] * 0.9, 3)
+                return intent
+
+        attack = _ATTACK.match(cmd)
+        if attack:
+            target, confidence = self._target(attack.group("target"), actor, visible)
+            if target is None:
+                return None
+            return self._intent("Attack", {"target_id": target.id}, confidence)
+        return None
+
+    def _ability(self, query: str, target_text: Optional[str], actor: Any, visible: List[Any]) -> Optional[Dict[str, Any]]:
+        known = [(sid, self._ability_names(sid)) for sid in actor.known_skills if DB.get(sid)]
+        ability_id, confidence = _pick(query, known)
+        if ability_id is None:
+            # Not one of the actor's skills: still name it, the server rejects what can't be cast
+            ability_id, confidence = self._lookup_ability(query)
+            confidence *= 0.8
+        if ability_id is None:
+            return None
+        target, target_confidence = self._target(target_text, actor, visible)
+        if target is None:
+            return None
+        return self._intent("UseAbility", {"name": DB.get(ability_id).name, "ability_id": ability_id,
+                                           "target_id": target.id}, min(confidence, target_confidence))
+
+    def _target(self, text: Optional[str], actor: Any, visible: List[Any]) -> Tuple[Optional[Any], float]:
+        others = [e for e in visible if e.id != actor.id and e.hp > 0]
+        if not text or _name(text) in ("", "it", "him", "her", "them", "enemy", "the enemy"):
+            hostiles = [e for e in others if e.team != actor.team]
+            return (hostiles[0], 1.0) if len(hostiles) == 1 else (None, 0.0)
+        candidates = [(e, (e.id.casefold(), e.name.casefold())) for e in others]
+        return _pick(_name(text), candidates)
+
+    def _ability_names(self, ability_id: str) -> Tuple[str, ...]:
+        return (ability_id.replace("_", " ").replace("  ", " ").strip(), DB.get(ability_id).name.casefold())
+
+    def _lookup_ability(self, query: str) -> Tuple[Optional[str], float]:
+        """Any ability in the database by name: exact lookup, then difflib's prefiltered close matches."""
+        if self._version != DB.version:
+            self._by_name = {}
+            for sid in DB.skills:
+                for name in self._ability_names(sid):
+                    self._by_name.setdefault(name, sid)
+            self._version = DB.version
+        if query in self._by_name:
+            return self._by_name[query], 1.0
+        matches = difflib.get_close_matches(query, self._by_name, n=2, cutoff=FUZZY_CUTOFF)
+        if not matches:
+            return None, 0.0
+        ratios = [difflib.SequenceMatcher(None, query, m).ratio() for m in matches]
+        ids = [self._by_name[m] for m in matches]
+        if len(ids) > 1 and ids[1] != ids[0] and ratios[0] - ratios[1] < AMBIGUITY_MARGIN:
+            return ids[0], ratios[0] * 0.5
+        return ids[0], ratios[0]
+
+    def _intent(self, action: str, params: Dict[str, Any], confidence: float) -> Dict[str, Any]:
+        return {"action": action, "params": params, "confidence": round(confidence, 3)}
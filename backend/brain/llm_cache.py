@@ -0,0 +1,180 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from backend.engine.ability_index import CACHE_DIR_ENV, REPO_ROOT
+
+# Prompt/response cache for the LLM brain.
+# Keyed by (model, system prompt, normalized prompt): whitespace runs collapse and case
+# folds, so "Attack  the Bear" and "attack the bear" against the same battle context
+# share an answer. Two tiers:
+#   memory - LRU of the hottest entries, answers in microseconds
+#   disk   - SQLite file under backend/cache (SHATTERED_CACHE_DIR), survives restarts
+# Every entry has a TTL; expired entries are dropped on read and pruned from disk
+# periodically. Empty responses (Ollama errors) are never stored, and the clients'
+# generate_json only stores replies that parsed as JSON.
+
+MEMORY_SIZE = 512
+DISK_SIZE = 20000
+DEFAULT_TTL = 24 * 3600.0
+PRUNE_EVERY = 100 # Stores between disk prunes
+
+CACHE_ENV = "SHATTERED_LLM_CACHE" # 0 disables the cache
+TTL_ENV = "SHATTERED_LLM_CACHE_TTL"
+
+def default_cache_path() -> str:
+    cache_dir = os.environ.get(CACHE_DIR_ENV) or os.path.join(REPO_ROOT, "backend", "cache")
+    return os.path.join(cache_dir, "llm_cache.sqlite")
+
+def normalize_prompt(text: str) -> str:
+    return re.sub(r"\s+", " ", text).strip().casefold()
+
+def cache_key(model: str, system: str, prompt: str) -> str:
+    payload = json.dumps([model, normalize_prompt(system), normalize_prompt(prompt)])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class LLMCache:
+    def __init__(self, path: Optional[str] = None, ttl: float = DEFAULT_TTL, memory_size: int = MEMORY_SIZE,
+                 disk_size: int = DISK_SIZE, clock: Callable[[], float] = time.time):
+        self.ttl = ttl
+        self.memory_size = memory_size
+        self.disk_size = disk_size
+        self.clock = clock
+        self._memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict() # key -> (response, expires)
+        self._lock = threading.Lock()
+        self.path = path
+        self._db: Optional[sqlite3.Connection] = None
+        self.hits_memory = 0
+        self.hits_disk = 0
+        self.misses = 0
+        self.expired = 0
+        self.stores = 0
+        self.evictions = 0
+        if path:
+            self._open(path)
+
+    @classmethod
+    def from_env(cls) -> Optional['LLMCache']:
+        if os.environ.get(CACHE_ENV, "1") == "0":
+            return None
+        return cls(default_cache_path(), ttl=float(os.environ.get(TTL_ENV, DEFAULT_TTL)))
+
+    def _open(self, path: str):
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            db = sqlite3.connect(path, check_same_thread=False) # Guarded by self._lock
+            db.execute("CREATE TABLE IF NOT EXISTS llm_cache (key TEXT PRIMARY KEY, model TEXT, response TEXT, "
+                       "created REAL, expires REAL)")
+            db.execute("CREATE INDEX IF NOT EXISTS llm_cache_expires ON llm_cache (expires)")
+            db.commit()
+            self._db = db
+            self._prune()
+        except sqlite3.Error as e:
+            print(f"[LLMCache] Disk tier disabled, could not open {path}: {e}")
+            self._db = None
+
+    def get(self, model: str, system: str, prompt: str) -> Optional[str]:
+        key = cache_key(model, system, prompt)
+        now = self.clock()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[1] > now:
+                    self._memory.move_to_end(key)
+                    self.hits_memory += 1
+                    return entry[0]
+                del self._memory[key]
+                self.expired += 1
+            if self._db is not None:
+                try:
+                    row = self._db.execute("SELECT response, expires FROM llm_cache WHERE key = ?", (key,)).fetchone()
+                    if row is not None and row[1] > now:
+                        self._remember(key, row[0], row[1])
+                        self.hits_disk += 1
+                        return row[0]
+                    if row is not None:
+                        self._db.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                        self._db.commit()
+                        self.expired += 1
+                except sqlite3.Error as e:
+                    print(f"[LLMCache] Disk read failed: {e}")
+            self.misses += 1
+            return None
+
+    def put(self, model: str, system: str, prompt: str, response: str, ttl: Optional[float] = None):
+        if not response:
+            return
+        key = cache_key(model, system, prompt)
+        now = self.clock()
+        expires = now + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._remember(key, response, expires)
+            self.stores += 1
+            if self._db is not None:
+                try:
+                    self._db.execute("INSERT OR REPLACE INTO llm_cache VALUES (?, ?, ?, ?, ?)",
+                                     (key, model, response, now, expires))
+                    self._db.commit()
+                    if self.stores % PRUNE_EVERY == 0:
+                        self._prune()
+                except sqlite3.Error as e:
+                    print(f"[LLMCache] Disk write failed: {e}")
+
+    def _remember(self, key: str, response: str, expires: float):
+        # Caller holds the lock
+        self._memory[key] = (response, expires)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def _prune(self):
+        """Drops expired rows, then the oldest ones past disk_size."""
+        self._db.execute("DELETE FROM llm_cache WHERE expires <= ?", (self.clock(),))
+        self._db.execute("DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache ORDER BY created DESC "
+                         "LIMIT -1 OFFSET ?)", (self.disk_size,))
+        self._db.commit()
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM llm_cache")
+                self._db.commit()
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = self.hits_memory + self.hits_disk
+            lookups = hits + self.misses
+            disk_rows = None
+            if self._db is not None:
+                try:
+                    disk_rows = self._db.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+                except sqlite3.Error:
+                    pass
+            return {
+                "hits": hits,
+                "hits_memory": self.hits_memory,
+                "hits_disk": self.hits_disk,
+                "misses": self.misses,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "expired": self.expired,
+                "stores": self.stores,
+                "evictions": self.evictions,
+                "memory_size": len(self._memory),
+                "disk_size": disk_rows,
+                "ttl": self.ttl,
+                "path": self.path,
+            }
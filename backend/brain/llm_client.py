@@ -2,11 +2,24 @@ import ollama
 from typing import List, Dict, Any, Optional
 import json
 
+from backend.brain.llm_cache import LLMCache
+
+def parse_json_response(response: str) -> Dict[str, Any]:
+    """The model's reply as JSON (markdown fences stripped); {} if it isn't JSON."""
+    clean_response = response.replace("```json", "").replace("```", "").strip()
+    try:
+        return json.loads(clean_response)
+    except json.JSONDecodeError:
+        print(f"JSON Parse Error. Raw: {clean_response}")
+        return {}
+
 class LLMClient:
-    def __init__(self, model="llama3"):
+    def __init__(self, model="llama3", cache: Optional[LLMCache] = None, timeout: float = 60.0):
         self.model = model
         self.host = "http://localhost:11434"
-        self.client = ollama.Client(host=self.host)
+        self.client = ollama.Client(host=self.host, timeout=timeout)
+        # Repeated (model, system, prompt) calls are answered from here instead of Ollama
+        self.cache = cache
         
     def check_connection(self) -> bool:
         try:
@@ -17,13 +30,21 @@ class LLMClient:
             print(f"Ollama Connection Failed: {e}")
             return False
 
-    def generate(self, prompt: str, system: str = "") -> str:
+    def generate(self, prompt: str, system: str = "", cache_reply: bool = True) -> str:
+        """`cache_reply=False` leaves storing to the caller (generate_json only keeps replies that parse)."""
+        if self.cache:
+            cached = self.cache.get(self.model, system, prompt)
+            if cached is not None:
+                return cached
         try:
             response = self.client.chat(model=self.model, messages=[
                 {'role': 'system', 'content': system},
                 {'role': 'user', 'content': prompt},
             ])
-            return response['message']['content']
+            content = response['message']['content']
+            if self.cache and cache_reply:
+                self.cache.put(self.model, system, prompt, content)
+            return content
         except Exception as e:
             print(f"LLM Generate Error: {e}")
             return ""
@@ -32,13 +53,8 @@ class LLMClient:
         """Forces JSON output conforming to schema (if possible) or just parsing JSON."""
         system_prompt = f"{system}\nYou MUST output valid JSON only. No markdown formatting."
         
-        response = self.generate(prompt, system_prompt)
-        
-        # Cleanup
-        clean_response = response.replace("```json", "").replace("```", "").strip()
-        
-        try:
-            return json.loads(clean_response)
-        except json.JSONDecodeError:
-            print(f"JSON Parse Error. Raw: {clean_response}")
-            return {}
+        response = self.generate(prompt, system_prompt, cache_reply=False)
+        parsed = parse_json_response(response)
+        if self.cache and parsed:
+            self.cache.put(self.model, system_prompt, prompt, response)
+        return parsed
@@ -1,15 +1,59 @@
-from typing import Dict, Any, List
+import time
+from typing import Dict, Any, List, Optional, Tuple
+from backend.brain.async_llm_client import AsyncLLMClient
+from backend.brain.fast_parser import FastParser
 from backend.brain.llm_client import LLMClient
+from backend.engine.ai_trace import TimingHistogram
 from backend.engine.turn_manager import EntityState
 
+FAST_CONFIDENCE = 0.75 # Fast-path intents below this go to the LLM
+
 class ParserAgent:
-    def __init__(self, llm: LLMClient):
+    def __init__(self, llm: LLMClient, fast: Optional[FastParser] = None, min_confidence: float = FAST_CONFIDENCE,
+                 async_llm: Optional[AsyncLLMClient] = None):
         self.llm = llm
+        self.async_llm = async_llm # Used by aparse_command (request path); falls back to `llm`
+        # Rule-based parser tried first; the LLM only sees what it can't resolve confidently
+        self.fast = fast or FastParser()
+        self.min_confidence = min_confidence
+        self.latency: Dict[str, TimingHistogram] = {"fast": TimingHistogram(), "llm": TimingHistogram()}
 
     def parse_command(self, text: str, actor: EntityState, visible_entities: List[EntityState]) -> Dict[str, Any]:
         """
         Parses text input into a structured Intent.
         """
+        start = time.perf_counter()
+        intent = self.fast.parse(text, actor, visible_entities)
+        if intent and intent["confidence"] >= self.min_confidence:
+            self.latency["fast"].observe((time.perf_counter() - start) * 1000)
+            intent["source"] = "fast"
+            return intent
+
+        context, system = self._prompt(text, actor, visible_entities)
+        intent = self.llm.generate_json(context, {}, system)
+        # Includes the failed fast attempt: this is what a fallback costs the caller
+        self.latency["llm"].observe((time.perf_counter() - start) * 1000)
+        intent["source"] = "llm"
+        return intent
+
+    async def aparse_command(self, text: str, actor: EntityState, visible_entities: List[EntityState]) -> Dict[str, Any]:
+        """parse_command without blocking the event loop on the LLM."""
+        if self.async_llm is None:
+            return self.parse_command(text, actor, visible_entities)
+        start = time.perf_counter()
+        intent = self.fast.parse(text, actor, visible_entities)
+        if intent and intent["confidence"] >= self.min_confidence:
+            self.latency["fast"].observe((time.perf_counter() - start) * 1000)
+            intent["source"] = "fast"
+            return intent
+
+        context, system = self._prompt(text, actor, visible_entities)
+        intent = await self.async_llm.generate_json(context, {}, system)
+        self.latency["llm"].observe((time.perf_counter() - start) * 1000)
+        intent["source"] = "llm"
+        return intent
+
+    def _prompt(self, text: str, actor: EntityState, visible_entities: List[EntityState]) -> Tuple[str, str]:
         system = """
         You are the Game Parser. Your job is to convert player speech into game actions.
         Available Actions:
@@ -28,4 +72,13 @@ class ParserAgent:
         Player Input: "{text}"
         """
         
-        return self.llm.generate_json(context, {}, system)
+        return context, system
+
+    def metrics(self) -> Dict[str, Any]:
+        fast, llm = self.latency["fast"].count, self.latency["llm"].count
+        total = fast + llm
+        return {
+            "fast": self.latency["fast"].to_dict(),
+            "llm": self.latency["llm"].to_dict(),
+            "fallback_rate": round(llm / total, 4) if total else 0.0,
+        }
@@ -1,18 +1,61 @@
 import json
 import os
-import random
-from typing import Dict, Any, List, Optional
-from pydantic import BaseModel
+from typing import Callable, Dict, Any, Iterable, List, Optional, Union
+from pydantic import BaseModel, PrivateAttr
+
+from backend.engine.ability_index import (
+    AbilityIndex, default_cache_path, file_digest, load_cache, resolve_skills_dir, save_cache,
+)
+from backend.engine.dice import DiceEngine
+from backend.engine.dice_expr import DiceExpr, DiceExpressionError, compile_dice
+from backend.engine.effects import CompiledAbility, EffectContext, compile_ability
+from backend.engine.rng import RNGStream
+from backend.engine.targeting import Cell, ability_area, rasterize
 
 class Effect(BaseModel):
     type: str # Damage, Heal, Status
     dice: Optional[str] = None
-    amount: Optional[str] = None # Added for consistency with JSON
+    amount: Optional[Union[int, str]] = None # Added for consistency with JSON (legacy data has plain ints too)
     bonus: int = 0
     dmg_type: Optional[str] = None
     status: Optional[str] = None # For Pydantic model
     status_id: Optional[str] = None # To catch JSON alias if needed
-    duration: int = 0
+    duration: Union[int, str] = 0 # Legacy data also uses "scene"/"special"
+    # Legacy effect fields (assets/abilities.json)
+    damage_type: Optional[str] = None
+    distance: int = 0
+    direction: Optional[str] = None
+    save_stat: Optional[str] = None
+    dc: Optional[int] = None
+    contest: Optional[str] = None
+    damage: Optional[Union[int, str]] = None # Legacy alias of amount on aoe_damage effects
+    target: Optional[str] = None # Legacy recipient filter: "ally" / "enemy" / "self"
+    shape: Optional[str] = None # Legacy area shape ("radius", "cone", "line", "wall")
+    range: Optional[int] = None # Legacy area size for shaped effects
+
+    # Compiled once per effect (see compile_dice); None when the field is unset
+    _amount_expr: Optional[DiceExpr] = PrivateAttr(default=None)
+    _dice_expr: Optional[DiceExpr] = PrivateAttr(default=None)
+    _compiled: bool = PrivateAttr(default=False)
+
+    def compile(self):
+        """Parses amount/dice into cached callables. Raises DiceExpressionError if malformed."""
+        self._compiled = True
+        amount = self.amount if self.amount not in (None, "") else self.damage
+        self._amount_expr = compile_dice(amount) if amount not in (None, "") else None
+        self._dice_expr = compile_dice(self.dice) if self.dice else None
+
+    @property
+    def amount_expr(self) -> Optional[DiceExpr]:
+        if not self._compiled:
+            self.compile()
+        return self._amount_expr
+
+    @property
+    def dice_expr(self) -> Optional[DiceExpr]:
+        if not self._compiled:
+            self.compile()
+        return self._dice_expr
 
 class AbilityCosts(BaseModel):
     ap: int = 1
@@ -22,6 +65,8 @@ class AbilityCosts(BaseModel):
 class AbilityTargeting(BaseModel):
     type: str = "Melee"
     range: int = 1
+    shape: Optional[str] = None # burst / ring / cone / line (see targeting.py); None = single target
+    size: int = 0
 
 class Ability(BaseModel):
     id: str
@@ -34,127 +79,412 @@ class Ability(BaseModel):
     narrative: str
     icon: str = "default_icon"
 
+    def compile(self) -> List[str]:
+        """Compiles every effect's dice. Returns error messages for malformed expressions."""
+        errors = []
+        for i, effect in enumerate(self.effects):
+            try:
+                effect.compile()
+            except DiceExpressionError as e:
+                errors.append(f"{self.id} effect #{i} ({effect.type}): {e}")
+        return errors
+
 class AbilityDatabase:
-    def __init__(self):
-        self.skills: Dict[str, Ability] = {}
+    def __init__(self, skills_dir: Optional[str] = None, cache_path: Optional[str] = None, use_cache: bool = True):
+        self.skills: AbilityIndex = AbilityIndex()
+        self.pipelines: Dict[str, CompiledAbility] = {}
+        self._dumps: Dict[str, tuple] = {} # id -> (ability, JSON-ready dict) for the query API
+        self.file_errors: Dict[str, List[str]] = {} # filename -> malformed-data errors, replaced on reload
+        self.unsupported: set = set() # Effect types loaded with no registered handler
+        self.version = 0 # Bumped on every reload; derived caches key on it
+        self.skills_dir = skills_dir or resolve_skills_dir()
+        self.cache_path = (cache_path or default_cache_path()) if use_cache else None
+        # filename -> (sha1, ability ids) for the files currently loaded
+        self.files: Dict[str, tuple] = {}
         self.load_skills()
 
     def load_skills(self):
-        base_path = os.path.join("assets", "data", "skills")
-        if not os.path.exists(base_path):
-            print(f"[AbilityDB] Warning: {base_path} not found.")
+        base_path = self.skills_dir
+        if not base_path or not os.path.isdir(base_path):
+            print(f"[AbilityDB] Warning: skills directory not found (set SHATTERED_SKILLS_DIR).")
             return
 
-        for filename in os.listdir(base_path):
-            if filename.endswith(".json"):
-                path = os.path.join(base_path, filename)
+        # Files whose hash matches the cached index skip JSON parsing and model validation
+        cached = load_cache(self.cache_path, self.schema_key())
+        entries = {}
+        reused = 0
+        for filename in sorted(os.listdir(base_path)):
+            if not filename.endswith(".json"):
+                continue
+            try:
+                digest, abilities, from_cache = self._read_file(filename, cached)
+                reused += from_cache
+                entries[filename] = (digest, abilities)
+            except Exception as e:
+                print(f"[AbilityDB] Error loading {filename}: {e}")
+
+        for filename, (digest, abilities) in entries.items():
+            self._install(self.skills, filename, digest, abilities)
+
+        if reused:
+            print(f"[AbilityDB] {reused}/{len(entries)} files from index cache")
+        if reused < len(entries) or len(cached) != len(entries):
+            save_cache(self.cache_path, entries, self.schema_key())
+        print(f"[AbilityDB] {len(self.skills)} abilities from {base_path}")
+        if self.unsupported:
+            print(f"[AbilityDB] {len(self.unsupported)} effect types have no handler yet (see DB.unsupported)")
+
+    @staticmethod
+    def schema_key() -> str:
+        # Pickled models are only reusable while the model classes keep the same fields
+        return file_digest(json.dumps(Ability.model_json_schema(), sort_keys=True).encode())
+
+    def _read_file(self, filename: str, cached: Optional[Dict[str, tuple]] = None):
+        """(sha1, abilities, came from cache) for one skills file. Raises on unreadable/invalid data."""
+        with open(os.path.join(self.skills_dir, filename), 'rb') as f:
+            raw = f.read()
+        digest = file_digest(raw)
+        hit = (cached or {}).get(filename)
+        if hit and hit[0] == digest:
+            return digest, hit[1], True
+        abilities = [Ability(**item) for item in json.loads(raw)]
+        print(f"[AbilityDB] Loaded {filename}")
+        return digest, abilities, False
+
+    @property
+    def errors(self) -> List[str]:
+        return [err for errs in self.file_errors.values() for err in errs]
+
+    def _install(self, index: AbilityIndex, filename: str, digest: str, abilities: List[Ability]):
+        errors = self.file_errors[filename] = []
+        for ability in abilities:
+            for err in ability.compile():
+                print(f"[AbilityDB] Malformed dice in {filename}: {err}")
+                errors.append(err)
+            index[ability.id] = ability
+            pipeline = compile_ability(ability)
+            self.pipelines[ability.id] = pipeline
+            self.unsupported.update(pipeline.unsupported)
+        self.files[filename] = (digest, [a.id for a in abilities])
+
+    def reload_files(self, paths: Optional[List[str]] = None) -> int:
+        """
+        Re-reads changed skills files (all if None) and swaps in a new index.
+        Only abilities from those files are re-parsed and re-indexed; the swap is a single
+        assignment, so a request that already holds DB.skills keeps a consistent view.
+        A file that fails to parse keeps its previous abilities. Returns the new DB.version.
+        """
+        if not self.skills_dir:
+            return self.version
+        if paths is None:
+            names = set(self.files) | {f for f in os.listdir(self.skills_dir) if f.endswith(".json")}
+        else:
+            names = {os.path.basename(p) for p in paths if p.endswith(".json")}
+
+        index = self.skills.clone()
+        old_files = dict(self.files)
+        for filename in sorted(names):
+            if os.path.exists(os.path.join(self.skills_dir, filename)):
                 try:
-                    with open(path, 'r') as f:
-                        data = json.load(f)
-                        for item in data:
-                            ability = Ability(**item)
-                            self.skills[ability.id] = ability
-                    print(f"[AbilityDB] Loaded {filename}")
+                    digest, abilities, _ = self._read_file(filename)
                 except Exception as e:
-                    print(f"[AbilityDB] Error loading {filename}: {e}")
+                    print(f"[AbilityDB] Keeping previous {filename}, reload failed: {e}")
+                    continue
+            else:
+                digest, abilities = None, []
+            for ability_id in old_files.get(filename, (None, []))[1]:
+                index.pop(ability_id, None)
+            self.files.pop(filename, None)
+            self.file_errors.pop(filename, None)
+            if digest:
+                self._install(index, filename, digest, abilities)
+
+        self.skills = index
+        self.version += 1
+        # Derived caches: compiled pipelines and serialized dicts are identity-checked,
+        # so only entries for removed abilities need dropping
+        for cache in (self.pipelines, self._dumps):
+            for ability_id in [i for i in cache if i not in index]:
+                del cache[ability_id]
+        save_cache(self.cache_path, {fn: (digest, [index[i] for i in ids if i in index])
+                                     for fn, (digest, ids) in self.files.items()}, self.schema_key())
+        print(f"[AbilityDB] Reloaded {sorted(names)} ({len(index)} abilities, v{self.version})")
+        return self.version
 
     def get(self, ability_id: str) -> Optional[Ability]:
         return self.skills.get(ability_id)
 
+    def query(self, school: Optional[str] = None, tier: Optional[int] = None,
+              cost_type: Optional[str] = None, effect_type: Optional[str] = None,
+              min_range: Optional[int] = None, max_range: Optional[int] = None,
+              affordable_by: Any = None, ids: Optional[Iterable[str]] = None) -> List[Ability]:
+        """
+        Abilities matching every filter, via the secondary indexes.
+        `affordable_by` keeps only what that entity can pay for right now (AP and its stamina/focus pool).
+        `ids` restricts the result to those ability ids (e.g. an actor's known skills).
+        """
+        skills = self.skills # A reload swaps the index; stick to the one we started with
+        filters = dict(school=school, tier=tier, effect_type=effect_type, min_range=min_range, max_range=max_range)
+        if affordable_by is None:
+            matches = skills.query(cost_type=cost_type, **filters)
+        else:
+            matches = set()
+            pools = {"stamina": affordable_by.stamina, "focus": affordable_by.focus}
+            for pool_type, available in pools.items():
+                if cost_type is None or cost_type == pool_type:
+                    matches |= skills.query(cost_type=pool_type, max_resource=available,
+                                                 max_ap=affordable_by.ap, **filters)
+        if ids is not None:
+            matches &= set(ids)
+        return [skills[i] for i in sorted(matches)]
+
+    def serialized(self, ability: Ability) -> Dict[str, Any]:
+        """JSON-ready dict for an ability, built once and reused until the ability is replaced."""
+        cached = self._dumps.get(ability.id)
+        if cached is None or cached[0] is not ability:
+            cached = (ability, ability.model_dump(mode="json"))
+            self._dumps[ability.id] = cached
+        return cached[1]
+
+    def compiled(self, ability_id: str, report: bool = True) -> Optional[CompiledAbility]:
+        """The ability's effect pipeline, compiled on first use (and again if the ability was replaced)."""
+        ability = self.skills.get(ability_id)
+        if ability is None:
+            return None
+        pipeline = self.pipelines.get(ability_id)
+        if pipeline is None or pipeline.ability is not ability:
+            pipeline = compile_ability(ability)
+            if pipeline.unsupported and report:
+                print(f"[AbilityDB] {ability_id}: no handler for effect types {list(pipeline.unsupported)}")
+            self.pipelines[ability_id] = pipeline
+        return pipeline
+
 # Global DB Instance
 DB = AbilityDatabase()
 
 class AbilityResolver:
-    def __init__(self, engine):
+    def __init__(self, engine, rng: Optional[RNGStream] = None):
         self.engine = engine # MechanicsEngine
+        # Effect dice share the engine's stream unless given their own
+        self.dice = DiceEngine(rng=rng) if rng else engine.dice
 
-    def resolve_ability(self, ability_id: str, attacker: Any, target: Any) -> Dict[str, Any]:
-        ability = DB.get(ability_id)
-        if not ability:
-            return {"success": False, "message": f"Unknown Ability: {ability_id}"}
-            
+    def _check_cast(self, ability: Ability, ability_id: str, attacker: Any, dist: int) -> Optional[str]:
+        """Reason the cast is not allowed, or None."""
         # 0. Check Ownership
         if ability_id not in attacker.known_skills:
-             return {"success": False, "message": f"Skill Not Learned: {ability_id}"}
+             return f"Skill Not Learned: {ability_id}"
 
         # 1. Check Costs
         if attacker.ap < ability.costs.ap:
-            return {"success": False, "message": "Not enough AP"}
+            return "Not enough AP"
             
         if ability.costs.type == "stamina" and attacker.stamina < ability.costs.resource:
-             return {"success": False, "message": "Not enough Stamina"}
+             return "Not enough Stamina"
         elif ability.costs.type == "focus" and attacker.focus < ability.costs.resource:
-             return {"success": False, "message": "Not enough Focus"}
+             return "Not enough Focus"
              
         # 2. Check Range
-        dist = abs(attacker.x - target.x) + abs(attacker.y - target.y)
         if dist > ability.targeting.range:
-            return {"success": False, "message": f"Out of Range ({dist} > {ability.targeting.range})"}
-            
-        # 3. Resolve Effects
-        total_damage = 0
-        damage_type = "Meat"
-        applied_statuses = []
-        
+            return f"Out of Range ({dist} > {ability.targeting.range})"
+        return None
+
+    def _run_effects(self, pipeline: CompiledAbility, attacker: Any, target: Any) -> EffectContext:
+        ability = pipeline.ability
         # Determine Stats for Rolls
-        atk_stat = 12
-        if ability.costs.type == "stamina": atk_stat = attacker.stats.get('Might', 12)
-        elif ability.costs.type == "focus": atk_stat = attacker.stats.get('Knowledge', 12)
-        
-        def_stat = target.stats.get('Reflexes', 10)
+        atk_stat, def_stat = self.attack_stats(ability, attacker, target)
         
         # Base Mechanics Roll (Hit/Crit)
         mech_result = self.engine.resolve_attack(atk_stat, 0, def_stat, 0)
         
-        # Process Effects
-        for effect in ability.effects:
-            if effect.type == "Damage" or effect.type == "direct_damage":
-                # Only apply if hit? Or always? Assuming hit required for now unless "guaranteed"
-                # For direct_damage, usually guaranteed but let's stick to Attack Roll gated for simplicity
-                if mech_result.get("hit", False) or True: # Assuming spells hit for now or implementing Save later
-                     base = mech_result.get("damage_amount", 0)
-                     # If it's a direct damage spell, we might ignore the weapon roll and use the spell's roll
-                     # But combining them is fine for "battlemage" feel.
-                     
-                     # Simple logic: If we have dice, roll it.
-                     if effect.amount: # JSON uses "amount": "1d10"
-                        roll = self.roll_dice(effect.amount)
-                        total_damage += roll
-                     
-                     if effect.dice:
-                        roll = self.roll_dice(effect.dice)
-                        total_damage += roll + effect.bonus
-                     
-                     damage_type = effect.dmg_type or effect.damage_type or "Meat"
-
-            elif effect.type == "apply_status" or effect.type == "Status":
-                # Check chance?
-                status_id = effect.status or effect.status_id
-                if status_id:
-                    applied_statuses.append(status_id)
-
-        if total_damage > 0:
-            mech_result["damage_amount"] = total_damage
-            mech_result["damage_type"] = damage_type
+        # Run the pre-compiled effect steps (damage dice replace the weapon roll when present)
+        ctx = pipeline.run(EffectContext(attacker, target, self.dice, mech_result))
+
+        if ctx.total_damage > 0:
+            mech_result["damage_amount"] = ctx.total_damage
+            mech_result["damage_type"] = ctx.damage_type
+        return ctx
+
+    def _run_self_effects(self, pipeline: CompiledAbility, attacker: Any) -> Optional[Dict[str, Any]]:
+        """The caster's own effects (`target: "self"`), as an entry _apply_effects applies to the caster."""
+        if not pipeline.self_steps:
+            return None
+        ctx = pipeline.run_self(EffectContext(attacker, attacker, self.dice, {}))
+        mechanics = {"damage_amount": ctx.total_damage, "damage_type": ctx.damage_type} if ctx.total_damage > 0 else {}
+        return {
+            "target_id": attacker.id,
+            "mechanics": mechanics,
+            "applied_statuses": ctx.applied_statuses,
+            "status_durations": ctx.status_durations,
+            "removed_statuses": ctx.removed_statuses,
+            "healing": ctx.healing,
+            "composure_damage": ctx.composure_damage,
+            "displacements": ctx.displacements,
+            "rolls": ctx.rolls,
+        }
+
+    def resolve_ability(self, ability_id: str, attacker: Any, target: Any) -> Dict[str, Any]:
+        pipeline = DB.compiled(ability_id)
+        if not pipeline:
+            return {"success": False, "message": f"Unknown Ability: {ability_id}"}
+        ability = pipeline.ability
+
+        dist = abs(attacker.x - target.x) + abs(attacker.y - target.y)
+        error = self._check_cast(ability, ability_id, attacker, dist)
+        if error:
+            return {"success": False, "message": error}
+            
+        # 3. Resolve Effects
+        ctx = self._run_effects(pipeline, attacker, target)
             
         return {
             "success": True,
             "cost": ability.costs.ap,
             "resource_cost": ability.costs.resource,
             "resource_type": ability.costs.type,
-            "mechanics": mech_result,
-            "applied_statuses": applied_statuses,
+            "mechanics": ctx.mechanics,
+            "applied_statuses": ctx.applied_statuses,
+            "status_durations": ctx.status_durations,
+            "removed_statuses": ctx.removed_statuses,
+            "healing": ctx.healing,
+            "composure_damage": ctx.composure_damage,
+            "displacements": ctx.displacements,
+            "rolls": ctx.rolls,
+            "self_effects": self._run_self_effects(pipeline, attacker),
             "narrative": f"{attacker.name} {ability.narrative} at {target.name}!"
         }
 
-    def roll_dice(self, dice_str: str) -> int:
+    def resolve_area(self, ability_id: str, attacker: Any, aim: Cell, turn_manager: Any) -> Dict[str, Any]:
+        """
+        Casts an ability at a grid cell. The ability's shape (see targeting.ability_area) is rasterized
+        there, everyone standing in it is found through the turn manager's spatial index, and the effect
+        pipeline runs once per entity. Returns one consolidated result with a `targets` entry per entity.
+        """
+        pipeline = DB.compiled(ability_id)
+        if not pipeline:
+            return {"success": False, "message": f"Unknown Ability: {ability_id}"}
+        ability = pipeline.ability
+
+        aim = (aim[0], aim[1])
+        dist = abs(attacker.x - aim[0]) + abs(attacker.y - aim[1])
+        error = self._check_cast(ability, ability_id, attacker, dist)
+        if error:
+            return {"success": False, "message": error}
+
+        shape, size = ability_area(ability)
+        cells = rasterize(shape, size, (attacker.x, attacker.y), aim)
+        targets = []
+        total_damage = 0
+        for target in turn_manager.entities_at(cells):
+            ctx = self._run_effects(pipeline, attacker, target)
+            total_damage += ctx.mechanics.get("damage_amount", 0)
+            targets.append({
+                "target_id": target.id,
+                "mechanics": ctx.mechanics,
+                "applied_statuses": ctx.applied_statuses,
+                "status_durations": ctx.status_durations,
+                "removed_statuses": ctx.removed_statuses,
+                "healing": ctx.healing,
+                "composure_damage": ctx.composure_damage,
+                "displacements": ctx.displacements,
+                "rolls": ctx.rolls,
+            })
+
+        return {
+            "success": True,
+            "cost": ability.costs.ap,
+            "resource_cost": ability.costs.resource,
+            "resource_type": ability.costs.type,
+            "shape": shape,
+            "cells": sorted(cells),
+            "targets": targets,
+            "self_effects": self._run_self_effects(pipeline, attacker), # Once per cast, not per target
+            "total_damage": total_damage,
+            "narrative": f"{attacker.name} {ability.narrative} ({len(targets)} caught)!"
+        }
+
+    def _pay_costs(self, result: Dict[str, Any], attacker: Any):
+        attacker.ap -= result["cost"]
+        r_cost = result.get("resource_cost", 0)
+        r_type = result.get("resource_type", "")
+        if r_type == "stamina": attacker.stamina = max(0, attacker.stamina - r_cost)
+        elif r_type == "focus": attacker.focus = max(0, attacker.focus - r_cost)
+
+    def _apply_effects(self, result: Dict[str, Any], target: Any, lookup: Dict[str, Any],
+                       is_free: Optional[Callable[[int, int], bool]], statuses: Any = None, source_id: Optional[str] = None):
+        mech = result["mechanics"]
+        dmg = mech.get("damage_amount", 0)
+        dtype = mech.get("damage_type", "Meat")
+        if dmg > 0:
+            if dtype == "Meat": target.hp = max(0, target.hp - dmg)
+            else: target.composure = max(0, target.composure - dmg) # Shock/Burn?
+
+        if result.get("composure_damage"):
+            target.composure = max(0, target.composure - result["composure_damage"])
+        if result.get("healing"):
+            target.hp = min(target.max_hp, target.hp + result["healing"])
+
+        # With a StatusEngine (turn_manager.statuses) statuses get durations, stacks and ticks
+        durations = result.get("status_durations", {})
+        for s in result.get("removed_statuses", []):
+            if statuses is not None: statuses.remove(target, s)
+            elif s in target.status_effects: target.status_effects.remove(s)
+        for s in result.get("applied_statuses", []):
+            if statuses is not None:
+                statuses.apply(target, s, durations.get(s), source_id)
+            elif s not in target.status_effects:
+                target.status_effects.append(s)
+                print(f"[Effect] Applied {s} to {target.name}")
+
+        for move in result.get("displacements", []):
+            entity = lookup.get(move["entity_id"])
+            if not entity:
+                continue
+            for x, y in move["path"]:
+                if is_free and not is_free(x, y):
+                    break
+                entity.x, entity.y = x, y
+            move["to"] = (entity.x, entity.y)
+
+    def apply_result(self, result: Dict[str, Any], attacker: Any, target: Any,
+                     entities: Optional[Dict[str, Any]] = None,
+                     is_free: Optional[Callable[[int, int], bool]] = None, statuses: Any = None):
+        """
+        Applies a successful resolve_ability result: costs, damage, healing, statuses and forced movement,
+        then the caster's own `self_effects`.
+        `entities` maps ids for displacements; `is_free(x, y)` stops movement at blocked cells;
+        `statuses` is the battle's StatusEngine (plain id list if omitted).
+        """
+        self._pay_costs(result, attacker)
+        lookup = entities or {attacker.id: attacker, target.id: target}
+        self._apply_effects(result, target, lookup, is_free, statuses, attacker.id)
+        if result.get("self_effects"):
+            self._apply_effects(result["self_effects"], attacker, lookup, is_free, statuses, attacker.id)
+
+    def apply_area_result(self, result: Dict[str, Any], attacker: Any, entities: Dict[str, Any],
+                          is_free: Optional[Callable[[int, int], bool]] = None, statuses: Any = None):
+        """Applies a resolve_area result: costs once, each caught entity's effects, then the caster's own."""
+        self._pay_costs(result, attacker)
+        for entry in result["targets"]:
+            target = entities.get(entry["target_id"])
+            if target:
+                self._apply_effects(entry, target, entities, is_free, statuses, attacker.id)
+        if result.get("self_effects"):
+            self._apply_effects(result["self_effects"], attacker, entities, is_free, statuses, attacker.id)
+
+    def attack_stats(self, ability: Ability, attacker: Any, target: Any):
+        """Returns (attack stat, defense stat) used for the ability's mechanics roll."""
+        atk_stat = 12
+        if ability.costs.type == "stamina": atk_stat = attacker.stats.get('Might', 12)
+        elif ability.costs.type == "focus": atk_stat = attacker.stats.get('Knowledge', 12)
+
+        def_stat = target.stats.get('Reflexes', 10)
+        return atk_stat, def_stat
+
+    def roll_dice(self, dice_str: str, stats: Optional[Dict[str, int]] = None) -> int:
         if not dice_str: return 0
         try:
-            # "1d10"
-            count, sides = map(int, dice_str.lower().split('d'))
-            val = 0
-            for _ in range(count):
-                val += random.randint(1, sides)
-            return val
-        except:
-             return 0
+            # "1d10", "2d6+3", "1d8+Might", "4d6kh3" (compiled once, then cached)
+            return compile_dice(dice_str).roll(self.dice, stats)
+        except DiceExpressionError as e:
+            print(f"[AbilityResolver] {e}")
+            return 0
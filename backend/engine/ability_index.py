@@ -0,0 +1,205 @@
+import bisect
+import hashlib
+import os
+import pickle
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+# Ability store internals: path resolution, the on-disk index cache and the
+# secondary indexes behind AbilityDatabase.query().
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SKILLS_DIR_ENV = "SHATTERED_SKILLS_DIR"
+CACHE_DIR_ENV = "SHATTERED_CACHE_DIR"
+
+# Bump when the cached payload layout changes (model changes are caught by the schema key)
+CACHE_VERSION = 1
+
+def resolve_skills_dir() -> Optional[str]:
+    """
+    First existing skills directory: $SHATTERED_SKILLS_DIR, then the cwd-relative
+    assets/data/skills (legacy behaviour), then the repo's own data (Unity keeps it under Assets/).
+    """
+    candidates = [
+        os.environ.get(SKILLS_DIR_ENV),
+        os.path.join("assets", "data", "skills"),
+        os.path.join(REPO_ROOT, "assets", "data", "skills"),
+        os.path.join(REPO_ROOT, "Assets", "data", "skills"),
+    ]
+    for path in candidates:
+        if path and os.path.isdir(path):
+            return path
+    return None
+
+def default_cache_path() -> str:
+    cache_dir = os.environ.get(CACHE_DIR_ENV) or os.path.join(REPO_ROOT, "backend", "cache")
+    return os.path.join(cache_dir, "ability_index.pkl")
+
+def file_digest(data: bytes) -> str:
+    return hashlib.sha1(data).hexdigest()
+
+def load_cache(path: Optional[str], schema_key: str = "") -> Dict[str, Tuple[str, list]]:
+    """
+    {filename: (sha1, [Ability, ...])} from a previous load, or {} if missing/stale.
+    `schema_key` identifies the model layout the pickles were made with.
+    """
+    if not path or not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "rb") as f:
+            payload = pickle.load(f)
+        if payload.get("version") != CACHE_VERSION or payload.get("schema") != schema_key:
+            return {}
+        return payload["files"]
+    except Exception as e:
+        print(f"[AbilityDB] Ignoring unreadable index cache {path}: {e}")
+        return {}
+
+def save_cache(path: Optional[str], files: Dict[str, Tuple[str, list]], schema_key: str = ""):
+    if not path:
+        return
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump({"version": CACHE_VERSION, "schema": schema_key, "files": files}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"[AbilityDB] Could not write index cache {path}: {e}")
+
+def _indexable(ability: Any) -> bool:
+    # Only real Ability models get secondary entries; test doubles are still stored by id
+    return hasattr(type(ability), "model_fields")
+
+class AbilityIndex(dict):
+    """
+    id -> Ability dict that keeps secondary indexes in sync with every write,
+    so DB.skills stays a plain mapping for callers while query() is index lookups.
+    """
+
+    def __init__(self, abilities: Iterable[Any] = ()):
+        super().__init__()
+        self.by_school: Dict[str, Set[str]] = {}
+        self.by_tier: Dict[int, Set[str]] = {}
+        self.by_cost_type: Dict[str, Set[str]] = {}
+        self.by_effect_type: Dict[str, Set[str]] = {}
+        # Sorted (value, id) pairs for range queries
+        self.by_resource_cost: List[Tuple[int, str]] = []
+        self.by_ap_cost: List[Tuple[int, str]] = []
+        self.by_range: List[Tuple[int, str]] = []
+        for ability in abilities:
+            self[ability.id] = ability
+
+    def clone(self) -> 'AbilityIndex':
+        """Independent copy (abilities shared, index containers copied) for copy-on-write reloads."""
+        other = AbilityIndex()
+        dict.update(other, self)
+        for name in ("by_school", "by_tier", "by_cost_type", "by_effect_type"):
+            setattr(other, name, {key: set(ids) for key, ids in getattr(self, name).items()})
+        for name in ("by_resource_cost", "by_ap_cost", "by_range"):
+            setattr(other, name, list(getattr(self, name)))
+        return other
+
+    # --- dict writes keep the indexes current ---
+
+    def __setitem__(self, ability_id: str, ability: Any):
+        if ability_id in self:
+            self._unindex(ability_id, dict.__getitem__(self, ability_id))
+        dict.__setitem__(self, ability_id, ability)
+        self._index(ability_id, ability)
+
+    def __delitem__(self, ability_id: str):
+        self._unindex(ability_id, dict.__getitem__(self, ability_id))
+        dict.__delitem__(self, ability_id)
+
+    def pop(self, ability_id: str, *default):
+        if ability_id in self:
+            ability = dict.__getitem__(self, ability_id)
+            del self[ability_id]
+            return ability
+        if default:
+            return default[0]
+        raise KeyError(ability_id)
+
+    def update(self, *args, **kwargs):
+        for ability_id, ability in dict(*args, **kwargs).items():
+            self[ability_id] = ability
+
+    def setdefault(self, ability_id: str, default: Any = None):
+        if ability_id not in self:
+            self[ability_id] = default
+        return dict.__getitem__(self, ability_id)
+
+    def clear(self):
+        dict.clear(self)
+        for index in (self.by_school, self.by_tier, self.by_cost_type, self.by_effect_type):
+            index.clear()
+        for ordered in (self.by_resource_cost, self.by_ap_cost, self.by_range):
+            ordered.clear()
+
+    def _keys_for(self, ability: Any):
+        effect_types = {e.type for e in ability.effects}
+        return ((self.by_school, ability.school.lower()),
+                (self.by_tier, ability.tier),
+                (self.by_cost_type, ability.costs.type),
+                *((self.by_effect_type, t) for t in effect_types))
+
+    def _index(self, ability_id: str, ability: Any):
+        if not _indexable(ability):
+            return
+        for index, key in self._keys_for(ability):
+            index.setdefault(key, set()).add(ability_id)
+        bisect.insort(self.by_resource_cost, (ability.costs.resource, ability_id))
+        bisect.insort(self.by_ap_cost, (ability.costs.ap, ability_id))
+        bisect.insort(self.by_range, (ability.targeting.range, ability_id))
+
+    def _unindex(self, ability_id: str, ability: Any):
+        if not _indexable(ability):
+            return
+        for index, key in self._keys_for(ability):
+            ids = index.get(key)
+            if ids:
+                ids.discard(ability_id)
+                if not ids:
+                    del index[key]
+        for ordered, value in ((self.by_resource_cost, ability.costs.resource),
+                               (self.by_ap_cost, ability.costs.ap),
+                               (self.by_range, ability.targeting.range)):
+            i = bisect.bisect_left(ordered, (value, ability_id))
+            if i < len(ordered) and ordered[i] == (value, ability_id):
+                del ordered[i]
+
+    # --- lookups ---
+
+    @staticmethod
+    def _between(ordered: List[Tuple[int, str]], low: Optional[int], high: Optional[int]) -> Set[str]:
+        lo = 0 if low is None else bisect.bisect_left(ordered, (low, ""))
+        hi = len(ordered) if high is None else bisect.bisect_left(ordered, (high + 1, ""))
+        return {ability_id for _, ability_id in ordered[lo:hi]}
+
+    def query(self, school: Optional[str] = None, tier: Optional[int] = None,
+              cost_type: Optional[str] = None, effect_type: Optional[str] = None,
+              min_range: Optional[int] = None, max_range: Optional[int] = None,
+              max_resource: Optional[int] = None, max_ap: Optional[int] = None) -> Set[str]:
+        """Ids matching every given filter (None = unfiltered)."""
+        candidates: List[Set[str]] = []
+        if school is not None: candidates.append(self.by_school.get(school.lower(), set()))
+        if tier is not None: candidates.append(self.by_tier.get(tier, set()))
+        if cost_type is not None: candidates.append(self.by_cost_type.get(cost_type, set()))
+        if effect_type is not None: candidates.append(self.by_effect_type.get(effect_type, set()))
+        if min_range is not None or max_range is not None:
+            candidates.append(self._between(self.by_range, min_range, max_range))
+        if max_resource is not None:
+            candidates.append(self._between(self.by_resource_cost, None, max_resource))
+        if max_ap is not None:
+            candidates.append(self._between(self.by_ap_cost, None, max_ap))
+
+        if not candidates:
+            return {ability_id for _, ability_id in self.by_range}
+        candidates.sort(key=len)
+        result = set(candidates[0])
+        for ids in candidates[1:]:
+            result &= ids
+            if not result:
+                break
+        return result
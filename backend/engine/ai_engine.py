@@ -1,16 +1,41 @@
+import time
 from typing import List, Dict, Any, Optional
 from backend.engine.turn_manager import TurnManager, EntityState
 from backend.engine.actions import ActionResolver
+from backend.engine.ai_trace import AITracer
 from backend.engine.mechanics import MechanicsEngine
+from backend.engine.assignment import GroupAssigner
+from backend.engine.decision_cache import DecisionCache
 from backend.engine.grid import Point
+from backend.engine.influence import INF, InfluenceMap
+from backend.engine.odds import attack_odds
+from backend.engine.planner import ATTACK_AP, MOVE_AP, Plan, PlannedAction, TurnPlanner
+from backend.engine.snapshot import BattleState
 
 from backend.engine.abilities import AbilityResolver, DB
 
 class AIEngine:
-    def __init__(self, action_resolver: ActionResolver, ability_resolver: AbilityResolver, mechanics: MechanicsEngine):
+    def __init__(self, action_resolver: ActionResolver, ability_resolver: AbilityResolver, mechanics: MechanicsEngine,
+                 difficulty: Optional[str] = None, trace: bool = False):
         self.resolver = action_resolver
         self.ability_resolver = ability_resolver
         self.mechanics = mechanics
+        # Lookahead planner (planner.py) sized by difficulty; None keeps the one-ply heuristic
+        self.planner: Optional[TurnPlanner] = None
+        # Planned turns memoized by local situation (decision_cache.py)
+        self.decisions = DecisionCache()
+        # Stage timings (always) and per-decision traces (with `trace`, debug mode) - ai_trace.py
+        self.tracer = AITracer(enabled=trace)
+        self.set_difficulty(difficulty)
+        self.influence: Optional[InfluenceMap] = None # Built on first use for the resolver's grid
+        self._influence_held = False # Inside take_turn: the map was refreshed when the turn began
+        # Heuristic targets are matched per team (assignment.py) rather than nearest-first
+        self.groups = GroupAssigner(self._expected_damage)
+
+    def set_difficulty(self, difficulty: Optional[str]):
+        self.difficulty = difficulty
+        self.planner = TurnPlanner.for_difficulty(self.ability_resolver, difficulty) if difficulty else None
+        self.decisions.clear() # Plans from other parameters would no longer match
     
     def process_turn(self, actor: EntityState, turn_manager: TurnManager) -> Dict[str, Any]:
         """
@@ -18,9 +43,19 @@ class AIEngine:
         Returns a dict describing what happened (for logging).
         """
         print(f"[AI] Processing turn for {actor.name} ({actor.id})")
+        self.tracer.begin(actor)
+        res = self._decide(actor, turn_manager)
+        trace = self.tracer.finish(res)
+        if trace: res["trace"] = trace
+        return res
+
+    def _decide(self, actor: EntityState, turn_manager: TurnManager) -> Dict[str, Any]:
+        if self.planner:
+            return self._process_planned(actor, turn_manager)
         
-        # 1. Identify Target (Nearest Player)
-        target = self._find_nearest_target(actor, turn_manager)
+        # 1. Identify Target (assigned to this actor by its group)
+        with self.tracer.stage("target"):
+            target = self._find_target(actor, turn_manager)
         if not target:
             return {"action": "Wait", "message": "No targets found so I slept."}
             
@@ -30,134 +65,309 @@ class AIEngine:
         start = Point(actor.x, actor.y)
         end = Point(target.x, target.y)
         dist = start.distance(end)
+        self.tracer.note(target=target.id, distance=dist)
         
         # RETREAT LOGIC: If HP < 30%, try to run away
         is_low_health = (actor.hp / actor.max_hp) < 0.3
         
         if is_low_health:
             print(f"[AI] Low Health ({actor.hp}/{actor.max_hp})! Attempting Retreat.")
-            move_res = self._attempt_move(actor, start, end, retreat=True, tm=turn_manager)
+            self.tracer.note(retreat=True)
+            with self.tracer.stage("movement"):
+                move_res = self._attempt_move(actor, start, end, retreat=True, tm=turn_manager)
             if move_res: return move_res
             # If cannot retreat, fight desperately
         
         # 3. Decision Tree (Aggressive)
         
         # 3a. Try to use Best Skill
-        best_skill = self._pick_best_skill(actor, target, dist)
+        with self.tracer.stage("skills"):
+            best_skill = self._pick_best_skill(actor, target, dist)
         
         if best_skill:
             skill_id, predicted_dmg = best_skill
             print(f"[AI] Using Best Skill: {skill_id} (Est Dmg: {predicted_dmg}) on {target.name}")
-            result = self.ability_resolver.resolve_ability(skill_id, actor, target)
-            
-            if result["success"]:
-                 actor.ap -= result["cost"] 
-                 
-                 # Deduct resources
-                 r_cost = result.get("resource_cost", 0)
-                 r_type = result.get("resource_type", "")
-                 if r_type == "stamina": actor.stamina = max(0, actor.stamina - r_cost)
-                 elif r_type == "focus": actor.focus = max(0, actor.focus - r_cost)
-                 
-                 mech = result["mechanics"]
-                 dmg = mech.get("damage_amount", 0)
-                 dtype = mech.get("damage_type", "Meat")
-                 
-                 # Apply Damage to Target directly (Simulation side-effect)
-                 if dmg > 0:
-                    if dtype == "Meat": target.hp = max(0, target.hp - dmg)
-                    else: target.composure = max(0, target.composure - dmg)
-                    
-                 return {
-                    "action": "UseSkill",
-                    "skill_id": skill_id,
-                    "target": target.id,
-                    "damage": dmg,
-                    "narrative": result.get("narrative", "")
-                 }
+            skill_res = self._use_skill(actor, target, skill_id, turn_manager)
+            if skill_res: return skill_res
         
         # 3b. Fallback to Basic Attack if close
         if dist <= 1:
-            print(f"[AI] Basic Attacking!")
-            result = self.resolver.resolve_attack(actor, target, self.mechanics)
-            if result["success"]:
-                actor.ap -= result["cost"]
-                return {
-                    "action": "Attack", 
-                    "target": target.id, 
-                    "target_name": target.name,
-                    "damage": result["mechanics"].get("damage_amount", 0),
-                    "type": result["mechanics"].get("damage_type", "None")
-                }
-            else:
-                 return {"action": "Wait", "message": "Tried to attack but failed."}
+            return self._basic_attack(actor, target)
                  
         else:
             # Move towards target (or continue retreat logic if missed above)
             print(f"[AI] Moving to engage!")
-            move_res = self._attempt_move(actor, start, end, retreat=False, tm=turn_manager)
+            with self.tracer.stage("movement"):
+                move_res = self._attempt_move(actor, start, end, retreat=False, tm=turn_manager)
             if move_res: return move_res
             
             return {"action": "Wait", "message": "Stuck."}
 
-    def _attempt_move(self, actor, start: Point, end: Point, retreat: bool, tm: TurnManager) -> Optional[Dict]:
+    def take_turn(self, actor: EntityState, turn_manager: TurnManager, max_actions: int = 20) -> List[Dict[str, Any]]:
         """
-        Tries to move one step towards or away from target. 
-        Checks collision with other units.
+        Plays the actor's whole turn, spending its AP, and returns every step taken in order
+        (one Move per tile, then attacks / skills) for the client to animate.
         """
-        dx = end.x - start.x
-        dy = end.y - start.y
-        
-        # Potential steps
-        options = []
+        steps: List[Dict[str, Any]] = []
+        # One influence refresh per turn, not per decision: the only unit moving is the actor,
+        # and its own influence is excluded from what it reads (danger / threat)
+        self._influence(turn_manager)
+        self._influence_held = True
+        try:
+            self._play(actor, turn_manager, steps, max_actions)
+        finally:
+            self._influence_held = False
+        return steps
+
+    def _play(self, actor: EntityState, turn_manager: TurnManager, steps: List[Dict[str, Any]], max_actions: int):
+        while actor.hp > 0 and actor.ap > 0 and len(steps) < max_actions:
+            if not self.planner:
+                self.tracer.begin(actor, "advance")
+                moves = self._advance_to_attack(actor, turn_manager)
+                trace = self.tracer.finish(moves[-1] if moves else None)
+                if trace and moves: moves[0]["trace"] = trace # The whole advance, on its first tile
+                steps.extend(moves)
+                if actor.ap <= 0:
+                    break
+            ap_before = actor.ap
+            res = self.process_turn(actor, turn_manager)
+            if res["action"] == "Wait" or actor.ap >= ap_before:
+                if not steps: steps.append(res)
+                break
+            steps.append(res)
+            if turn_manager.check_victory_condition() != "Ongoing":
+                break
+
+    def _advance_to_attack(self, actor: EntityState, tm: TurnManager) -> List[Dict[str, Any]]:
+        """Walks the shared path toward the nearest target until the chosen attack is in range."""
+        with self.tracer.stage("target"):
+            target = self._find_target(actor, tm)
+        if not target or (actor.hp / actor.max_hp) < 0.3:
+            return [] # Nothing to chase, or retreating (process_turn handles that)
+        end = Point(target.x, target.y)
+        with self.tracer.stage("skills"):
+            want_range, reserve = self._attack_position(actor, target, Point(actor.x, actor.y).distance(end))
+        self.tracer.note(target=target.id, attack_range=want_range, ap_reserved=reserve)
+        with self.tracer.stage("movement"):
+            return self._walk_toward(actor, end, want_range, reserve, tm)
+
+    def _walk_toward(self, actor: EntityState, end: Point, want_range: int, reserve: int, tm: TurnManager) -> List[Dict[str, Any]]:
+        moves = []
+        while actor.ap - MOVE_AP >= reserve and Point(actor.x, actor.y).distance(end) > want_range:
+            start = Point(actor.x, actor.y)
+            res = self._attempt_move(actor, start, end, retreat=False, tm=tm, shared=True)
+            if not res:
+                break
+            moves.append(res)
+        return moves
+
+    def _attack_position(self, actor: EntityState, target: EntityState, dist: int):
+        """
+        (range to close to, AP to keep for the attack). Like process_turn, prefers the most
+        damaging skill the actor can still walk into range of and pay for this turn, else
+        the basic attack; (1, 0) if nothing fits: just close in.
+        """
+        best, best_dmg = None, 0
+        for skill_id in actor.known_skills:
+            skill = DB.get(skill_id)
+            if not skill: continue
+            if skill.costs.type == "stamina" and actor.stamina < skill.costs.resource: continue
+            if skill.costs.type == "focus" and actor.focus < skill.costs.resource: continue
+            rng = skill.targeting.range
+            if max(0, dist - rng) * MOVE_AP + skill.costs.ap > actor.ap: continue
+            est = self._estimate_skill_damage(actor, target, skill)
+            self.tracer.candidate(skill=skill_id, est_damage=est, range=rng, ap=skill.costs.ap)
+            if est > best_dmg:
+                best, best_dmg = (rng, skill.costs.ap), est
+        if best:
+            return best
+        return (1, ATTACK_AP) if max(0, dist - 1) * MOVE_AP + ATTACK_AP <= actor.ap else (1, 0)
+
+    def _attempt_move(self, actor, start: Point, end: Point, retreat: bool, tm: TurnManager,
+                      shared: bool = False) -> Optional[Dict]:
+        """
+        Moves one step towards or away from the target, chosen from the influence map:
+        approaching follows the terrain-aware shortest path around units and costly
+        tiles (less exposed cells first; `shared` tries the path ignoring units first);
+        retreating heads for the least threatened cell.
+        """
+        influence = self._influence(tm)
+        occupied = {(e.x, e.y) for e in tm.entities.values() if e.hp > 0}
+        options = [c for c in self.resolver.grid.passable_neighbors(start.x, start.y) if c not in occupied]
+        if not options:
+            return None
+
+        def away(cell):
+            # Straight-line distance breaks ties so units back off along the open axis
+            return (cell[0] - end.x) ** 2 + (cell[1] - end.y) ** 2
+
         if retreat:
-            # We want to INCREASE distance, so invert signs
-            # (dx > 0) -> Target is right -> Run Left (-1)
-            step_x = -1 if dx > 0 else 1
-            step_y = -1 if dy > 0 else 1
-            options = [(step_x, 0), (0, step_y), (-step_x, 0), (0, -step_y)] # Prioritize away
+            options.sort(key=lambda c: (influence.danger(c, actor.team, actor.id), -away(c)))
         else:
-            # Approach
-            step_x = 1 if dx > 0 else -1
-            step_y = 1 if dy > 0 else -1
-            
-            # Prefer closing the wider gap
-            if abs(dx) >= abs(dy):
-                options = [(step_x, 0), (0, step_y)]
-            else:
-                options = [(0, step_y), (step_x, 0)]
-                
-        # Try options
-        for sx, sy in options:
-            if sx == 0 and sy == 0: continue
-            
-            nx, ny = actor.x + sx, actor.y + sy
-            
-            # check collision
-            if self._is_occupied(nx, ny, tm):
-                continue
-                
-            # validations handled by resolver mostly, but bounds check implicit in resolver
-            result = self.resolver.resolve_move(actor.id, (actor.x, actor.y), (nx, ny), actor.ap)
-            
-            if result["success"]:
-                actor.ap -= result["cost"]
-                actor.x = nx
-                actor.y = ny
-                return {
-                    "action": "Move",
-                    "from": (start.x, start.y),
-                    "to": (nx, ny)
-                }
+            options = self._approach_options(actor, start, (end.x, end.y), options, influence, tm, shared)
+            options.sort(key=lambda c: c[1:] + (away(c[0]),))
+            options = [c for c, _, _ in options]
+
+        if self.tracer.active:
+            for cell in options:
+                self.tracer.candidate(move=cell, danger=round(influence.danger(cell, actor.team, actor.id), 3))
+        for cell in options:
+            move_res = self._step_to(actor, cell)
+            if move_res: return move_res
                 
         return None
 
-    def _is_occupied(self, x, y, tm: TurnManager) -> bool:
-        for entity in tm.entities.values():
-            if entity.hp > 0 and entity.x == x and entity.y == y:
-                return True
+    def _approach_options(self, actor, start: Point, goal: tuple, options: List[tuple], influence: InfluenceMap,
+                          tm: TurnManager, shared: bool):
+        """
+        (cell, cost to goal, danger) for the free neighbors that get closer. With `shared`,
+        the terrain-only field to the goal is tried first; the path around units is only
+        searched when they block every downhill cell.
+        """
+        layout = influence.layout
+        if shared:
+            field = influence.toward(goal, (start.x, start.y))
+            here = field[layout.index(start.x, start.y)]
+            closer = [(c, cost) for c, cost in ((c, field[layout.index(*c)]) for c in options) if cost < here]
+            if closer:
+                return [(c, cost, influence.danger(c, actor.team, actor.id)) for c, cost in closer]
+        blocked = [(e.x, e.y) for e in tm.entities.values() if e.hp > 0 and e.id != actor.id and (e.x, e.y) != goal]
+        field = influence.toward(goal, (start.x, start.y), blocked)
+        here = field[layout.index(start.x, start.y)]
+        if here == INF:
+            # No open path (boxed in by units): fall back to closing the straight-line gap
+            here = start.distance(Point(*goal))
+            costs = {c: abs(c[0] - goal[0]) + abs(c[1] - goal[1]) for c in options}
+        else:
+            costs = {c: field[layout.index(*c)] for c in options}
+        return [(c, costs[c], influence.danger(c, actor.team, actor.id)) for c in options if costs[c] < here]
+
+    def _influence(self, tm: TurnManager) -> InfluenceMap:
+        # Incremental: only units that moved (or changed health/team) since the last call are recomputed
+        if self.influence is None or self.influence.grid is not self.resolver.grid:
+            self.influence = InfluenceMap(self.resolver.grid)
+            self.influence.update(tm)
+        elif not self._influence_held:
+            self.influence.update(tm)
+        return self.influence
+
+    def _process_planned(self, actor: EntityState, turn_manager: TurnManager) -> Dict[str, Any]:
+        # Receding horizon: search the whole turn, execute the first step, replan next call
+        plan = self.plan_turn(actor, turn_manager)
+        return self.execute(actor, plan.first, turn_manager) or {"action": "Wait", "message": "Holding position."}
+
+    def plan_turn(self, actor: EntityState, turn_manager: TurnManager, state: Optional[BattleState] = None,
+                  planner: Optional[TurnPlanner] = None) -> Plan:
+        """Searches the actor's turn (on `state` if given, else a fresh snapshot of the live battle)."""
+        planner = planner or self.planner or TurnPlanner.for_difficulty(self.ability_resolver)
+        with self.tracer.stage("planning"):
+            plan, cached = self._search(actor, turn_manager, state, planner)
+        if self.tracer.active:
+            self.tracer.note(plan=plan.to_dict(), cached=cached)
+        return plan
+
+    def _search(self, actor: EntityState, turn_manager: TurnManager, state: Optional[BattleState], planner: TurnPlanner):
+        start = time.perf_counter()
+        params = (planner.budget, planner.max_depth)
+        if state is not None:
+            me = state.unit(actor.id)
+            situation = self.decisions.situation(me, state.all_units().values(), state.terrain_at, params)
+        else:
+            me = actor
+            situation = self.decisions.situation(actor, turn_manager.entities.values(),
+                                                 lambda x, y: self.resolver.grid.cells.get((x, y)), params)
+        plan = self.decisions.get(situation, me) if situation else None
+        if plan is not None:
+            plan.elapsed = time.perf_counter() - start
+            print(f"[AI] Plan for {actor.id}: {[a.kind for a in plan.actions]} (cached, {plan.elapsed * 1000:.3f} ms)")
+            return plan, True
+
+        plan = planner.plan(actor, turn_manager, self.resolver.grid, state)
+        if situation and not plan.timed_out:
+            # Only complete searches: a budget-cut plan depends on how busy the machine was
+            self.decisions.put(situation, me, plan)
+        print(f"[AI] Plan for {actor.id}: {[a.kind for a in plan.actions]} (depth {plan.depth}, {plan.nodes} nodes, "
+              f"{plan.elapsed * 1000:.1f} ms{', budget hit' if plan.timed_out else ''})")
+        return plan, False
+
+    def validate_step(self, actor: EntityState, step: PlannedAction, turn_manager: TurnManager) -> bool:
+        """Whether a planned step can still be taken in the live battle."""
+        if actor.hp <= 0:
+            return False
+        if step.kind == "Move":
+            nx, ny = step.to
+            return (actor.ap >= MOVE_AP and abs(nx - actor.x) + abs(ny - actor.y) == 1
+                    and self.resolver.grid.is_passable(Point(nx, ny)) and not self._is_occupied(nx, ny, turn_manager))
+        target = turn_manager.entities.get(step.target)
+        if target is None or target.hp <= 0:
+            return False
+        dist = abs(actor.x - target.x) + abs(actor.y - target.y)
+        if step.kind == "Attack":
+            return actor.ap >= ATTACK_AP and dist <= 1
+        if step.kind == "UseSkill":
+            ability = DB.get(step.skill_id)
+            return ability is not None and self.ability_resolver._check_cast(ability, step.skill_id, actor, dist) is None
         return False
 
+    def execute(self, actor: EntityState, step: PlannedAction, turn_manager: TurnManager) -> Optional[Dict[str, Any]]:
+        """Carries out one planned step on the live battle; None if it could not be done."""
+        if step.kind == "Move":
+            return self._step_to(actor, step.to)
+        if step.kind == "Attack":
+            return self._basic_attack(actor, turn_manager.entities[step.target])
+        if step.kind == "UseSkill":
+            return self._use_skill(actor, turn_manager.entities[step.target], step.skill_id, turn_manager)
+        return None
+
+    def _use_skill(self, actor, target, skill_id: str, tm: TurnManager) -> Optional[Dict]:
+        result = self.ability_resolver.resolve_ability(skill_id, actor, target)
+        if not result["success"]:
+            return None
+        # Apply costs and effects to the entities directly (Simulation side-effect)
+        self.ability_resolver.apply_result(
+            result, actor, target, tm.entities,
+            lambda x, y: not self._is_occupied(x, y, tm), tm.statuses)
+        dmg = result["mechanics"].get("damage_amount", 0)
+
+        return {
+            "action": "UseSkill",
+            "skill_id": skill_id,
+            "target": target.id,
+            "damage": dmg,
+            "narrative": result.get("narrative", "")
+        }
+
+    def _basic_attack(self, actor, target) -> Dict:
+        print(f"[AI] Basic Attacking!")
+        result = self.resolver.resolve_attack(actor, target, self.mechanics)
+        if not result["success"]:
+            return {"action": "Wait", "message": "Tried to attack but failed."}
+        actor.ap -= result["cost"]
+        return {
+            "action": "Attack", 
+            "target": target.id, 
+            "target_name": target.name,
+            "damage": result["mechanics"].get("damage_amount", 0),
+            "type": result["mechanics"].get("damage_type", "None")
+        }
+
+    def _step_to(self, actor, to: tuple) -> Optional[Dict]:
+        # validations handled by resolver mostly, but bounds check implicit in resolver
+        start = (actor.x, actor.y)
+        result = self.resolver.resolve_move(actor.id, start, to, actor.ap)
+        if not result["success"]:
+            return None
+        actor.ap -= result["cost"]
+        actor.x, actor.y = to
+        return {
+            "action": "Move",
+            "from": start,
+            "to": to
+        }
+
+    def _is_occupied(self, x, y, tm: TurnManager) -> bool:
+        return any(tm.entities[eid].hp > 0 for eid in tm.spatial.at((x, y)))
+
     def _pick_best_skill(self, actor: EntityState, target: EntityState, dist: int):
         best_skill = None
         max_dmg = 0
@@ -167,18 +377,19 @@ class AIEngine:
             if not skill: continue
             
             # Check Costs
-            if actor.ap < skill.costs.ap: continue
-            if skill.costs.type == "stamina" and actor.stamina < skill.costs.resource: continue
-            if skill.costs.type == "focus" and actor.focus < skill.costs.resource: continue
+            if actor.ap < skill.costs.ap:
+                self.tracer.candidate(skill=skill_id, rejected="ap"); continue
+            if skill.costs.type == "stamina" and actor.stamina < skill.costs.resource:
+                self.tracer.candidate(skill=skill_id, rejected="stamina"); continue
+            if skill.costs.type == "focus" and actor.focus < skill.costs.resource:
+                self.tracer.candidate(skill=skill_id, rejected="focus"); continue
             
             # Check Range
-            if dist > skill.targeting.range: continue
+            if dist > skill.targeting.range:
+                self.tracer.candidate(skill=skill_id, rejected="range"); continue
             
-            # Estimate damage (Basic heuristic: Base + Scaling)
-            # This is duplicate of mechanics logic but needed for estimation
-            # Let's just trust Base Damage for now or use a heuristic
-            est_dmg = 5 
-            # In a real system, we'd query the mechanics engine for "Projected Damage"
+            est_dmg = self._estimate_skill_damage(actor, target, skill)
+            self.tracer.candidate(skill=skill_id, est_damage=est_dmg)
             
             if est_dmg > max_dmg:
                 max_dmg = est_dmg
@@ -186,20 +397,33 @@ class AIEngine:
                 
         return best_skill
 
-    def _find_nearest_target(self, actor: EntityState, tm: TurnManager) -> Optional[EntityState]:
-        # Iterate all entities, find one on different team
-        nearest = None
-        min_dist = 999
-        
-        my_pos = Point(actor.x, actor.y)
-        
-        for eid, entity in tm.entities.items():
-            if entity.team != actor.team and entity.hp > 0: # Check alive
-                # print(f"[AI] Found hostile: {entity.name} at ({entity.x}, {entity.y})")
-                other_pos = Point(entity.x, entity.y)
-                d = my_pos.distance(other_pos)
-                if d < min_dist:
-                    min_dist = d
-                    nearest = entity
-                    
-        return nearest
+    def _estimate_skill_damage(self, actor: EntityState, target: EntityState, skill) -> float:
+        """
+        Expected damage of a skill against this target, from the exact odds tables.
+        Mirrors AbilityResolver: effect dice replace the weapon roll when present.
+        """
+        effect_dmg = 0.0
+        for effect in skill.effects:
+            if effect.type == "Damage" or effect.type == "direct_damage":
+                if effect.amount_expr: effect_dmg += effect.amount_expr.mean(actor.stats)
+                if effect.dice_expr: effect_dmg += effect.dice_expr.mean(actor.stats) + effect.bonus
+        if effect_dmg > 0:
+            return effect_dmg
+
+        atk_stat, def_stat = self.ability_resolver.attack_stats(skill, actor, target)
+        return attack_odds(atk_stat, def_stat).expected_damage
+
+    def _expected_damage(self, actor: EntityState, target: EntityState) -> float:
+        """Best expected damage the actor can deal the target with an affordable skill or a basic attack (range aside)."""
+        # The basic attack always deals at least 1 Meat damage (ActionResolver.resolve_attack)
+        best = attack_odds(actor.stats.get('Might', 12), target.stats.get('Reflexes', 10), min_damage=1).expected_damage
+        for skill_id in actor.known_skills:
+            skill = DB.get(skill_id)
+            if not skill: continue
+            if skill.costs.type == "stamina" and actor.stamina < skill.costs.resource: continue
+            if skill.costs.type == "focus" and actor.focus < skill.costs.resource: continue
+            best = max(best, self._estimate_skill_damage(actor, target, skill))
+        return best
+
+    def _find_target(self, actor: EntityState, tm: TurnManager) -> Optional[EntityState]:
+        return self.groups.target_for(actor, tm)
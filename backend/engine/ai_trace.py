@@ -0,0 +1,157 @@
+import bisect
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+# Decision traces and stage timings for the AI.
+# Every AI decision (one process_turn call, one multi-tile advance, one planned step)
+# is timed per stage - target selection, skill evaluation, movement, planning - and
+# the timings feed per-stage histograms. That is a couple of perf_counter calls per
+# stage, cheap enough to leave on in production. With `enabled` (debug mode) each
+# decision also records a structured trace: the candidates it considered with their
+# scores, notes such as the chosen target, and the action taken. AIEngine attaches
+# that trace to the action dict, so it lands in the `ai_actions` payload.
+
+TIMING_BUCKETS_MS: Tuple[float, ...] = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 25.0, 50.0, 100.0, 250.0, 1000.0)
+
+class TimingHistogram:
+    def __init__(self, buckets: Tuple[float, ...] = TIMING_BUCKETS_MS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1) # Last one: above the largest bucket
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, ms: float):
+        self.counts[bisect.bisect_left(self.buckets, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-quantile (the max for the overflow bucket)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return min(self.buckets[i], self.max_ms) if i < len(self.buckets) else self.max_ms
+        return self.max_ms
+
+    def to_dict(self) -> Dict[str, Any]:
+        labels = [f"<={b:g}" for b in self.buckets] + [f">{self.buckets[-1]:g}"]
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 4) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 4),
+            "p50_ms": round(self.quantile(0.50), 4),
+            "p95_ms": round(self.quantile(0.95), 4),
+            "p99_ms": round(self.quantile(0.99), 4),
+            "buckets": {label: n for label, n in zip(labels, self.counts) if n},
+        }
+
+@dataclass
+class DecisionTrace:
+    actor_id: str
+    kind: str # turn | advance | planned_step
+    stages_ms: Dict[str, float] = field(default_factory=dict)
+    candidates: List[Dict[str, Any]] = field(default_factory=list)
+    notes: Dict[str, Any] = field(default_factory=dict)
+    chosen: Optional[Dict[str, Any]] = None
+    total_ms: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "actor_id": self.actor_id,
+            "kind": self.kind,
+            "stages_ms": {k: round(v, 4) for k, v in self.stages_ms.items()},
+            "candidates": self.candidates,
+            "notes": self.notes,
+            "chosen": self.chosen,
+            "total_ms": round(self.total_ms, 4),
+        }
+
+class _Stage:
+    """`with tracer.stage(name):` - a plain context manager; a generator one costs as much as a short stage."""
+    __slots__ = ("tracer", "name", "start")
+
+    def __init__(self, tracer: 'AITracer', name: str):
+        self.tracer = tracer
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc) -> bool:
+        self.tracer._stage_done(self.name, (time.perf_counter() - self.start) * 1000)
+        return False
+
+class AITracer:
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled # Structured per-decision traces; timings are always aggregated
+        self.histograms: Dict[str, TimingHistogram] = {}
+        self._lock = threading.Lock() # Planning stages also run on RoundPlanner's pool
+        self._local = threading.local()
+
+    @property
+    def active(self) -> bool:
+        """Whether the current decision is being traced (skip building candidate lists otherwise)."""
+        return getattr(self._local, "trace", None) is not None
+
+    def begin(self, actor: Any, kind: str = "turn"):
+        self._local.trace = DecisionTrace(actor.id, kind) if self.enabled else None
+        self._local.started = time.perf_counter()
+
+    def finish(self, chosen: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """Closes the current decision; returns its trace dict when tracing is on."""
+        started = getattr(self._local, "started", None)
+        if started is None:
+            return None
+        ms = (time.perf_counter() - started) * 1000
+        self._observe("decision", ms)
+        trace = self._local.trace
+        self._local.trace = self._local.started = None
+        if trace is None:
+            return None
+        trace.total_ms = ms
+        if chosen is not None:
+            trace.chosen = {k: v for k, v in chosen.items() if k != "trace"}
+        return trace.to_dict()
+
+    def stage(self, name: str) -> '_Stage':
+        return _Stage(self, name)
+
+    def _stage_done(self, name: str, ms: float):
+        self._observe(name, ms)
+        trace = getattr(self._local, "trace", None)
+        if trace is not None:
+            trace.stages_ms[name] = trace.stages_ms.get(name, 0.0) + ms
+
+    def candidate(self, **info):
+        trace = getattr(self._local, "trace", None)
+        if trace is not None:
+            trace.candidates.append(info)
+
+    def note(self, **info):
+        trace = getattr(self._local, "trace", None)
+        if trace is not None:
+            trace.notes.update(info)
+
+    def _observe(self, name: str, ms: float):
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = TimingHistogram()
+            histogram.observe(ms)
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {name: h.to_dict() for name, h in sorted(self.histograms.items())}
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
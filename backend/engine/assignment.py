@@ -0,0 +1,157 @@
+import math
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Group target assignment for AI teams.
+# Instead of every actor chasing its own nearest hostile (the whole group dog-piles
+# one player), all AI actors of a team are matched to targets in one go: candidates
+# come from the turn manager's hostile queries, each (actor, target) pair is costed
+#   distance - DAMAGE_WEIGHT * expected damage (capped at the target's HP) - KILL_BONUS if it likely kills
+# and a Hungarian solve picks the cheapest overall matching. Every target offers
+# ceil(actors / targets) slots, each later slot costing CROWD_PENALTY more, so the
+# group spreads out unless focusing fire is clearly better.
+# An assignment is reused (across turns and rounds) until a hostile moves more than
+# MOVE_TOLERANCE cells, someone's HP crosses a quarter band, or a unit dies / appears.
+
+CANDIDATE_RADIUS = 12 # Hostiles considered per actor (the nearest is always included)
+MOVE_TOLERANCE = 2
+DAMAGE_WEIGHT = 0.5 # Cells of detour one point of expected damage is worth
+KILL_BONUS = 4.0
+CROWD_PENALTY = 2.0
+NOT_CANDIDATE = 1000.0
+
+def hungarian(cost: List[List[float]]) -> List[int]:
+    """
+    Minimum-cost assignment of every row to a distinct column (rows <= columns), O(n^2 m).
+    Returns the column chosen for each row.
+    """
+    n = len(cost)
+    if n == 0:
+        return []
+    m = len(cost[0])
+    if n > m:
+        raise ValueError(f"hungarian: {n} rows but only {m} columns")
+    # Potentials / augmenting paths over 1-indexed rows and columns (column 0 is the virtual start)
+    u = [0.0] * (n + 1)
+    v = [0.0] * (m + 1)
+    match = [0] * (m + 1) # column -> row
+    way = [0] * (m + 1)
+    for row in range(1, n + 1):
+        match[0] = row
+        j0 = 0
+        minv = [math.inf] * (m + 1)
+        used = [False] * (m + 1)
+        while True:
+            used[j0] = True
+            i0, delta, j1 = match[j0], math.inf, 0
+            for j in range(1, m + 1):
+                if used[j]:
+                    continue
+                cur = cost[i0 - 1][j - 1] - u[i0] - v[j]
+                if cur < minv[j]:
+                    minv[j], way[j] = cur, j0
+                if minv[j] < delta:
+                    delta, j1 = minv[j], j
+            for j in range(m + 1):
+                if used[j]:
+                    u[match[j]] += delta
+                    v[j] -= delta
+                else:
+                    minv[j] -= delta
+            j0 = j1
+            if match[j0] == 0:
+                break
+        while j0:
+            j1 = way[j0]
+            match[j0] = match[j1]
+            j0 = j1
+    result = [0] * n
+    for j in range(1, m + 1):
+        if match[j]:
+            result[match[j] - 1] = j - 1
+    return result
+
+def _hp_band(entity: Any) -> int:
+    return 4 * max(0, entity.hp) // entity.max_hp if entity.max_hp > 0 else 0
+
+class _Assignment:
+    __slots__ = ("targets", "living", "marks")
+
+    def __init__(self, targets: Dict[str, str], living: frozenset, marks: Dict[str, Tuple[int, int, int]]):
+        self.targets = targets # actor id -> target id
+        self.living = living
+        self.marks = marks # id -> (x, y, hp band) when solved; positions only matter for hostiles
+
+class GroupAssigner:
+    def __init__(self, expected_damage: Callable[[Any, Any], float], radius: int = CANDIDATE_RADIUS,
+                 tolerance: int = MOVE_TOLERANCE):
+        self.expected_damage = expected_damage
+        self.radius = radius
+        self.tolerance = tolerance
+        self._cache: Dict[str, _Assignment] = {} # team -> assignment
+        self.solves = 0
+
+    def clear(self):
+        self._cache.clear()
+
+    def target_for(self, actor: Any, turn_manager: Any) -> Optional[Any]:
+        """The target assigned to the actor, re-solving the actor's team if the battle changed too much."""
+        assignment = self._cache.get(actor.team)
+        if assignment is None or actor.id not in assignment.targets or not self._fresh(assignment, actor.team, turn_manager):
+            assignment = self._solve(actor.team, turn_manager)
+        target = turn_manager.entities.get(assignment.targets.get(actor.id))
+        if target is None or target.hp <= 0:
+            return turn_manager.nearest_hostile(actor)
+        return target
+
+    def _fresh(self, assignment: _Assignment, team: str, turn_manager: Any) -> bool:
+        living = 0
+        for entity in turn_manager.entities.values():
+            if entity.hp <= 0:
+                continue
+            living += 1
+            mark = assignment.marks.get(entity.id)
+            if mark is None or mark[2] != _hp_band(entity):
+                return False
+            # Own team's moves are expected (they head for their targets)
+            if entity.team != team and abs(entity.x - mark[0]) + abs(entity.y - mark[1]) > self.tolerance:
+                return False
+        return living == len(assignment.living)
+
+    def _solve(self, team: str, turn_manager: Any) -> _Assignment:
+        self.solves += 1
+        living = [e for e in turn_manager.entities.values() if e.hp > 0]
+        actors = [e for e in living if e.team == team]
+        targets = [e for e in living if e.team != team]
+        assigned: Dict[str, str] = {}
+
+        if len(targets) == 1:
+            assigned = {a.id: targets[0].id for a in actors}
+        elif targets:
+            column = {t.id: i for i, t in enumerate(targets)}
+            slots = math.ceil(len(actors) / len(targets))
+            cost = []
+            for actor in actors:
+                base = [NOT_CANDIDATE] * len(targets)
+                candidates = turn_manager.hostiles_within(actor, self.radius)
+                nearest = turn_manager.nearest_hostile(actor)
+                if nearest is not None and nearest not in candidates:
+                    candidates.append(nearest)
+                for target in candidates:
+                    base[column[target.id]] = self._pair_cost(actor, target)
+                cost.append([base[t] + k * CROWD_PENALTY for k in range(slots) for t in range(len(targets))])
+            for actor, col in zip(actors, hungarian(cost)):
+                assigned[actor.id] = targets[col % len(targets)].id
+
+        marks = {e.id: (e.x, e.y, _hp_band(e)) for e in living}
+        assignment = _Assignment(assigned, frozenset(marks), marks)
+        self._cache[team] = assignment
+        print(f"[AI] Group targets for {team}: {assigned}")
+        return assignment
+
+    def _pair_cost(self, actor: Any, target: Any) -> float:
+        dist = abs(actor.x - target.x) + abs(actor.y - target.y)
+        damage = self.expected_damage(actor, target)
+        cost = dist - DAMAGE_WEIGHT * min(damage, target.hp)
+        if damage >= target.hp:
+            cost -= KILL_BONUS
+        return cost
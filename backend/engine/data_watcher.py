@@ -0,0 +1,96 @@
+import hashlib
+import os
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Polling file watcher for hot-reloading game data.
+# mtime/size are checked every poll; a file only counts as changed when its
+# content hash differs too (editors and git touch files without changing them).
+
+Callback = Callable[[List[str]], None]
+
+class _Watch:
+    __slots__ = ("path", "callback", "suffix", "seen")
+
+    def __init__(self, path: str, callback: Callback, suffix: str):
+        self.path = path
+        self.callback = callback
+        self.suffix = suffix
+        self.seen: Dict[str, Tuple[float, int, str]] = {} # file -> (mtime, size, sha1)
+
+    def files(self) -> List[str]:
+        if os.path.isdir(self.path):
+            return [os.path.join(self.path, f) for f in sorted(os.listdir(self.path)) if f.endswith(self.suffix)]
+        return [self.path] if os.path.exists(self.path) else []
+
+class DataWatcher:
+    def __init__(self, interval: float = 1.0):
+        self.interval = interval
+        self.watches: List[_Watch] = []
+        self.reloads = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def watch(self, path: str, callback: Callback, suffix: str = ".json"):
+        """Calls `callback(changed_paths)` when files at `path` (a file or a directory) change, appear or vanish."""
+        w = _Watch(path, callback, suffix)
+        self._scan(w) # Baseline: what is on disk now is what was loaded
+        self.watches.append(w)
+
+    def _scan(self, w: _Watch) -> List[str]:
+        changed = []
+        current = set()
+        for path in w.files():
+            current.add(path)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            old = w.seen.get(path)
+            if old and old[0] == st.st_mtime and old[1] == st.st_size:
+                continue
+            try:
+                with open(path, "rb") as f:
+                    digest = hashlib.sha1(f.read()).hexdigest()
+            except OSError:
+                continue
+            w.seen[path] = (st.st_mtime, st.st_size, digest)
+            if not old or old[2] != digest:
+                changed.append(path)
+        for path in list(w.seen):
+            if path not in current:
+                del w.seen[path]
+                changed.append(path)
+        return changed
+
+    def poll(self) -> int:
+        """One pass over every watch. Returns how many callbacks fired."""
+        fired = 0
+        for w in self.watches:
+            changed = self._scan(w)
+            if not changed:
+                continue
+            print(f"[DataWatcher] Changed: {[os.path.basename(p) for p in changed]}")
+            try:
+                w.callback(changed)
+                fired += 1
+            except Exception as e:
+                print(f"[DataWatcher] Reload failed for {w.path}: {e}")
+        self.reloads += fired
+        return fired
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="data-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval * 2)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.poll()
@@ -0,0 +1,135 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from backend.engine.abilities import DB
+from backend.engine.grid import terrain_cost
+from backend.engine.planner import Plan, PlannedAction
+
+# Memoized AI plans keyed by the actor's local situation.
+# Encounters keep producing the same picture: the same build, the same allies and
+# enemies at the same offsets, the same resources. The key canonicalizes that
+# picture relative to the actor: its own build and resources, every living unit
+# within `radius` as (offset, side, condition, build), and the passability of each
+# cell in the radius. Plans are stored relative to it too (moves as offsets,
+# targets as the index of the neighbor), so a hit replays anywhere on the map.
+# Situations with no hostile in the radius aren't cached: the plan then depends on
+# units further away. Entries carry the planner parameters, and the whole cache is
+# dropped when DB.version changes (ability data reloaded).
+#
+# Scope of the key: TurnPlanner.evaluate reads every unit on the map, not just the
+# radius. Units outside it only add terms no plan can change (their HP / Composure),
+# and the nearest-hostile distance it scores is one of the keyed units: there is one
+# within the radius, and a unit further out is DECISION_RADIUS + 1 away or more. The
+# one blind spot is a turn that walks far enough toward an unkeyed hostile that it
+# becomes the nearest; such a plan is replayed as if that unit weren't there.
+# Plans cut short by the time budget are not stored (AIEngine._search): the same
+# situation searched again may get deeper, and a shallow answer would stick.
+
+DECISION_RADIUS = 8
+DECISION_CACHE_SIZE = 4096
+
+Situation = Tuple[Hashable, List[str]] # (key, neighbor ids in canonical order)
+
+def _diamond(radius: int) -> Tuple[Tuple[int, int], ...]:
+    return tuple((dx, dy) for dx in range(-radius, radius + 1) for dy in range(-radius, radius + 1)
+                 if abs(dx) + abs(dy) <= radius)
+
+def _build(unit: Any) -> Tuple:
+    return (unit.max_hp, unit.max_composure, tuple(sorted(unit.stats.items())), tuple(unit.known_skills),
+            tuple(sorted(unit.status_effects)))
+
+class DecisionCache:
+    def __init__(self, maxsize: int = DECISION_CACHE_SIZE, radius: int = DECISION_RADIUS):
+        self.maxsize = maxsize
+        self.radius = radius
+        self._offsets = _diamond(radius)
+        self._entries: "OrderedDict[Hashable, Tuple[Tuple, float, int, bool]]" = OrderedDict()
+        self._lock = threading.Lock() # RoundPlanner plans on a thread pool
+        self._version = DB.version
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.uncacheable = 0
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def situation(self, actor: Any, units: Any, terrain_at: Callable[[int, int], Optional[str]],
+                  params: Hashable = None) -> Optional[Situation]:
+        """Canonical key of the actor's neighborhood, or None if it has no hostile in range (not cacheable)."""
+        ax, ay = actor.x, actor.y
+        near = []
+        hostile = False
+        for unit in units:
+            if unit.id == actor.id or unit.hp <= 0:
+                continue
+            dx, dy = unit.x - ax, unit.y - ay
+            if abs(dx) + abs(dy) > self.radius:
+                continue
+            ally = unit.team == actor.team
+            hostile = hostile or not ally
+            near.append(((dx, dy), ally, unit.hp, unit.composure, _build(unit), unit.id))
+        if not hostile:
+            self.uncacheable += 1
+            return None
+        near.sort(key=lambda n: n[0]) # One unit per cell: offsets order them uniquely
+        terrain = tuple(terrain_cost(terrain_at(ax + dx, ay + dy)) for dx, dy in self._offsets)
+        me = (actor.hp, actor.composure, actor.ap, actor.stamina, actor.max_stamina, actor.focus, actor.max_focus,
+              _build(actor))
+        key = (params, me, tuple(n[:5] for n in near), terrain)
+        return key, [n[5] for n in near]
+
+    def get(self, situation: Situation, actor: Any) -> Optional[Plan]:
+        key, ids = situation
+        with self._lock:
+            self._check_version()
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        actions, value, depth, timed_out = entry
+        return Plan([self._absolute(a, actor, ids) for a in actions], value, depth, 0, 0.0, timed_out)
+
+    def put(self, situation: Situation, actor: Any, plan: Plan):
+        key, ids = situation
+        index = {eid: i for i, eid in enumerate(ids)}
+        actions = []
+        for a in plan.actions:
+            if a.target is not None and a.target not in index:
+                return # Targets something outside the neighborhood: not replayable
+            actions.append(PlannedAction(a.kind, index.get(a.target), a.skill_id,
+                                         (a.to[0] - actor.x, a.to[1] - actor.y) if a.to is not None else None))
+        with self._lock:
+            self._check_version()
+            self._entries[key] = (tuple(actions), plan.value, plan.depth, plan.timed_out)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _absolute(self, action: PlannedAction, actor: Any, ids: List[str]) -> PlannedAction:
+        to = (actor.x + action.to[0], actor.y + action.to[1]) if action.to is not None else None
+        target = ids[action.target] if action.target is not None else None
+        return PlannedAction(action.kind, target, action.skill_id, to)
+
+    def _check_version(self):
+        # Caller holds the lock
+        if DB.version != self._version:
+            self._version = DB.version
+            self._entries.clear()
+
+    def metrics(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "uncacheable": self.uncacheable,
+        }
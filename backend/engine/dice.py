@@ -0,0 +1,38 @@
+from typing import Optional
+
+from backend.engine.rng import RNGStream
+
+class DiceEngine:
+    """
+    Rolls dice one at a time for gameplay or in large batches for Monte Carlo work.
+    Scalar rolls use the stream's stdlib Random (cheapest per call), batches its numpy Generator.
+    """
+    def __init__(self, seed: Optional[int] = None, rng: Optional[RNGStream] = None):
+        self.rng = rng or RNGStream(seed)
+        self.seed = seed if rng is None else rng.seed
+
+    @property
+    def generator(self):
+        return self.rng.generator
+
+    def roll(self, sides: int = 20, count: int = 1) -> int:
+        """Total of `count` dice with `sides` faces."""
+        rand = self.rng.random
+        if count == 1:
+            return int(rand() * sides) + 1
+        total = count
+        for _ in range(count):
+            total += int(rand() * sides)
+        return total
+
+    def roll_batch(self, sides: int = 20, count: int = 1, n: int = 1):
+        """
+        Rolls `n` independent totals of `count`d`sides`.
+        Returns a numpy int array (or a list when numpy is unavailable).
+        """
+        if self.generator is None:
+            return [self.roll(sides, count) for _ in range(n)]
+
+        if count == 1:
+            return self.rng.integers(1, sides + 1, size=n)
+        return self.rng.integers(1, sides + 1, size=(n, count)).sum(axis=1)
@@ -0,0 +1,241 @@
+import itertools
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple, Union
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Dice expression compiler.
+# Parses strings like "1d10", "2d6+3", "1d8+Might", "4d6kh3", "2d20kl1" or "Knowledge * 3"
+# once (at ability load) into DiceExpr objects that roll without any string handling.
+#
+#   expr   := ['+'|'-'] term (('+'|'-') term)*
+#   term   := factor ('*' factor)*          -- at most one non-constant factor
+#   factor := [N]dS[(kh|kl|k)K] | INT | StatName
+
+# Attribute names from stats_and_skills.json, plus Level for formulas like "Might + Level"
+STAT_NAMES = frozenset([
+    "Might", "Finesse", "Awareness", "Logic", "Intuition", "Charm",
+    "Endurance", "Reflexes", "Knowledge", "Fortitude", "Willpower", "Vitality",
+    "Level",
+])
+
+# Above this many outcomes the keep-highest/lowest mean is estimated by sampling
+_EXACT_KEEP_LIMIT = 200_000
+
+class DiceExpressionError(ValueError):
+    pass
+
+_TOKEN = re.compile(r"\s*(?:(?P<dice>(\d*)[dD](\d+)(?:(kh|kl|k)(\d+))?)|(?P<int>\d+)|(?P<name>[A-Za-z_]+)|(?P<op>[+\-*]))")
+
+class DiceTerm:
+    """sign * mult * (count d sides, optionally keeping the `keep` highest/lowest)."""
+    __slots__ = ("count", "sides", "keep", "keep_high", "scale", "_mean")
+
+    def __init__(self, count: int, sides: int, keep: Optional[int] = None, keep_high: bool = True, scale: int = 1):
+        self.count = count
+        self.sides = sides
+        self.keep = keep
+        self.keep_high = keep_high
+        self.scale = scale
+        self._mean = None
+
+    def roll(self, dice) -> int:
+        if self.keep is None:
+            return self.scale * dice.roll(self.sides, self.count)
+        rolls = sorted(dice.roll(self.sides) for _ in range(self.count))
+        kept = rolls[-self.keep:] if self.keep_high else rolls[:self.keep]
+        return self.scale * sum(kept)
+
+    def roll_batch(self, dice, n: int):
+        rolls = dice.rng.integers(1, self.sides + 1, size=(n, self.count))
+        if self.keep is None:
+            return self.scale * rolls.sum(axis=1)
+        rolls.sort(axis=1)
+        kept = rolls[:, -self.keep:] if self.keep_high else rolls[:, :self.keep]
+        return self.scale * kept.sum(axis=1)
+
+    def mean(self) -> float:
+        if self._mean is None:
+            if self.keep is None:
+                self._mean = self.count * (self.sides + 1) / 2
+            elif self.sides ** self.count <= _EXACT_KEEP_LIMIT:
+                total = 0
+                for combo in itertools.product(range(1, self.sides + 1), repeat=self.count):
+                    ordered = sorted(combo)
+                    total += sum(ordered[-self.keep:] if self.keep_high else ordered[:self.keep])
+                self._mean = total / self.sides ** self.count
+            else:
+                from backend.engine.dice import DiceEngine
+                sample = DiceEngine(seed=0)
+                self._mean = sum(DiceTerm(self.count, self.sides, self.keep, self.keep_high).roll(sample) for _ in range(20000)) / 20000
+        return self.scale * self._mean
+
+    def bounds(self) -> Tuple[int, int]:
+        n = self.count if self.keep is None else self.keep
+        lo, hi = n * self.scale, n * self.sides * self.scale
+        return (min(lo, hi), max(lo, hi))
+
+    def __repr__(self):
+        keep = f"{'kh' if self.keep_high else 'kl'}{self.keep}" if self.keep is not None else ""
+        return f"DiceTerm({self.scale}*{self.count}d{self.sides}{keep})"
+
+class DiceExpr:
+    """A compiled dice expression: dice terms + stat references + a constant."""
+    __slots__ = ("source", "terms", "stat_terms", "constant", "_plain")
+
+    def __init__(self, source: str, terms: List[DiceTerm], stat_terms: List[Tuple[str, int]], constant: int):
+        self.source = source
+        self.terms = tuple(terms)
+        self.stat_terms = tuple(stat_terms)
+        self.constant = constant
+        # Fast path for the common "NdS" / "NdS+K" shape
+        self._plain = None
+        if len(self.terms) == 1 and not self.stat_terms and self.terms[0].keep is None and self.terms[0].scale == 1:
+            self._plain = (self.terms[0].sides, self.terms[0].count)
+
+    def roll(self, dice, stats: Optional[Dict[str, int]] = None) -> int:
+        """One total. `dice` is a DiceEngine; `stats` resolves stat references (missing -> 0)."""
+        if self._plain is not None:
+            return dice.roll(*self._plain) + self.constant
+        total = self.constant
+        for term in self.terms:
+            total += term.roll(dice)
+        if self.stat_terms and stats:
+            for name, mult in self.stat_terms:
+                total += mult * stats.get(name, 0)
+        return total
+
+    def roll_batch(self, dice, n: int, stats: Optional[Dict[str, int]] = None):
+        """`n` independent totals as a numpy array (list without numpy)."""
+        if dice.generator is None:
+            return [self.roll(dice, stats) for _ in range(n)]
+        total = self.constant + self._stat_total(stats)
+        out = None
+        for term in self.terms:
+            part = term.roll_batch(dice, n)
+            out = part if out is None else out + part
+        if out is None:
+            return np.full(n, total)
+        return out + total
+
+    def _stat_total(self, stats: Optional[Dict[str, int]]) -> int:
+        if not self.stat_terms or not stats:
+            return 0
+        return sum(mult * stats.get(name, 0) for name, mult in self.stat_terms)
+
+    def mean(self, stats: Optional[Dict[str, int]] = None) -> float:
+        return self.constant + self._stat_total(stats) + sum(t.mean() for t in self.terms)
+
+    @property
+    def is_constant(self) -> bool:
+        return not self.terms and not self.stat_terms
+
+    def __repr__(self):
+        return f"DiceExpr({self.source!r})"
+
+    def __reduce__(self):
+        # Compiled expressions pickle by source and recompile on load
+        return (compile_dice, (self.source,))
+
+def _tokenize(source: str) -> List[Tuple[str, Union[str, Tuple]]]:
+    tokens = []
+    pos = 0
+    text = source.rstrip()
+    while pos < len(text):
+        m = _TOKEN.match(text, pos)
+        if not m or m.end() == pos:
+            raise DiceExpressionError(f"Unexpected character {text[pos:].strip()[:1]!r} in dice expression {source!r}")
+        if m.group("dice"):
+            count = int(m.group(2)) if m.group(2) else 1
+            sides = int(m.group(3))
+            keep = int(m.group(5)) if m.group(4) else None
+            keep_high = m.group(4) != "kl"
+            if count < 1 or sides < 1:
+                raise DiceExpressionError(f"Dice need at least one die and one face: {source!r}")
+            if keep is not None and not (1 <= keep <= count):
+                raise DiceExpressionError(f"Cannot keep {keep} of {count} dice: {source!r}")
+            tokens.append(("dice", (count, sides, keep, keep_high)))
+        elif m.group("int"):
+            tokens.append(("int", int(m.group("int"))))
+        elif m.group("name"):
+            tokens.append(("name", m.group("name")))
+        else:
+            tokens.append(("op", m.group("op")))
+        pos = m.end()
+    return tokens
+
+def _parse(source: str) -> DiceExpr:
+    tokens = _tokenize(source)
+    if not tokens:
+        raise DiceExpressionError("Empty dice expression")
+
+    terms: List[DiceTerm] = []
+    stat_terms: List[Tuple[str, int]] = []
+    constant = 0
+    i = 0
+    expect_term = True
+    sign = 1
+
+    while i < len(tokens):
+        kind, value = tokens[i]
+        if expect_term:
+            if kind == "op" and value in "+-" and i == 0:
+                sign = -1 if value == "-" else 1
+                i += 1
+                continue
+
+            # term := factor ('*' factor)*
+            scale = sign
+            variable = None
+            while True:
+                if i >= len(tokens):
+                    raise DiceExpressionError(f"Dangling operator in dice expression {source!r}")
+                kind, value = tokens[i]
+                if kind == "int":
+                    scale *= value
+                elif kind in ("dice", "name"):
+                    if variable is not None:
+                        raise DiceExpressionError(f"Cannot multiply two variable terms in {source!r}")
+                    if kind == "name" and value not in STAT_NAMES:
+                        raise DiceExpressionError(f"Unknown stat {value!r} in dice expression {source!r}")
+                    variable = (kind, value)
+                else:
+                    raise DiceExpressionError(f"Expected dice, number or stat in {source!r}")
+                i += 1
+                if i < len(tokens) and tokens[i] == ("op", "*"):
+                    i += 1
+                    continue
+                break
+
+            if variable is None:
+                constant += scale
+            elif variable[0] == "dice":
+                count, sides, keep, keep_high = variable[1]
+                terms.append(DiceTerm(count, sides, keep, keep_high, scale))
+            else:
+                stat_terms.append((variable[1], scale))
+            expect_term = False
+        else:
+            if kind != "op" or value not in "+-":
+                raise DiceExpressionError(f"Expected '+' or '-' in dice expression {source!r}")
+            sign = -1 if value == "-" else 1
+            expect_term = True
+            i += 1
+
+    if expect_term:
+        raise DiceExpressionError(f"Dangling operator in dice expression {source!r}")
+    return DiceExpr(source, terms, stat_terms, constant)
+
+@lru_cache(maxsize=4096)
+def _compile_cached(source: str) -> DiceExpr:
+    return _parse(source)
+
+def compile_dice(source: Union[str, int]) -> DiceExpr:
+    """Compiles (and caches) a dice expression. Raises DiceExpressionError if malformed."""
+    if isinstance(source, bool) or not isinstance(source, (str, int)):
+        raise DiceExpressionError(f"Dice expression must be a string or int, got {source!r}")
+    return _compile_cached(str(source).strip())
@@ -0,0 +1,262 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Effect pipeline compiler.
+# Each ability is turned into a tuple of bound handler steps once (at load / first use),
+# so casting is a loop over callables instead of string comparisons per effect.
+# New effect types plug in by registering a handler factory:
+#
+#   @effect_handler("my_effect")
+#   def _my_effect(effect):
+#       amount = effect.amount_expr        # pre-resolve everything here...
+#       def step(ctx):                      # ...so the step only does the work
+#           ctx.healing += amount.roll(ctx.dice, ctx.attacker.stats)
+#       return step
+
+Step = Callable[['EffectContext'], None]
+HandlerFactory = Callable[[Any], Optional[Step]]
+
+EFFECT_HANDLERS: Dict[str, HandlerFactory] = {}
+
+def effect_handler(*effect_types: str):
+    """Registers a factory that turns an Effect into a step for the given effect type names."""
+    def register(factory: HandlerFactory) -> HandlerFactory:
+        for t in effect_types:
+            EFFECT_HANDLERS[t] = factory
+        return factory
+    return register
+
+class EffectContext:
+    """Mutable state threaded through one cast's steps."""
+    __slots__ = ("attacker", "target", "dice", "mechanics", "total_damage", "damage_type",
+                 "applied_statuses", "status_durations", "removed_statuses", "healing", "composure_damage", "displacements", "rolls")
+
+    def __init__(self, attacker: Any, target: Any, dice: Any, mechanics: Dict[str, Any]):
+        self.attacker = attacker
+        self.target = target
+        self.dice = dice # DiceEngine
+        self.mechanics = mechanics # resolve_attack result for this cast
+        self.total_damage = 0
+        self.damage_type = "Meat"
+        self.applied_statuses: List[str] = []
+        self.status_durations: Dict[str, Any] = {} # status id -> effect duration (rounds / "scene")
+        self.removed_statuses: List[str] = []
+        self.healing = 0
+        self.composure_damage = 0
+        self.displacements: List[Dict[str, Any]] = []
+        self.rolls: List[Dict[str, Any]] = [] # Saves and contests, for the log
+
+class CompiledAbility:
+    __slots__ = ("ability", "steps", "self_steps", "unsupported")
+
+    def __init__(self, ability: Any, steps: Tuple[Step, ...], unsupported: Tuple[str, ...],
+                 self_steps: Tuple[Step, ...] = ()):
+        self.ability = ability
+        self.steps = steps
+        self.self_steps = self_steps # Effects with `target: "self"`: once per cast, on the caster
+        self.unsupported = unsupported # Effect types with no registered handler
+
+    def run(self, ctx: EffectContext) -> EffectContext:
+        for step in self.steps:
+            step(ctx)
+        return ctx
+
+    def run_self(self, ctx: EffectContext) -> EffectContext:
+        """Runs the caster's own steps; `ctx.target` is the caster."""
+        for step in self.self_steps:
+            step(ctx)
+        return ctx
+
+def compile_ability(ability: Any) -> CompiledAbility:
+    steps = []
+    self_steps = []
+    unsupported = []
+    for effect in ability.effects:
+        factory = EFFECT_HANDLERS.get(effect.type)
+        if factory is None:
+            unsupported.append(effect.type)
+            continue
+        step = factory(effect)
+        if step is None:
+            continue
+        recipients = getattr(effect, "target", None)
+        if recipients == "self":
+            self_steps.append(step)
+        else:
+            steps.append(_for_recipients(step, recipients))
+    return CompiledAbility(ability, tuple(steps), tuple(unsupported), tuple(self_steps))
+
+def _for_recipients(step: Step, recipients: Optional[str]) -> Step:
+    """Restricts a step to allies / enemies (legacy effect `target` field)."""
+    if recipients not in ("ally", "enemy"):
+        return step
+
+    def filtered(ctx: EffectContext):
+        same_team = ctx.target.team == ctx.attacker.team
+        if same_team if recipients == "ally" else not same_team:
+            step(ctx)
+    return filtered
+
+# --- Shared helpers ---
+
+def _save_check(ctx: EffectContext, effect: Any, save_stat: str, dc: Optional[int], contest: Optional[str]) -> bool:
+    """
+    Target's d20 + save stat vs a fixed DC, or vs the caster's d20 + stat when contested.
+    Returns True if the target resists.
+    """
+    save = ctx.dice.roll(20) + ctx.target.stats.get(save_stat, 10)
+    if contest or dc is None:
+        against = ctx.dice.roll(20) + ctx.attacker.stats.get(save_stat, 10)
+    else:
+        against = dc
+    resisted = save >= against
+    ctx.rolls.append({"effect": effect.type, "stat": save_stat, "roll": save, "against": against, "resisted": resisted})
+    return resisted
+
+def _step_away(origin: Tuple[int, int], mover: Tuple[int, int]) -> Tuple[int, int]:
+    """Unit step moving `mover` away from `origin` along the dominant axis."""
+    dx = mover[0] - origin[0]
+    dy = mover[1] - origin[1]
+    if dx == 0 and dy == 0:
+        return (1, 0)
+    if abs(dx) >= abs(dy):
+        return (1 if dx > 0 else -1, 0)
+    return (0, 1 if dy > 0 else -1)
+
+def _displace(ctx: EffectContext, entity: Any, away_from: Any, distance: int, toward: bool = False):
+    step = _step_away((away_from.x, away_from.y), (entity.x, entity.y))
+    if toward:
+        step = (-step[0], -step[1])
+    path = [(entity.x + step[0] * i, entity.y + step[1] * i) for i in range(1, distance + 1)]
+    ctx.displacements.append({"entity_id": entity.id, "from": (entity.x, entity.y), "path": path})
+
+# --- Handlers ---
+
+@effect_handler("Damage", "direct_damage", "aoe_damage")
+def _damage(effect):
+    amount = effect.amount_expr
+    dice = effect.dice_expr
+    bonus = effect.bonus
+    # Legacy damage_type ("physical", "elemental", ...) is flavour; it all lands on HP
+    dmg_type = effect.dmg_type or "Meat"
+
+    def step(ctx: EffectContext):
+        stats = ctx.attacker.stats
+        if amount:
+            ctx.total_damage += amount.roll(ctx.dice, stats)
+        if dice:
+            ctx.total_damage += dice.roll(ctx.dice, stats) + bonus
+        ctx.damage_type = dmg_type
+    return step
+
+@effect_handler("aoe_damage_roll")
+def _damage_roll(effect):
+    amount = effect.amount_expr
+    if not amount:
+        return None
+    save_stat = effect.save_stat or "Reflexes"
+    dc = effect.dc
+    contest = effect.contest
+
+    def step(ctx: EffectContext):
+        # A successful save halves the damage
+        dmg = max(0, amount.roll(ctx.dice, ctx.attacker.stats))
+        if _save_check(ctx, effect, save_stat, dc, contest):
+            dmg //= 2
+        ctx.total_damage += dmg
+        ctx.damage_type = "Meat"
+    return step
+
+@effect_handler("apply_status", "Status", "apply_status_target", "aoe_status", "aoe_status_apply")
+def _apply_status(effect):
+    status_id = effect.status or effect.status_id
+    if not status_id:
+        return None
+    duration = effect.duration
+
+    def step(ctx: EffectContext):
+        ctx.applied_statuses.append(status_id)
+        ctx.status_durations[status_id] = duration
+    return step
+
+@effect_handler("remove_status", "aoe_remove_status")
+def _remove_status(effect):
+    status_id = effect.status or effect.status_id
+    if not status_id:
+        return None
+
+    def step(ctx: EffectContext):
+        ctx.removed_statuses.append(status_id)
+    return step
+
+@effect_handler("apply_status_roll", "aoe_status_roll")
+def _apply_status_roll(effect):
+    status_id = effect.status or effect.status_id
+    if not status_id:
+        return None
+    save_stat = effect.save_stat or "Willpower"
+    dc = effect.dc
+    contest = effect.contest
+    duration = effect.duration
+
+    def step(ctx: EffectContext):
+        if not _save_check(ctx, effect, save_stat, dc, contest):
+            ctx.applied_statuses.append(status_id)
+            ctx.status_durations[status_id] = duration
+    return step
+
+@effect_handler("move_target_roll", "aoe_move")
+def _move_target_roll(effect):
+    distance = effect.distance or 1
+    save_stat = effect.save_stat or "Might"
+    dc = effect.dc
+    contest = effect.contest
+    toward = effect.direction == "toward"
+
+    def step(ctx: EffectContext):
+        if not _save_check(ctx, effect, save_stat, dc, contest):
+            _displace(ctx, ctx.target, ctx.attacker, distance, toward)
+    return step
+
+@effect_handler("move_self")
+def _move_self(effect):
+    distance = effect.distance or 1
+    toward = effect.direction == "toward"
+
+    def step(ctx: EffectContext):
+        if ctx.target is not ctx.attacker:
+            _displace(ctx, ctx.attacker, ctx.target, distance, toward)
+    return step
+
+@effect_handler("heal", "aoe_heal")
+def _heal(effect):
+    amount = effect.amount_expr
+    if not amount:
+        return None
+
+    def step(ctx: EffectContext):
+        ctx.healing += max(0, amount.roll(ctx.dice, ctx.attacker.stats))
+    return step
+
+@effect_handler("composure_damage", "aoe_composure_damage")
+def _composure_damage(effect):
+    amount = effect.amount_expr
+    if not amount:
+        return None
+
+    def step(ctx: EffectContext):
+        ctx.composure_damage += max(0, amount.roll(ctx.dice, ctx.attacker.stats))
+    return step
+
+@effect_handler("composure_damage_roll", "aoe_composure_damage_roll")
+def _composure_damage_roll(effect):
+    amount = effect.amount_expr
+    if not amount:
+        return None
+    save_stat = effect.save_stat or "Willpower"
+    dc = effect.dc
+    contest = effect.contest
+
+    def step(ctx: EffectContext):
+        if not _save_check(ctx, effect, save_stat, dc, contest):
+            ctx.composure_damage += max(0, amount.roll(ctx.dice, ctx.attacker.stats))
+    return step
@@ -0,0 +1,166 @@
+from typing import Any, Dict, List, Optional
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from backend.engine.turn_manager import OBSERVED_FIELDS, EntityState
+
+# Struct-of-arrays entity storage for large battles (swarms, simulations).
+# Hot numeric fields live in contiguous numpy arrays indexed by slot; everything
+# else (name, stats, skills, statuses, ...) stays in a per-slot dict. Engine code
+# keeps using attribute access through EntityProxy, and EntityState is only
+# materialized at the API boundary (to_state / TurnManager.entity_states).
+# Opt-in: TurnManager(store=EntityStore()).
+
+HOT_FIELDS = ("hp", "max_hp", "ap", "stamina", "max_stamina", "focus", "max_focus",
+              "composure", "max_composure", "x", "y", "initiative")
+
+class EntityProxy:
+    """Looks like an EntityState to engine code; reads and writes go to the store's arrays."""
+    __slots__ = ("_store", "_slot", "id", "_observer")
+
+    def __init__(self, store: 'EntityStore', slot: int, entity_id: str):
+        object.__setattr__(self, "_store", store)
+        object.__setattr__(self, "_slot", slot)
+        object.__setattr__(self, "id", entity_id)
+        object.__setattr__(self, "_observer", None)
+
+    def __getattr__(self, name):
+        store = self._store
+        column = store.columns.get(name)
+        if column is not None:
+            return int(column[self._slot])
+        if name == "team":
+            return store.team_names[store.team[self._slot]]
+        try:
+            return store.cold[self._slot][name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __setattr__(self, name, value):
+        if name == "_observer":
+            object.__setattr__(self, name, value)
+            return
+        store = self._store
+        observer = self._observer if name in OBSERVED_FIELDS else None
+        old = getattr(self, name) if observer else None
+        column = store.columns.get(name)
+        if column is not None:
+            column[self._slot] = value
+        elif name == "team":
+            store.team[self._slot] = store.team_code(value)
+        else:
+            store.cold[self._slot][name] = value
+        if observer and old != value:
+            observer(self, name, old)
+
+    def to_state(self) -> EntityState:
+        return self._store.to_state(self._slot)
+
+    def __repr__(self):
+        return f"EntityProxy({self.id!r}, hp={self.hp}, pos=({self.x}, {self.y}))"
+
+class EntityStore:
+    def __init__(self, capacity: int = 64):
+        if np is None:
+            raise ImportError("EntityStore needs numpy")
+        self.capacity = max(1, capacity)
+        self.size = 0
+        self.columns: Dict[str, Any] = {f: np.zeros(self.capacity, dtype=np.int32) for f in HOT_FIELDS}
+        self.team = np.zeros(self.capacity, dtype=np.int16)
+        self.team_names: List[str] = []
+        self._team_codes: Dict[str, int] = {}
+        self.cold: List[Dict[str, Any]] = []
+        self.index: Dict[str, int] = {} # id -> slot
+        self.proxies: List[EntityProxy] = []
+
+    def __len__(self) -> int:
+        return self.size
+
+    def team_code(self, team: str) -> int:
+        code = self._team_codes.get(team)
+        if code is None:
+            code = self._team_codes[team] = len(self.team_names)
+            self.team_names.append(team)
+        return code
+
+    def _grow(self):
+        self.capacity *= 2
+        for name, column in self.columns.items():
+            grown = np.zeros(self.capacity, dtype=column.dtype)
+            grown[:self.size] = column[:self.size]
+            self.columns[name] = grown
+        team = np.zeros(self.capacity, dtype=self.team.dtype)
+        team[:self.size] = self.team[:self.size]
+        self.team = team
+
+    def add(self, entity: EntityState) -> EntityProxy:
+        """Stores an entity (replacing one with the same id) and returns its proxy."""
+        slot = self.index.get(entity.id)
+        if slot is None:
+            if self.size == self.capacity:
+                self._grow()
+            slot = self.size
+            self.size += 1
+            self.index[entity.id] = slot
+            self.cold.append({})
+            self.proxies.append(EntityProxy(self, slot, entity.id))
+        data = entity.model_dump()
+        for name in HOT_FIELDS:
+            self.columns[name][slot] = data.pop(name)
+        self.team[slot] = self.team_code(data.pop("team"))
+        data.pop("id")
+        self.cold[slot] = data
+        return self.proxies[slot]
+
+    def get(self, entity_id: str) -> Optional[EntityProxy]:
+        slot = self.index.get(entity_id)
+        return self.proxies[slot] if slot is not None else None
+
+    def clear(self):
+        self.size = 0
+        self.cold.clear()
+        self.index.clear()
+        self.proxies.clear()
+
+    def to_state(self, slot: int) -> EntityState:
+        data = dict(self.cold[slot])
+        for name in HOT_FIELDS:
+            data[name] = int(self.columns[name][slot])
+        data["team"] = self.team_names[self.team[slot]]
+        data["id"] = self.proxies[slot].id
+        return EntityState(**data)
+
+    # --- Vectorized queries ---
+
+    def _mask(self, team: Optional[str] = None, exclude_team: Optional[str] = None, living: bool = True):
+        n = self.size
+        mask = np.ones(n, dtype=bool)
+        if living:
+            mask &= self.columns["hp"][:n] > 0
+        if team is not None:
+            mask &= self.team[:n] == self._team_codes.get(team, -1)
+        if exclude_team is not None:
+            mask &= self.team[:n] != self._team_codes.get(exclude_team, -1)
+        return mask
+
+    def distances(self, x: int, y: int):
+        n = self.size
+        return np.abs(self.columns["x"][:n] - x) + np.abs(self.columns["y"][:n] - y)
+
+    def within(self, x: int, y: int, radius: int, team: Optional[str] = None,
+               exclude_team: Optional[str] = None, living: bool = True) -> List[EntityProxy]:
+        """Entities within Manhattan `radius` of (x, y), in insertion order."""
+        mask = self._mask(team, exclude_team, living) & (self.distances(x, y) <= radius)
+        return [self.proxies[i] for i in np.flatnonzero(mask)]
+
+    def nearest(self, x: int, y: int, team: Optional[str] = None,
+                exclude_team: Optional[str] = None, living: bool = True) -> Optional[EntityProxy]:
+        """Closest matching entity (first inserted on ties), or None."""
+        mask = self._mask(team, exclude_team, living)
+        if not mask.any():
+            return None
+        dist = np.where(mask, self.distances(x, y), np.iinfo(np.int32).max)
+        return self.proxies[int(np.argmin(dist))]
@@ -1,7 +1,78 @@
-from typing import List, Tuple, Dict
+from typing import List, Tuple, Dict, Optional
 from dataclasses import dataclass
+import itertools
 import math
 
+# ProcGen tile data: movement cost of entering each tile type. ProcGen stamps these into
+# its map metadata and pathing (influence maps, planner) reads them here, so the two
+# can't disagree. Every tile on the map is enterable; Water is just very expensive.
+# The AP price of a move action is still set by ActionResolver.
+TILE_MOVEMENT_COSTS: Dict[str, int] = {
+    "Void": 1,
+    "Grass": 1,
+    "Stone": 1,
+    "Sand": 2,
+    "Forest": 2,
+    "Rubble": 2,
+    "Mountain": 3,
+    "Water": 99,
+}
+
+def terrain_cost(tile: Optional[str]) -> Optional[int]:
+    """Cost of entering a tile type (unknown types cost 1); None off the map."""
+    if tile is None:
+        return None
+    return TILE_MOVEMENT_COSTS.get(tile, 1)
+
+_TERRAIN_VERSIONS = itertools.count(1)
+
+class TerrainCells(dict):
+    """
+    (x, y) -> tile dict that stamps a new `version` on every write, so caches built from
+    the terrain (influence.GridLayout) can check for changes without hashing the map.
+    Versions are unique across instances: replacing GridManager.cells also invalidates.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.version = next(_TERRAIN_VERSIONS)
+
+    def _touch(self):
+        self.version = next(_TERRAIN_VERSIONS)
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._touch()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._touch()
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self._touch()
+
+    def setdefault(self, key, default=None):
+        value = super().setdefault(key, default)
+        self._touch()
+        return value
+
+    def pop(self, *args):
+        value = super().pop(*args)
+        self._touch()
+        return value
+
+    def popitem(self):
+        item = super().popitem()
+        self._touch()
+        return item
+
+    def clear(self):
+        super().clear()
+        self._touch()
+
+NEIGHBOR_OFFSETS = ((0, 1), (1, 0), (0, -1), (-1, 0))
+
 @dataclass(frozen=True)
 class Point:
     x: int
@@ -19,22 +90,42 @@ class Point:
     
     def neighbors(self) -> List['Point']:
         # 4-Way neighbors (No diagonals for simple grid)
-        directions = [
-            Point(0, 1), Point(1, 0), Point(0, -1), Point(-1, 0)
-        ]
-        return [self + d for d in directions]
+        return [Point(self.x + dx, self.y + dy) for dx, dy in NEIGHBOR_OFFSETS]
 
 class GridManager:
     def __init__(self, radius: int = 10):
         self.radius = radius
-        self.cells: Dict[Tuple[int, int], str] = {} # (x, y) -> biome/type
+        self.cells = {} # (x, y) -> biome/type
+
+    @property
+    def cells(self) -> TerrainCells:
+        return self._cells
+
+    @cells.setter
+    def cells(self, cells: Dict[Tuple[int, int], str]):
+        self._cells = TerrainCells(cells)
+
+    @property
+    def terrain_version(self) -> int:
+        """Changes whenever any tile is written (or the map is replaced)."""
+        return self._cells.version
     
     def generate_empty_map(self):
         """Generates a square map of given radius centered at 0,0"""
-        # Generates from -radius to +radius
-        for x in range(-self.radius, self.radius + 1):
-            for y in range(-self.radius, self.radius + 1):
-                self.cells[(x, y)] = "Void"
+        # Generates from -radius to +radius (one update: a single terrain version bump)
+        span = range(-self.radius, self.radius + 1)
+        self.cells.update({(x, y): "Void" for x in span for y in span})
 
     def is_in_bounds(self, p: Point) -> bool:
         return (p.x, p.y) in self.cells
+
+    def move_cost(self, p: Point) -> Optional[int]:
+        return terrain_cost(self.cells.get((p.x, p.y)))
+
+    def is_passable(self, p: Point) -> bool:
+        return self.move_cost(p) is not None
+
+    def passable_neighbors(self, x: int, y: int) -> List[Tuple[int, int]]:
+        """4-way neighbor cells that are passable (is_passable over Point.neighbors, without the Points)."""
+        cells = self.cells
+        return [(x + dx, y + dy) for dx, dy in NEIGHBOR_OFFSETS if cells.get((x + dx, y + dy)) is not None]
@@ -0,0 +1,464 @@
+import heapq
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from backend.engine.abilities import DB, Ability
+from backend.engine.grid import terrain_cost
+from backend.engine.targeting import Cell
+from backend.engine.turn_manager import TURN_AP
+
+# Influence maps for AI positioning.
+# Every living unit gets a terrain-aware distance field (Dijkstra over grid.TILE_MOVEMENT_COSTS)
+# from its cell. Its influence is the area it can reach and hit this turn: full
+# strength (rising towards the unit) out to its move allowance + attack range,
+# fading to zero over THREAT_FALLOFF more cells. Per-team sums give
+#   threat(cell, team)  - influence of every other team
+#   support(cell, team) - influence of the team's own units
+#   reach(cell, team)   - fewest movement points any unit of the team needs to get there
+#                         (INF past the units' threat horizons)
+# all sampled in O(1). Layers are numpy arrays (Python lists without numpy).
+# update() is incremental: the layers carry over from turn to turn and round to round,
+# units that did not move keep their distance fields, and only their teams' layers are
+# adjusted; a terrain change (GridManager.terrain_version) rebuilds everything.
+# A unit's field depends only on the map and its cell, so fields (and their unweighted
+# falloff) are kept on the shared GridLayout: later turns and later battles on the same
+# map look them up. Missing ones are computed together, by a numpy relaxation over the
+# whole batch at once (a Dijkstra per unit without numpy).
+
+INF = float("inf")
+THREAT_FALLOFF = 3
+TOWARD_CACHE = 64 # Shared per-goal path fields kept between turns
+LAYOUT_CACHE = 8 # Layouts of recently seen maps (simulated battles reuse the same few)
+FIELD_CACHE = 2048 # Unit distance fields / falloff shapes kept per layout
+
+_layouts: "OrderedDict[Tuple[Tuple[Cell, str], ...], GridLayout]" = OrderedDict()
+_layouts_by_version: "OrderedDict[int, GridLayout]" = OrderedDict() # TerrainCells.version -> layout
+
+class GridLayout:
+    """Flat indexing over the grid's bounding box, with the cost of entering each cell (INF off the map)."""
+
+    def __init__(self, cells: Dict[Cell, str]):
+        xs = [c[0] for c in cells] or [0]
+        ys = [c[1] for c in cells] or [0]
+        self.x0, self.y0 = min(xs), min(ys)
+        self.width = max(xs) - self.x0 + 1
+        self.height = max(ys) - self.y0 + 1
+        self.size = self.width * self.height
+        self.costs: List[float] = [INF] * self.size
+        for (x, y), tile in cells.items():
+            cost = terrain_cost(tile)
+            if cost is not None:
+                self.costs[self.index(x, y)] = cost
+        self.neighbors: List[Tuple[int, ...]] = [self._neighbors(i) for i in range(self.size)]
+        self.fields: Dict[Tuple[int, float], Any] = {} # (source index, limit) -> distance field
+        self.shapes: Dict[Tuple[int, int], Any] = {} # (source index, reach) -> unweighted falloff
+        self.paths: "OrderedDict[Tuple[Cell, FrozenSet[Cell]], PathField]" = OrderedDict() # terrain-only toward() fields
+        # Padded (width + 2, height + 2) cost grid for the numpy relaxation; INF border
+        self.cost_grid = None
+        if np is not None:
+            self.cost_grid = np.full((self.width + 2, self.height + 2), INF)
+            self.cost_grid[1:-1, 1:-1] = np.asarray(self.costs).reshape(self.width, self.height)
+
+    def index(self, x: int, y: int) -> Optional[int]:
+        ix, iy = x - self.x0, y - self.y0
+        if 0 <= ix < self.width and 0 <= iy < self.height:
+            return ix * self.height + iy
+        return None
+
+    def cell(self, i: int) -> Cell:
+        return (self.x0 + i // self.height, self.y0 + i % self.height)
+
+    def _neighbors(self, i: int) -> Tuple[int, ...]:
+        x, y = self.cell(i)
+        out = []
+        for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+            j = self.index(nx, ny)
+            if j is not None and self.costs[j] < INF:
+                out.append(j)
+        return tuple(out)
+
+def layout_for(cells: Dict[Cell, str]) -> "GridLayout":
+    """Shared GridLayout for a map's contents (read-only once built)."""
+    # A TerrainCells version names its exact contents: no need to hash the map again
+    version = getattr(cells, "version", None)
+    layout = _layouts_by_version.get(version) if version is not None else None
+    if layout is not None:
+        return layout
+    key = tuple(cells.items())
+    layout = _layouts.get(key)
+    if layout is None:
+        layout = _layouts[key] = GridLayout(cells)
+        if len(_layouts) > LAYOUT_CACHE:
+            _layouts.popitem(last=False)
+    else:
+        _layouts.move_to_end(key)
+    if version is not None:
+        _layouts_by_version[version] = layout
+        if len(_layouts_by_version) > LAYOUT_CACHE:
+            _layouts_by_version.popitem(last=False)
+    return layout
+
+def distance_field(layout: GridLayout, sources: Iterable[Cell], blocked: Iterable[Cell] = (),
+                   limit: float = INF, stop_at: Optional[Cell] = None) -> List[float]:
+    """
+    Cheapest cost (sum of entered cells' costs) from any source to every cell; INF where
+    unreachable or beyond `limit`. With `stop_at`, the search ends once that cell is settled
+    (every cell closer than it is final by then).
+    """
+    dist = [INF] * layout.size
+    closed: Set[int] = set()
+    for x, y in blocked:
+        j = layout.index(x, y)
+        if j is not None:
+            closed.add(j)
+    heap = []
+    for x, y in sources:
+        i = layout.index(x, y)
+        if i is not None:
+            dist[i] = 0.0
+            heap.append((0.0, i))
+            closed.discard(i)
+    stop = layout.index(*stop_at) if stop_at is not None else None
+    costs, neighbors = layout.costs, layout.neighbors
+    if limit < INF and stop is None:
+        # Bounded search (unit threat horizons): costs are whole numbers, so a bucket per
+        # distance replaces the heap
+        buckets: List[List[int]] = [[] for _ in range(int(limit) + 1)]
+        buckets[0] = [i for _, i in heap]
+        for d, bucket in enumerate(buckets):
+            for i in bucket:
+                if dist[i] != d:
+                    continue
+                for j in neighbors[i]:
+                    nd = d + costs[j]
+                    if nd < dist[j] and nd <= limit and j not in closed:
+                        dist[j] = nd
+                        buckets[int(nd)].append(j)
+        return dist
+    heapq.heapify(heap)
+    while heap:
+        d, i = heapq.heappop(heap)
+        if d > dist[i]:
+            continue
+        if i == stop:
+            break
+        for j in neighbors[i]:
+            if j in closed:
+                continue
+            nd = d + costs[j]
+            if nd < dist[j] and nd <= limit:
+                dist[j] = nd
+                heapq.heappush(heap, (nd, j))
+    return dist
+
+def _relax(layout: GridLayout, sources: List[int], limit: float):
+    """
+    Distance fields from each source index at once (numpy): every step relaxes all cells of
+    all fields against their four neighbors. Entered-cell costs are whole numbers >= 1, so
+    a path within `limit` has at most `limit` steps; it stops early once nothing improves.
+    """
+    w, h = layout.width, layout.height
+    dist = np.full((len(sources), w + 2, h + 2), INF)
+    for n, i in enumerate(sources):
+        dist[n, 1 + i // h, 1 + i % h] = 0.0
+    inner = dist[:, 1:-1, 1:-1]
+    costs = layout.cost_grid[1:-1, 1:-1]
+    for _ in range(int(min(limit, layout.size))):
+        step = np.minimum(np.minimum(dist[:, :-2, 1:-1], dist[:, 2:, 1:-1]),
+                          np.minimum(dist[:, 1:-1, :-2], dist[:, 1:-1, 2:]))
+        step += costs
+        better = step < inner
+        if not better.any():
+            break
+        np.copyto(inner, step, where=better)
+    fields = inner.reshape(len(sources), layout.size)
+    fields[fields > limit] = INF
+    return fields
+
+def unit_fields(layout: GridLayout, cells: List[Cell], limit: float) -> List[Any]:
+    """Distance fields (see distance_field) from each cell, from the layout's cache or computed as one batch."""
+    keys = [(layout.index(x, y), limit) for x, y in cells]
+    missing = sorted({key[0] for key in keys if key not in layout.fields and key[0] is not None})
+    if missing:
+        if np is not None:
+            computed = _relax(layout, missing, limit)
+        else:
+            computed = [distance_field(layout, [layout.cell(i)], limit=limit) for i in missing]
+        if len(layout.fields) + len(missing) > FIELD_CACHE:
+            layout.fields.clear()
+        for i, field in zip(missing, computed):
+            layout.fields[(i, limit)] = field
+    unreachable = None
+    out = []
+    for key in keys:
+        if key[0] is None:
+            if unreachable is None:
+                unreachable = _minimum([], layout.size) # Off the map: influences nothing
+            out.append(unreachable)
+        else:
+            out.append(layout.fields[key])
+    return out
+
+class PathField:
+    """
+    Distance field to a goal that is searched lazily: the Dijkstra frontier is kept, and
+    settle(cell) only resumes it until that cell is final. Every cell cheaper than a
+    settled one is final too, so walking downhill from a settled cell never reads a
+    provisional value. Later movers further out extend the same search. `blocked` cells
+    (units in the way) are never entered.
+    """
+
+    def __init__(self, layout: GridLayout, goal: Cell, blocked: Iterable[Cell] = ()):
+        self.layout = layout
+        self.dist = [INF] * layout.size
+        self._settled: Set[int] = {j for j in (layout.index(x, y) for x, y in blocked) if j is not None}
+        self._heap: List[Tuple[float, int]] = []
+        i = layout.index(*goal)
+        if i is not None:
+            self.dist[i] = 0.0
+            self._heap.append((0.0, i))
+
+    def settle(self, cell: Cell) -> List[float]:
+        target = self.layout.index(*cell)
+        if target is None or target in self._settled:
+            return self.dist
+        dist, heap, settled = self.dist, self._heap, self._settled
+        costs, neighbors = self.layout.costs, self.layout.neighbors
+        while heap:
+            d, i = heapq.heappop(heap)
+            if i in settled:
+                continue
+            settled.add(i)
+            for j in neighbors[i]:
+                nd = d + costs[j]
+                if nd < dist[j]:
+                    dist[j] = nd
+                    heapq.heappush(heap, (nd, j))
+            if i == target:
+                break
+        return dist
+
+def _falloff(field: List[float], reach: int, weight: float):
+    """weight * (1..2 inside reach, rising towards the unit; fading to 0 over THREAT_FALLOFF beyond it)."""
+    if np is not None:
+        d = np.asarray(field)
+        inside = 1.0 + (reach - d) / (reach + 1)
+        outside = np.clip(1.0 - (d - reach) / THREAT_FALLOFF, 0.0, 1.0)
+        return weight * np.where(d <= reach, inside, outside)
+    out = []
+    for d in field:
+        if d <= reach: out.append(weight * (1.0 + (reach - d) / (reach + 1)))
+        elif d < reach + THREAT_FALLOFF: out.append(weight * (1.0 - (d - reach) / THREAT_FALLOFF))
+        else: out.append(0.0)
+    return out
+
+def _contribution(layout: GridLayout, pos: Cell, field: Any, reach: int, weight: float):
+    """A unit's influence layer: its cell's unweighted falloff (kept on the layout) times its weight."""
+    key = (layout.index(*pos), reach)
+    shape = layout.shapes.get(key)
+    if shape is None:
+        if len(layout.shapes) >= FIELD_CACHE:
+            layout.shapes.clear()
+        shape = layout.shapes[key] = _falloff(field, reach, 1.0)
+    if np is not None:
+        return weight * shape
+    return [weight * v for v in shape]
+
+def _zeros(n: int):
+    return np.zeros(n) if np is not None else [0.0] * n
+
+def _add(layer, contrib, sign: float):
+    if np is not None:
+        layer += sign * contrib
+        return layer
+    for i, v in enumerate(contrib):
+        layer[i] += sign * v
+    return layer
+
+def _minimum(fields: List[Any], n: int):
+    if not fields:
+        return np.full(n, INF) if np is not None else [INF] * n
+    if np is not None:
+        return np.minimum.reduce([np.asarray(f) for f in fields])
+    return [min(values) for values in zip(*fields)]
+
+@lru_cache(maxsize=1024)
+def _attack_range(known_skills: Tuple[str, ...], version: int) -> int:
+    best = 1 # Basic attack
+    for skill_id in known_skills:
+        ability = DB.get(skill_id)
+        if isinstance(ability, Ability):
+            best = max(best, ability.targeting.range)
+    return best
+
+def unit_reach(entity: Any) -> int:
+    """Cells a unit threatens around itself this turn: move allowance (keeping 1 AP to act) + attack range."""
+    return (TURN_AP - 1) + _attack_range(tuple(entity.known_skills), DB.version)
+
+def unit_weight(entity: Any) -> float:
+    # Wounded units project less
+    return 0.5 + 0.5 * max(0, entity.hp) / entity.max_hp if entity.max_hp > 0 else 0.5
+
+class _UnitInfluence:
+    __slots__ = ("pos", "team", "weight", "reach", "field", "contrib")
+
+    def __init__(self, pos: Cell, team: str, weight: float, reach: int, field: List[float], contrib: Any):
+        self.pos = pos
+        self.team = team
+        self.weight = weight
+        self.reach = reach
+        self.field = field
+        self.contrib = contrib
+
+class InfluenceMap:
+    def __init__(self, grid: Any):
+        self.grid = grid
+        self.layout: Optional[GridLayout] = None
+        self._terrain_version: Optional[int] = None
+        self.units: Dict[str, _UnitInfluence] = {}
+        self.presence: Dict[str, Any] = {} # team -> summed influence
+        self.total = None # Sum over every team (threat = total - own presence)
+        self.reach_by_team: Dict[str, Any] = {}
+        self.round: Optional[int] = None
+        self.recomputed = 0 # Distance fields computed by the last update
+        self._toward: "OrderedDict[Tuple[Cell, FrozenSet[Cell]], PathField]" = OrderedDict()
+        self.paths_built = 0
+
+    def update(self, turn_manager: Any) -> int:
+        """Brings the layers up to date with the battle. Returns how many units needed a new distance field."""
+        if self.grid.terrain_version != self._terrain_version:
+            self._terrain_version = self.grid.terrain_version
+            self.layout = layout_for(self.grid.cells)
+            self.units.clear()
+            self.presence.clear()
+            self.reach_by_team.clear()
+            self._toward.clear()
+            self.total = _zeros(self.layout.size)
+
+        dirty_teams: Set[str] = set() # Teams whose reach layer changed (a weight change alone leaves it)
+        living = set()
+        changed = [] # (entity id, team, pos, weight, reach, field or None, reach layer changed)
+        for entity in turn_manager.entities.values():
+            if entity.hp <= 0:
+                continue
+            living.add(entity.id)
+            pos = (entity.x, entity.y)
+            weight, reach = unit_weight(entity), unit_reach(entity)
+            cur = self.units.get(entity.id)
+            if cur and (cur.pos, cur.team, cur.weight, cur.reach) == (pos, entity.team, weight, reach):
+                continue
+            field = cur.field if cur and cur.pos == pos and cur.reach == reach else None
+            moved = field is None or cur.team != entity.team
+            if cur:
+                self._remove(entity.id)
+                if moved:
+                    dirty_teams.add(cur.team)
+            changed.append((entity.id, entity.team, pos, weight, reach, field, moved))
+
+        # Fields for every unit that moved, one lookup / batch per threat horizon
+        # (nothing past it is influenced, so the search stops there)
+        needed: Dict[int, List[Cell]] = {}
+        for _, _, pos, _, reach, field, _ in changed:
+            if field is None:
+                needed.setdefault(reach, []).append(pos)
+        found = {}
+        for reach, cells in needed.items():
+            found.update(zip(((c, reach) for c in cells), unit_fields(self.layout, cells, reach + THREAT_FALLOFF)))
+
+        recomputed = 0
+        for eid, team, pos, weight, reach, field, moved in changed:
+            if field is None:
+                field = found[(pos, reach)]
+                recomputed += 1
+            unit = _UnitInfluence(pos, team, weight, reach, field, _contribution(self.layout, pos, field, reach, weight))
+            self.units[eid] = unit
+            _add(self.presence.setdefault(team, _zeros(self.layout.size)), unit.contrib, 1.0)
+            _add(self.total, unit.contrib, 1.0)
+            if moved:
+                dirty_teams.add(team)
+
+        for eid in [eid for eid in self.units if eid not in living]:
+            dirty_teams.add(self.units[eid].team)
+            self._remove(eid)
+
+        for team in dirty_teams:
+            fields = [u.field for u in self.units.values() if u.team == team]
+            self.reach_by_team[team] = _minimum(fields, self.layout.size)
+
+        self.round = turn_manager.round
+        self.recomputed = recomputed
+        return recomputed
+
+    def _remove(self, entity_id: str):
+        unit = self.units.pop(entity_id)
+        _add(self.presence[unit.team], unit.contrib, -1.0)
+        _add(self.total, unit.contrib, -1.0)
+
+    def toward(self, goal: Cell, start: Cell, blocked: Iterable[Cell] = ()) -> List[float]:
+        """
+        Distance field to `goal`, final for every cell up to `start`. Kept (LRU, until the
+        terrain changes) per goal and set of `blocked` cells: the terrain-only field is shared
+        by every actor heading for that goal, each one extending the search only as far as
+        it stands; a field around units lasts while they hold still (an actor's own turn).
+        """
+        key = (goal, frozenset(blocked))
+        # Terrain-only fields don't depend on unit positions, so every map on this layout shares them
+        paths = self._toward if key[1] else self.layout.paths
+        field = paths.get(key)
+        if field is not None:
+            paths.move_to_end(key)
+        else:
+            field = paths[key] = PathField(self.layout, goal, key[1])
+            self.paths_built += 1
+            if len(paths) > TOWARD_CACHE:
+                paths.popitem(last=False)
+        return field.settle(start)
+
+    # --- O(1) sampling ---
+
+    def threat(self, cell: Cell, team: str) -> float:
+        i = self.layout.index(*cell)
+        if i is None:
+            return 0.0
+        own = self.presence.get(team)
+        return float(self.total[i] - (own[i] if own is not None else 0.0))
+
+    def support(self, cell: Cell, team: str, exclude: Optional[str] = None) -> float:
+        """Allied influence at a cell (minus `exclude`'s own, so a unit doesn't count as its own support)."""
+        i = self.layout.index(*cell)
+        own = self.presence.get(team)
+        if i is None or own is None:
+            return 0.0
+        value = own[i]
+        unit = self.units.get(exclude) if exclude else None
+        if unit is not None and unit.team == team:
+            value -= unit.contrib[i]
+        return float(value)
+
+    def reach(self, cell: Cell, team: str) -> float:
+        i = self.layout.index(*cell)
+        layer = self.reach_by_team.get(team)
+        if i is None or layer is None:
+            return INF
+        return float(layer[i])
+
+    def danger(self, cell: Cell, team: str, exclude: Optional[str] = None) -> float:
+        """Threat net of ally support: what a retreating or positioning unit minimizes."""
+        # threat() - support(), sharing one index lookup (called for every candidate step)
+        i = self.layout.index(*cell)
+        if i is None:
+            return 0.0
+        own = self.presence.get(team)
+        if own is None:
+            return float(self.total[i])
+        value = own[i]
+        unit = self.units.get(exclude) if exclude else None
+        if unit is not None and unit.team == team:
+            value -= unit.contrib[i]
+        return float(self.total[i] - own[i]) - float(value)
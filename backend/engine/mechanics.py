@@ -1,24 +1,106 @@
 import json
-import random
 from typing import Dict, List, Optional, Tuple, Any
 import os
 
+import copy
+
+from backend.engine.dice import DiceEngine
+from backend.engine.rng import RNGStream
+from backend.engine.odds import attack_odds
+
 # Constants
 STATS_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "assets", "stats_and_skills.json")
 TALENTS_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "assets", "talents.json")
 ABILITIES_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "assets", "abilities.json")
 
-class MechanicsEngine:
-    def __init__(self):
-        self.stats = self._load_json(STATS_FILE)
-        self.talents = self._load_json(TALENTS_FILE)
-        self.abilities = self._load_json(ABILITIES_FILE)
+RULE_FILES = {"stats": STATS_FILE, "talents": TALENTS_FILE, "abilities": ABILITIES_FILE}
+
+class RulesData:
+    """
+    One version of the loaded rules files. Never mutated after construction;
+    a reload builds a new one, so a request holding it sees a consistent set.
+    """
+    __slots__ = ("stats", "talents", "abilities", "data", "version")
+
+    def __init__(self, stats: Dict[str, Any], talents: Dict[str, Any], abilities: Dict[str, Any], version: int = 0):
+        self.stats = stats
+        self.talents = talents
+        self.abilities = abilities
         # Unified data property for backward compatibility or easy dumping
         self.data = {
-            "stats": self.stats,
-            "talents": self.talents,
-            "abilities": self.abilities
+            "stats": stats,
+            "talents": talents,
+            "abilities": abilities
         }
+        self.version = version
+
+class _RulesRef:
+    # Shared by an engine and its forks so a reload reaches every session
+    __slots__ = ("current",)
+
+    def __init__(self, current: RulesData):
+        self.current = current
+
+class MechanicsEngine:
+    def __init__(self, dice: Optional[DiceEngine] = None, rng: Optional[RNGStream] = None):
+        self.rng = rng or (dice.rng if dice else RNGStream())
+        self.dice = dice or DiceEngine(rng=self.rng)
+        self._rules = _RulesRef(RulesData(
+            self._load_json(STATS_FILE),
+            self._load_json(TALENTS_FILE),
+            self._load_json(ABILITIES_FILE),
+        ))
+
+    @property
+    def rules(self) -> RulesData:
+        return self._rules.current
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return self._rules.current.stats
+
+    @property
+    def talents(self) -> Dict[str, Any]:
+        return self._rules.current.talents
+
+    @property
+    def abilities(self) -> Dict[str, Any]:
+        return self._rules.current.abilities
+
+    @property
+    def data(self) -> Dict[str, Any]:
+        return self._rules.current.data
+
+    def reload(self, paths: Optional[List[str]] = None) -> List[str]:
+        """
+        Re-reads the given rules files (all of them if None) and swaps in a new RulesData.
+        Unchanged parts are reused; a file that fails to parse keeps its previous contents.
+        Returns the names of the parts that were replaced.
+        """
+        old = self._rules.current
+        wanted = None if paths is None else {os.path.abspath(p) for p in paths}
+        parts = {"stats": old.stats, "talents": old.talents, "abilities": old.abilities}
+        replaced = []
+        for name, file_path in RULE_FILES.items():
+            if wanted is not None and os.path.abspath(file_path) not in wanted:
+                continue
+            try:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    parts[name] = json.load(f)
+                replaced.append(name)
+            except Exception as e:
+                print(f"[Mechanics] Keeping previous {name} data, reload of {file_path} failed: {e}")
+        if replaced:
+            self._rules.current = RulesData(version=old.version + 1, **parts)
+            print(f"[Mechanics] Reloaded {replaced} (rules v{old.version + 1})")
+        return replaced
+
+    def fork(self, rng: RNGStream) -> 'MechanicsEngine':
+        """Same loaded data, own random stream (one per session or simulated battle)."""
+        forked = copy.copy(self)
+        forked.rng = rng
+        forked.dice = DiceEngine(rng=rng)
+        return forked
 
     def _load_json(self, file_path: str) -> Dict[str, Any]:
         try:
@@ -34,7 +116,11 @@ class MechanicsEngine:
 
 
     def roll_dice(self, sides: int = 20, count: int = 1) -> int:
-        return sum(random.randint(1, sides) for _ in range(count))
+        return self.dice.roll(sides, count)
+
+    def roll_dice_batch(self, sides: int = 20, count: int = 1, n: int = 1):
+        """Rolls `n` totals at once (numpy array) for Monte Carlo work."""
+        return self.dice.roll_batch(sides, count, n)
 
     def calculate_modifier(self, value: int) -> int:
         # Standard d20 system modifier: (Score - 10) / 2
@@ -98,6 +184,16 @@ class MechanicsEngine:
             "damage_amount": damage_amount
         }
 
+    def attack_odds(self, attack_stat: int, skill_bonus: int,
+                    defense_stat: int, armor_bonus: int, defense_skill_bonus: int = 0,
+                    min_damage: int = 0) -> Dict[str, Any]:
+        """
+        Exact result probabilities and damage moments for resolve_attack, without rolling.
+        min_damage counts a MISS / CLASH as that much Meat damage (the basic attack's floor).
+        """
+        odds = attack_odds(attack_stat + skill_bonus, defense_stat + armor_bonus + defense_skill_bonus, min_damage)
+        return odds.to_dict()
+
     def wheel_of_pain(self, attacker_card: str, defender_card: str) -> Dict[str, str]:
         """
         Resolves the Wheel of Pain clash mechanic.
@@ -0,0 +1,147 @@
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, Tuple
+
+# Exact outcome distributions for MechanicsEngine.resolve_attack.
+# The contest is (d20 + attack bonus) vs (d20 + defense bonus), so only the
+# bonus differential matters. Margin bands and damage dice mirror resolve_attack:
+#   margin < 0 -> MISS, 0 -> CLASH, 1-4 -> GRAZE (1d4 Shock),
+#   5-9 -> HIT (1d8 Meat), >= 10 -> CRIT (1d8 x2 Meat)
+
+RESULTS = ("MISS", "CLASH", "GRAZE", "HIT", "CRIT")
+
+GRAZE_MIN, HIT_MIN, CRIT_MIN = 1, 5, 10
+
+# Outside this differential range the outcome no longer changes (always MISS / always CRIT)
+MIN_DIFFERENTIAL = -20
+MAX_DIFFERENTIAL = 29
+
+Distribution = Dict[int, float]
+
+@lru_cache(maxsize=None)
+def _dice_distribution(sides: int, count: int) -> Tuple[Tuple[int, float], ...]:
+    dist = {0: 1.0}
+    face = 1.0 / sides
+    for _ in range(count):
+        nxt: Distribution = {}
+        for total, p in dist.items():
+            for roll in range(1, sides + 1):
+                nxt[total + roll] = nxt.get(total + roll, 0.0) + p * face
+        dist = nxt
+    return tuple(sorted(dist.items()))
+
+def dice_distribution(sides: int, count: int = 1) -> Distribution:
+    """Exact probability of each total of `count`d`sides`, by repeated convolution."""
+    return dict(_dice_distribution(sides, count))
+
+def scale_distribution(dist: Distribution, factor: int) -> Distribution:
+    return {value * factor: p for value, p in dist.items()}
+
+def difference_distribution(a: Distribution, b: Distribution) -> Distribution:
+    """Distribution of A - B for independent A, B."""
+    out: Distribution = {}
+    for va, pa in a.items():
+        for vb, pb in b.items():
+            out[va - vb] = out.get(va - vb, 0.0) + pa * pb
+    return out
+
+def moments(dist: Distribution) -> Tuple[float, float]:
+    mean = sum(v * p for v, p in dist.items())
+    var = sum((v - mean) ** 2 * p for v, p in dist.items())
+    return mean, var
+
+def classify_margin(margin: int) -> str:
+    if margin < 0:
+        return "MISS"
+    if margin == 0:
+        return "CLASH"
+    if margin < HIT_MIN:
+        return "GRAZE"
+    if margin < CRIT_MIN:
+        return "HIT"
+    return "CRIT"
+
+# Damage per result: (damage type, distribution)
+RESULT_DAMAGE: Dict[str, Tuple[str, Distribution]] = {
+    "MISS": ("None", {0: 1.0}),
+    "CLASH": ("None", {0: 1.0}),
+    "GRAZE": ("Shock", dice_distribution(4)),
+    "HIT": ("Meat", dice_distribution(8)),
+    "CRIT": ("Meat", scale_distribution(dice_distribution(8), 2)),
+}
+
+_CONTEST = difference_distribution(dice_distribution(20), dice_distribution(20))
+
+@dataclass(frozen=True)
+class AttackOdds:
+    differential: int
+    probabilities: Dict[str, float]
+    damage_distribution: Dict[int, float] = field(repr=False)
+    expected_damage: float
+    damage_variance: float
+    expected_hp_damage: float
+    expected_composure_damage: float
+
+    @property
+    def hit_chance(self) -> float:
+        """Chance of dealing any damage (GRAZE or better)."""
+        return self.probabilities["GRAZE"] + self.probabilities["HIT"] + self.probabilities["CRIT"]
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "differential": self.differential,
+            "probabilities": dict(self.probabilities),
+            "hit_chance": self.hit_chance,
+            "expected_damage": self.expected_damage,
+            "damage_variance": self.damage_variance,
+            "expected_hp_damage": self.expected_hp_damage,
+            "expected_composure_damage": self.expected_composure_damage,
+        }
+
+def _compute_odds(differential: int, min_damage: int = 0) -> AttackOdds:
+    probs = {r: 0.0 for r in RESULTS}
+    for roll_diff, p in _CONTEST.items():
+        probs[classify_margin(roll_diff + differential)] += p
+
+    damage: Distribution = {}
+    by_type = {"Meat": 0.0, "Shock": 0.0, "None": 0.0}
+    for result, p_result in probs.items():
+        if p_result == 0.0:
+            continue
+        dmg_type, dist = RESULT_DAMAGE[result]
+        if min_damage and moments(dist)[0] <= 0:
+            dmg_type, dist = "Meat", {min_damage: 1.0} # A basic attack's forced chip damage
+        for value, p in dist.items():
+            damage[value] = damage.get(value, 0.0) + p_result * p
+            by_type[dmg_type] += p_result * p * value
+
+    mean, var = moments(damage)
+    return AttackOdds(
+        differential=differential,
+        probabilities=probs,
+        damage_distribution=damage,
+        expected_damage=mean,
+        damage_variance=var,
+        expected_hp_damage=by_type["Meat"],
+        expected_composure_damage=by_type["Shock"],
+    )
+
+# Precomputed table keyed by bonus differential (attack total bonus - defense total bonus)
+ODDS_TABLE: Dict[int, AttackOdds] = {
+    d: _compute_odds(d) for d in range(MIN_DIFFERENTIAL, MAX_DIFFERENTIAL + 1)
+}
+
+@lru_cache(maxsize=None)
+def _chip_odds(differential: int, min_damage: int) -> AttackOdds:
+    return _compute_odds(differential, min_damage)
+
+def odds_for_differential(differential: int, min_damage: int = 0) -> AttackOdds:
+    """min_damage: HP damage dealt on a MISS / CLASH anyway (the basic attack deals 1)."""
+    d = min(MAX_DIFFERENTIAL, max(MIN_DIFFERENTIAL, differential))
+    if min_damage:
+        return _chip_odds(d, min_damage)
+    return ODDS_TABLE[d]
+
+def attack_odds(attack_bonus: int, defense_bonus: int, min_damage: int = 0) -> AttackOdds:
+    """Exact outcome odds for total attack bonus vs total defense bonus."""
+    return odds_for_differential(attack_bonus - defense_bonus, min_damage)
@@ -0,0 +1,295 @@
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from backend.engine.abilities import DB, Ability
+from backend.engine.grid import terrain_cost
+from backend.engine.odds import RESULT_DAMAGE, attack_odds, moments
+from backend.engine.snapshot import BattleState, UnitRecord
+from backend.engine.targeting import ability_area
+
+# Time-budgeted lookahead for AI turns.
+# Expectimax over one actor's AP budget: max nodes pick an action, chance nodes
+# branch on attack outcomes taken from the exact odds tables, and every branch
+# is a copy-on-write BattleState fork. Iterative deepening keeps the best plan
+# from the deepest fully searched ply, so a tight budget degrades to a shallower
+# (but complete) search instead of a half-searched deep one.
+
+# difficulty -> (time budget in seconds, max plies)
+DIFFICULTY_BUDGETS: Dict[str, Tuple[float, int]] = {
+    "easy": (0.005, 1),
+    "normal": (0.020, 3),
+    "hard": (0.050, 4),
+    "nightmare": (0.150, 6),
+}
+DEFAULT_DIFFICULTY = "normal"
+
+# Mirrors ActionResolver
+MOVE_AP = 1
+ATTACK_AP = 1
+STEPS = ((1, 0), (-1, 0), (0, 1), (0, -1))
+
+LOW_HEALTH = 0.3 # Same retreat threshold as the heuristic AI
+
+@dataclass(frozen=True)
+class PlannedAction:
+    kind: str # Move | Attack | UseSkill | EndTurn
+    target: Optional[str] = None
+    skill_id: Optional[str] = None
+    to: Optional[Tuple[int, int]] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {"action": self.kind}
+        if self.target is not None: data["target"] = self.target
+        if self.skill_id is not None: data["skill_id"] = self.skill_id
+        if self.to is not None: data["to"] = self.to
+        return data
+
+END_TURN = PlannedAction("EndTurn")
+
+@dataclass
+class Plan:
+    actions: List[PlannedAction] # Best line (following the most likely outcome at chance nodes)
+    value: float
+    depth: int # Deepest fully searched ply
+    nodes: int
+    elapsed: float
+    timed_out: bool
+
+    @property
+    def first(self) -> PlannedAction:
+        return self.actions[0] if self.actions else END_TURN
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "actions": [a.to_dict() for a in self.actions],
+            "value": round(self.value, 3),
+            "depth": self.depth,
+            "nodes": self.nodes,
+            "elapsed_ms": round(self.elapsed * 1000, 2),
+            "timed_out": self.timed_out,
+        }
+
+@dataclass
+class _Skill:
+    skill_id: str
+    ap: int
+    resource: int
+    cost_type: str
+    range: int
+    ability: Any
+    flat_damage: float # Expected effect-dice damage; 0 -> the weapon roll decides
+    hits_hp: bool
+
+class _Timeout(Exception):
+    pass
+
+@lru_cache(maxsize=None)
+def _attack_outcomes(differential: int, min_damage: int) -> Tuple[Tuple[float, float, float], ...]:
+    """(probability, hp damage, composure damage) per distinct result of a weapon roll."""
+    odds = attack_odds(differential, 0)
+    grouped: Dict[Tuple[float, float], float] = {}
+    for result, p in odds.probabilities.items():
+        if p <= 0.0:
+            continue
+        dmg_type, dist = RESULT_DAMAGE[result]
+        mean = moments(dist)[0]
+        if mean <= 0 and min_damage:
+            key = (float(min_damage), 0.0) # resolve_attack's forced chip damage
+        elif dmg_type == "Shock":
+            key = (0.0, mean)
+        else:
+            key = (mean, 0.0)
+        grouped[key] = grouped.get(key, 0.0) + p
+    return tuple((p, hp, comp) for (hp, comp), p in sorted(grouped.items(), key=lambda kv: -kv[1]))
+
+class TurnPlanner:
+    def __init__(self, ability_resolver: Any, budget: float = 0.020, max_depth: int = 3):
+        self.ability_resolver = ability_resolver
+        self.budget = budget
+        self.max_depth = max_depth
+        self._deadline = 0.0
+        self._nodes = 0
+        self._partial: Tuple[float, List[PlannedAction]] = (0.0, []) # Best root line of the ply in progress
+
+    @classmethod
+    def for_difficulty(cls, ability_resolver: Any, difficulty: str = DEFAULT_DIFFICULTY) -> 'TurnPlanner':
+        if difficulty not in DIFFICULTY_BUDGETS:
+            raise ValueError(f"Unknown difficulty: {difficulty} (expected one of {', '.join(DIFFICULTY_BUDGETS)})")
+        budget, depth = DIFFICULTY_BUDGETS[difficulty]
+        return cls(ability_resolver, budget, depth)
+
+    # --- Search ---
+
+    def plan(self, actor: Any, turn_manager: Any, grid: Any = None, state: Optional[BattleState] = None) -> Plan:
+        start = time.perf_counter()
+        self._deadline = start + self.budget
+        self._nodes = 0
+        state = state or BattleState.capture(turn_manager, grid)
+        record = state.unit(actor.id)
+        skills = self._skills(record)
+
+        best = Plan([], self.evaluate(state, actor.id), 0, 0, 0.0, False)
+        max_depth = min(self.max_depth, max(1, record.ap))
+        root_order: Optional[List[PlannedAction]] = None
+        timed_out = False
+        for depth in range(1, max_depth + 1):
+            try:
+                value, line, scores = self._search_root(state, actor.id, skills, depth, root_order)
+            except _Timeout:
+                timed_out = True
+                if best.depth == 0 and self._partial[1]:
+                    # Not even one full ply fit: act on the root actions that were scored
+                    best = Plan(self._partial[1], self._partial[0], 0, self._nodes, 0.0, True)
+                break
+            best = Plan(line, value, depth, self._nodes, 0.0, False)
+            # Search the most promising root actions first next time round
+            root_order = sorted(scores, key=lambda a: -scores[a])
+
+        best.nodes = self._nodes
+        best.elapsed = time.perf_counter() - start
+        best.timed_out = timed_out
+        return best
+
+    def _search_root(self, state: BattleState, actor_id: str, skills: List[_Skill], depth: int,
+                     order: Optional[List[PlannedAction]]):
+        actions = self.legal_actions(state, actor_id, skills)
+        if order:
+            rank = {a: i for i, a in enumerate(order)}
+            actions.sort(key=lambda a: rank.get(a, len(rank)))
+        best_value = self.evaluate(state, actor_id)
+        best_line: List[PlannedAction] = []
+        self._partial = (best_value, best_line)
+        scores: Dict[PlannedAction, float] = {}
+        for action in actions:
+            value, line = self._expect(state, actor_id, skills, action, depth)
+            scores[action] = value
+            if value > best_value:
+                best_value, best_line = value, [action] + line
+                self._partial = (best_value, best_line)
+        return best_value, best_line, scores
+
+    def _expect(self, state: BattleState, actor_id: str, skills: List[_Skill], action: PlannedAction, depth: int):
+        """Chance node: expected value of an action over its outcomes."""
+        total = 0.0
+        likely_line: List[PlannedAction] = []
+        likely_p = -1.0
+        for p, child in self.outcomes(state, actor_id, skills, action):
+            value, line = self._max(child, actor_id, skills, depth - 1)
+            total += p * value
+            if p > likely_p:
+                likely_p, likely_line = p, line
+        return total, likely_line
+
+    def _max(self, state: BattleState, actor_id: str, skills: List[_Skill], depth: int):
+        self._nodes += 1
+        if time.perf_counter() > self._deadline:
+            raise _Timeout()
+        best_value = self.evaluate(state, actor_id) # Ending the turn here is always an option
+        if depth <= 0:
+            return best_value, []
+        best_line: List[PlannedAction] = []
+        for action in self.legal_actions(state, actor_id, skills):
+            value, line = self._expect(state, actor_id, skills, action, depth)
+            if value > best_value:
+                best_value, best_line = value, [action] + line
+        return best_value, best_line
+
+    # --- Model ---
+
+    def _skills(self, actor: UnitRecord) -> List[_Skill]:
+        skills = []
+        for skill_id in actor.known_skills:
+            ability = DB.get(skill_id)
+            if not isinstance(ability, Ability) or ability_area(ability)[0] != "single":
+                continue # Area casts are aimed at cells; the planner only reasons about single targets
+            flat, hits_hp = 0.0, True
+            for effect in ability.effects:
+                if effect.type == "Damage" or effect.type == "direct_damage":
+                    if effect.amount_expr: flat += effect.amount_expr.mean(actor.stats)
+                    if effect.dice_expr: flat += effect.dice_expr.mean(actor.stats) + effect.bonus
+                    hits_hp = (effect.dmg_type or "Meat") == "Meat"
+            skills.append(_Skill(skill_id, ability.costs.ap, ability.costs.resource, ability.costs.type,
+                                 ability.targeting.range, ability, flat, hits_hp))
+        return skills
+
+    def legal_actions(self, state: BattleState, actor_id: str, skills: List[_Skill]) -> List[PlannedAction]:
+        actor = state.unit(actor_id)
+        if actor.hp <= 0 or actor.ap <= 0:
+            return []
+        actions: List[PlannedAction] = []
+        hostiles = state.living(exclude_team=actor.team)
+        for h in hostiles:
+            dist = abs(h.x - actor.x) + abs(h.y - actor.y)
+            for sk in skills:
+                if actor.ap < sk.ap or dist > sk.range: continue
+                if sk.cost_type == "stamina" and actor.stamina < sk.resource: continue
+                if sk.cost_type == "focus" and actor.focus < sk.resource: continue
+                actions.append(PlannedAction("UseSkill", h.id, sk.skill_id))
+            if dist <= 1 and actor.ap >= ATTACK_AP:
+                actions.append(PlannedAction("Attack", h.id))
+        if actor.ap >= MOVE_AP:
+            for dx, dy in STEPS:
+                nx, ny = actor.x + dx, actor.y + dy
+                if terrain_cost(state.terrain_at(nx, ny)) is not None and state.occupant(nx, ny) is None:
+                    actions.append(PlannedAction("Move", to=(nx, ny)))
+        return actions
+
+    def outcomes(self, state: BattleState, actor_id: str, skills: List[_Skill], action: PlannedAction):
+        """[(probability, child state)] for an action."""
+        actor = state.unit(actor_id)
+        if action.kind == "Move":
+            child = state.fork()
+            child.move(actor_id, *action.to)
+            child.update(actor_id, ap=actor.ap - MOVE_AP)
+            return [(1.0, child)]
+
+        target = state.unit(action.target)
+        if action.kind == "Attack":
+            diff = actor.stats.get('Might', 12) - target.stats.get('Reflexes', 10)
+            paid = {"ap": actor.ap - ATTACK_AP}
+            branches = _attack_outcomes(diff, 1)
+        else:
+            sk = next(s for s in skills if s.skill_id == action.skill_id)
+            paid = {"ap": actor.ap - sk.ap}
+            if sk.cost_type in ("stamina", "focus"):
+                paid[sk.cost_type] = getattr(actor, sk.cost_type) - sk.resource
+            if sk.flat_damage > 0:
+                branches = ((1.0, sk.flat_damage, 0.0) if sk.hits_hp else (1.0, 0.0, sk.flat_damage),)
+            else:
+                atk_stat, def_stat = self.ability_resolver.attack_stats(sk.ability, actor, target)
+                branches = _attack_outcomes(atk_stat - def_stat, 0)
+
+        results = []
+        for p, hp_dmg, comp_dmg in branches:
+            child = state.fork()
+            child.update(actor_id, **paid)
+            if hp_dmg or comp_dmg:
+                child.update(target.id, hp=max(0, target.hp - hp_dmg), composure=max(0, target.composure - comp_dmg))
+            results.append((p, child))
+        return results
+
+    def evaluate(self, state: BattleState, actor_id: str) -> float:
+        """Static score of a position for the actor's side (higher is better)."""
+        actor = state.unit(actor_id)
+        score = 0.0
+        nearest = None
+        for u in state.all_units().values():
+            if u.team == actor.team:
+                continue
+            if u.max_hp > 0:
+                score += 10.0 * (1.0 - max(0, u.hp) / u.max_hp)
+            if u.hp <= 0:
+                score += 15.0 # Kills are worth more than the damage alone
+                continue
+            if u.max_composure > 0:
+                score += 3.0 * (1.0 - max(0, u.composure) / u.max_composure)
+            dist = abs(u.x - actor.x) + abs(u.y - actor.y)
+            if nearest is None or dist < nearest:
+                nearest = dist
+        if nearest is not None:
+            low_health = actor.max_hp > 0 and actor.hp / actor.max_hp < LOW_HEALTH
+            score += 0.5 * nearest if low_health else -0.5 * nearest
+        score += 0.01 * (actor.stamina + actor.focus) # Don't burn resources for nothing
+        return score
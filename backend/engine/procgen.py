@@ -1,7 +1,8 @@
 import random
 import math
-from typing import Dict, Tuple, List
-from backend.engine.grid import GridManager
+from typing import Dict, Tuple, List, Optional
+from backend.engine.grid import GridManager, TILE_MOVEMENT_COSTS
+from backend.engine.rng import RNGStream
 
 try:
     from perlin_noise import PerlinNoise
@@ -10,13 +11,15 @@ except ImportError:
     class PerlinNoise:
         def __init__(self, octaves=1, seed=1):
             self.seed = seed
+            self._random = random.Random(seed)
         def __call__(self, coords):
             # Very dumb pseudo-random fallback
-            return random.random()
+            return self._random.random()
 
 class ProcGen:
-    def __init__(self, seed: int = None):
-        self.seed = seed if seed is not None else random.randint(0, 10000)
+    def __init__(self, seed: int = None, rng: Optional[RNGStream] = None):
+        self.rng = rng or RNGStream(seed)
+        self.seed = seed if seed is not None else self.rng.randint(0, 10000)
         self.noise_elevation = PerlinNoise(octaves=3, seed=self.seed)
         self.noise_moisture = PerlinNoise(octaves=2, seed=self.seed + 1)
         self.noise_difficulty = PerlinNoise(octaves=4, seed=self.seed + 2)
@@ -43,46 +46,38 @@ class ProcGen:
             moist = self.noise_moisture([x, y]) + 0.5
             
             tile_type = "Grass"
-            movement_cost = 1
             height = 0
             
             # Basic Terrain Logic
             if elev < 0.35:
                 tile_type = "Water"
-                movement_cost = 99
                 height = -1
             elif elev < 0.40:
                 tile_type = "Sand"
-                movement_cost = 2
                 height = 0
             elif elev < 0.65:
                 if moist > 0.6:
                     tile_type = "Forest"
-                    movement_cost = 2
                 else:
                     tile_type = "Grass"
-                    movement_cost = 1
                 height = 1
             elif elev < 0.8:
                 tile_type = "Stone"
-                movement_cost = 1
                 height = 2
             else:
                 tile_type = "Mountain"
-                movement_cost = 3
                 height = 3
             
             # Biome Overrides
             if biome_type == "Ruins":
                 if tile_type in ["Grass", "Forest"]:
-                    if random.random() > 0.7:
+                    if self.rng.random() > 0.7:
                         tile_type = "Rubble"
-                        movement_cost = 2
                 
             grid.cells[(gx, gy)] = tile_type
             map_data[(gx, gy)] = {
                 "type": tile_type,
-                "cost": movement_cost,
+                "cost": TILE_MOVEMENT_COSTS[tile_type],
                 "height": height,
                 "elevation": elev,
                 "moisture": moist
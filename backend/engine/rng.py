@@ -0,0 +1,113 @@
+import random
+import zlib
+from typing import Any, Dict, List, Optional
+
+try:
+    import numpy as np
+except ImportError:
+    # Streams still work without numpy; batches become Python loops
+    np = None
+
+class RNGStream:
+    """
+    One independent random stream.
+    Scalar draws go through a stdlib Random (cheapest per call),
+    batched draws through a numpy Generator seeded from the same SeedSequence.
+    Unseeded streams draw fresh OS entropy, so default gameplay stays random.
+    """
+    def __init__(self, seed: Optional[int] = None, seed_seq: Any = None):
+        self.seed = seed
+        if np is not None:
+            self.seed_seq = seed_seq if seed_seq is not None else np.random.SeedSequence(seed)
+            state = self.seed_seq.generate_state(2, dtype=np.uint64)
+            self._random = random.Random(int(state[0]) << 64 | int(state[1]))
+        else:
+            self.seed_seq = seed_seq
+            self._random = random.Random(seed_seq if seed_seq is not None else seed)
+        self._generator = None
+
+        # Bound methods for the hot path
+        self.random = self._random.random
+        self.randint = self._random.randint
+        self.choice = self._random.choice
+        self.shuffle = self._random.shuffle
+
+    @property
+    def generator(self):
+        """numpy Generator for batched draws (None without numpy)."""
+        if self._generator is None and np is not None:
+            self._generator = np.random.default_rng(self.seed_seq)
+        return self._generator
+
+    def integers(self, low: int, high: int, size: Any = None):
+        """Batch of ints in [low, high) -- numpy array, or list without numpy."""
+        gen = self.generator
+        if gen is not None:
+            return gen.integers(low, high, size=size)
+        if size is None:
+            return self._random.randrange(low, high)
+        n = size if isinstance(size, int) else _prod(size)
+        flat = [self._random.randrange(low, high) for _ in range(n)]
+        if isinstance(size, int):
+            return flat
+        cols = size[-1]
+        return [flat[i:i + cols] for i in range(0, n, cols)]
+
+    def random_batch(self, size: int):
+        """Batch of floats in [0, 1)."""
+        gen = self.generator
+        if gen is not None:
+            return gen.random(size)
+        return [self._random.random() for _ in range(size)]
+
+    def spawn(self, n: int = 1) -> List['RNGStream']:
+        """Independent child streams, e.g. one per parallel worker or battle."""
+        if np is not None:
+            return [RNGStream(seed_seq=s) for s in self.seed_seq.spawn(n)]
+        return [RNGStream(seed_seq=self._random.getrandbits(64)) for _ in range(n)]
+
+def _prod(shape) -> int:
+    out = 1
+    for d in shape:
+        out *= d
+    return out
+
+def _stable_key(name: str) -> int:
+    # hash() is salted per process; crc32 keeps session streams reproducible across runs
+    return zlib.crc32(name.encode("utf-8"))
+
+class RNGProvider:
+    """
+    Hands out seeded streams: one per session id, or numbered substreams for parallel work.
+    The same root seed always yields the same stream for a given session id or index,
+    regardless of creation order or which process asks.
+    """
+    def __init__(self, seed: Optional[int] = None):
+        self.seed = seed
+        if np is not None:
+            self._root = np.random.SeedSequence(seed)
+            self.entropy = self._root.entropy
+        else:
+            self._root = None
+            self.entropy = seed if seed is not None else random.SystemRandom().getrandbits(64)
+        self._sessions: Dict[str, RNGStream] = {}
+
+    def _child(self, *key: int) -> RNGStream:
+        if np is not None:
+            return RNGStream(seed_seq=np.random.SeedSequence(self.entropy, spawn_key=key))
+        return RNGStream(seed_seq=hash((self.entropy,) + key) & ((1 << 64) - 1))
+
+    def stream(self, session_id: str) -> RNGStream:
+        """The stream for a session (created on first use)."""
+        rng = self._sessions.get(session_id)
+        if rng is None:
+            rng = self._child(0, _stable_key(session_id))
+            self._sessions[session_id] = rng
+        return rng
+
+    def substream(self, index: int) -> RNGStream:
+        """Fresh stream #index, independent of sessions and of every other index."""
+        return self._child(1, index)
+
+    def drop(self, session_id: str):
+        self._sessions.pop(session_id, None)
@@ -0,0 +1,172 @@
+import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from backend.engine.planner import Plan, PlannedAction, TurnPlanner
+from backend.engine.turn_manager import TURN_AP, TurnManager
+
+# Runs a block of consecutive AI turns (what /battle/turn/end does between player turns).
+# Every upcoming AI actor is planned at once on a thread pool, each against its own
+# fork of one read-only snapshot taken before anyone acts. Plans are then applied in
+# initiative order; a step that an earlier actor invalidated (target died, cell taken,
+# the actor itself was moved or hurt) triggers a re-plan of that actor only, from the
+# live battle. The block stops on a wall-clock budget instead of a fixed step count.
+#
+# The planners are time-budgeted, so N concurrent searches finish in about one
+# budget of wall time even though they share the GIL. Without a planner (heuristic
+# AI) each actor just plays its turn through AIEngine.take_turn.
+
+def is_enemy(entity: Any) -> bool:
+    return entity.team == "Enemy"
+
+@dataclass
+class RoundResult:
+    ai_actions: List[Dict[str, Any]] = field(default_factory=list)
+    log_events: List[str] = field(default_factory=list)
+    status_events: List[Dict[str, Any]] = field(default_factory=list)
+    current: Any = None # Actor whose turn it is when the block ends
+    pending: bool = False # Budget ran out with AI turns still to play
+    planned: int = 0 # Plans computed ahead of time
+    replans: int = 0 # Plans invalidated by an earlier actor
+    elapsed: float = 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {"planned": self.planned, "replans": self.replans, "elapsed_ms": round(self.elapsed * 1000, 2)}
+
+def _truncated(plan: Plan) -> bool:
+    return plan.depth > 0 and len(plan.actions) >= plan.depth
+
+class RoundPlanner:
+    def __init__(self, ai_engine: Any, budget: float = 2.0, max_workers: Optional[int] = None,
+                 is_ai: Callable[[Any], bool] = is_enemy):
+        self.ai = ai_engine
+        self.budget = budget # Seconds of AI turns per call
+        self.is_ai = is_ai
+        self.executor = ThreadPoolExecutor(max_workers=max_workers or min(8, os.cpu_count() or 1),
+                                           thread_name_prefix="ai-plan")
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def _planner(self) -> TurnPlanner:
+        # Planners keep per-search state, so every concurrent search gets its own
+        template = self.ai.planner or TurnPlanner.for_difficulty(self.ai.ability_resolver)
+        return TurnPlanner(template.ability_resolver, template.budget, template.max_depth)
+
+    def precompute(self, actor_ids: List[str], turn_manager: TurnManager, grid: Any = None) -> Dict[str, Tuple[Tuple, Future]]:
+        """Starts a plan per actor from one shared snapshot. Returns id -> (assumed start, future)."""
+        base = turn_manager.snapshot(grid)
+        futures = {}
+        for eid in actor_ids:
+            record = base.unit(eid)
+            state = base.fork()
+            state.update(eid, ap=TURN_AP) # As it will be when its turn starts
+            entity = turn_manager.entities[eid]
+            future = self.executor.submit(self.ai.plan_turn, entity, turn_manager, state, self._planner())
+            futures[eid] = ((record.hp, record.x, record.y), future)
+        return futures
+
+    def run(self, current: Any, turn_manager: TurnManager, grid: Any = None) -> RoundResult:
+        """Plays AI turns from `current` (whose turn has already started) until a non-AI actor is up."""
+        start = time.perf_counter()
+        deadline = start + self.budget
+        result = RoundResult(current=current)
+
+        futures: Dict[str, Tuple[Tuple, Future]] = {}
+        if current is not None and self.is_ai(current) and self.ai.planner:
+            block = [current.id]
+            for eid in turn_manager.upcoming():
+                if eid == current.id or not self.is_ai(turn_manager.entities[eid]):
+                    break
+                block.append(eid)
+            futures = self.precompute(block, turn_manager, grid)
+            result.planned = len(futures)
+
+        try:
+            while current is not None and self.is_ai(current):
+                if time.perf_counter() > deadline:
+                    result.pending = True
+                    print(f"[Round] AI budget spent; {current.id} and later AI turns wait for the next call")
+                    break
+                try:
+                    print(f"[Loop] Processing AI Turn for {current.id} ({current.name})")
+                    for action_log in self._play_turn(current, turn_manager, futures.pop(current.id, None), result, deadline):
+                        # Enrich with actor_id for frontend animation
+                        action_log["actor_id"] = current.id
+                        result.ai_actions.append(action_log)
+                        result.log_events.append(f"{current.name}: {action_log}")
+                except Exception as e:
+                    print(f"[Loop] CRITICAL AI ERROR: {e}")
+                    result.log_events.append(f"{current.name}: ERROR {e}")
+
+                if turn_manager.check_victory_condition() != "Ongoing":
+                    break
+                current = turn_manager.next_turn()
+                result.status_events.extend(turn_manager.turn_events)
+                if current is not None:
+                    print(f"[Loop] Advanced to {current.id}. Team: {current.team}")
+        finally:
+            for _assumed, future in futures.values():
+                future.cancel()
+
+        result.current = current
+        result.elapsed = time.perf_counter() - start
+        return result
+
+    def _play_turn(self, actor: Any, turn_manager: TurnManager, planned: Optional[Tuple[Tuple, Future]],
+                   result: RoundResult, deadline: float) -> List[Dict[str, Any]]:
+        if not self.ai.planner:
+            return self.ai.take_turn(actor, turn_manager)
+
+        steps: Optional[List[PlannedAction]] = None
+        truncated = False # The plan ran into the search depth rather than choosing to stop
+        if planned is not None:
+            assumed, future = planned
+            plan: Plan = future.result()
+            if (actor.hp, actor.x, actor.y) == assumed:
+                steps, truncated = list(plan.actions), _truncated(plan)
+            else:
+                result.replans += 1 # Moved or hurt since the snapshot (earlier actor, status tick)
+
+        logs = []
+        fresh = False
+        source = "precomputed"
+        tracer = self.ai.tracer
+        deciding = False # A decision is open in the tracer; replans within it stay part of it
+        while actor.hp > 0 and actor.ap > 0 and time.perf_counter() <= deadline:
+            if not deciding:
+                tracer.begin(actor, "planned_step")
+                deciding = True
+            if steps is None:
+                plan = self.ai.plan_turn(actor, turn_manager, planner=self._planner())
+                steps, truncated = list(plan.actions), _truncated(plan)
+                fresh = True
+                source = "replanned"
+            if not steps:
+                if truncated and not fresh:
+                    steps = None # Search horizon reached with AP left: look further from here
+                    continue
+                break # The plan ends the turn here
+            step = steps.pop(0)
+            tracer.note(source=source, step=step.to_dict(), steps_left=len(steps))
+            if not self.ai.validate_step(actor, step, turn_manager):
+                if fresh:
+                    break # A plan made just now should never be stale; don't loop on it
+                result.replans += 1
+                steps = None
+                continue
+            action_log = self.ai.execute(actor, step, turn_manager)
+            trace = tracer.finish(action_log)
+            deciding = False
+            if action_log is None:
+                break
+            if trace: action_log["trace"] = trace
+            logs.append(action_log)
+            fresh = False
+            if turn_manager.check_victory_condition() != "Ongoing":
+                break
+        if deciding:
+            tracer.finish(None) # Ended without acting (plan over, stale plan, deadline): still a decision
+        return logs
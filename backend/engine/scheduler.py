@@ -0,0 +1,66 @@
+import bisect
+from typing import Dict, List, Optional, Tuple
+
+# Turn scheduler: living actors kept sorted by (-initiative, seq), where seq is
+# the order actors joined (ties act in join order, like the stable sort it replaces).
+# Lookups are bisects; insert/remove are a bisect plus a list memmove, which in
+# CPython beats a tree for any realistic battle size.
+
+Key = Tuple[int, int, str]
+
+class TurnScheduler:
+    def __init__(self):
+        self.keys: List[Key] = [] # Living actors only
+        self.key_of: Dict[str, Key] = {} # Every actor ever scheduled, so a dead actor's turn can still be stepped past
+        self._seq = 0
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, entity_id: str) -> bool:
+        key = self.key_of.get(entity_id)
+        if key is None:
+            return False
+        i = bisect.bisect_left(self.keys, key)
+        return i < len(self.keys) and self.keys[i] == key
+
+    def clear(self):
+        self.keys.clear()
+        self.key_of.clear()
+        self._seq = 0
+
+    def assign(self, entity_id: str, initiative: int) -> Key:
+        """Gives an actor its place in the order (without marking it alive)."""
+        self.discard(entity_id)
+        key = (-initiative, self._seq, entity_id)
+        self._seq += 1
+        self.key_of[entity_id] = key
+        return key
+
+    def add(self, entity_id: str):
+        key = self.key_of[entity_id]
+        if entity_id not in self:
+            bisect.insort(self.keys, key)
+
+    def discard(self, entity_id: str):
+        key = self.key_of.get(entity_id)
+        if key is None:
+            return
+        i = bisect.bisect_left(self.keys, key)
+        if i < len(self.keys) and self.keys[i] == key:
+            del self.keys[i]
+
+    def first(self) -> Optional[str]:
+        return self.keys[0][2] if self.keys else None
+
+    def next_after(self, entity_id: Optional[str]) -> Tuple[Optional[str], bool]:
+        """(next living actor after `entity_id`, whether the order wrapped into a new round)."""
+        if not self.keys:
+            return None, False
+        key = self.key_of.get(entity_id) if entity_id is not None else None
+        if key is None:
+            return self.keys[0][2], False
+        i = bisect.bisect_right(self.keys, key)
+        if i >= len(self.keys):
+            return self.keys[0][2], True
+        return self.keys[i][2], False
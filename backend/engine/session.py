@@ -37,7 +37,7 @@ class SessionManager:
                 timestamp=datetime.now().isoformat(),
                 round=turn_manager.round,
                 turn_index=turn_manager.current_index,
-                entities=turn_manager.entities,
+                entities=turn_manager.entity_states(),
                 map_data=map_serialized,
                 history=history
             )
@@ -67,13 +67,14 @@ class SessionManager:
                 
             # Restore Turn Logic
             turn_manager.round = data['round']
-            turn_manager.current_index = data['turn_index']
             turn_manager.entities = {k: EntityState(**v) for k,v in data['entities'].items()}
             turn_manager.turn_order = sorted(
                 turn_manager.entities.keys(), 
                 key=lambda x: turn_manager.entities[x].initiative, 
                 reverse=True
             ) 
+            # After the order: replacing the roster resets the index
+            turn_manager.current_index = data['turn_index']
             
             # Restore Map
             grid.cells = {}
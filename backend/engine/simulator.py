@@ -0,0 +1,245 @@
+import contextlib
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Union
+
+from backend.engine.turn_manager import TurnManager, EntityState
+from backend.engine.grid import GridManager
+from backend.engine.procgen import ProcGen
+from backend.engine.actions import ActionResolver
+from backend.engine.mechanics import MechanicsEngine
+from backend.engine.abilities import AbilityResolver
+from backend.engine.entity_store import EntityStore
+from backend.engine.ai_engine import AIEngine
+from backend.engine.rng import RNGProvider, RNGStream
+
+# Headless battle simulator for balance runs.
+# Runs full AI-vs-AI battles with the real engine objects (no FastAPI) across a process pool.
+
+# Same matchup /battle/start sets up
+DEFAULT_TEAM_A = [{
+    "id": "P1", "name": "Ursine Warrior",
+    "hp": 29, "max_hp": 29, "composure": 27, "max_composure": 27,
+    "stamina": 11, "max_stamina": 11, "focus": 9, "max_focus": 9,
+    "stats": {"Might": 12, "Endurance": 10, "Vitality": 11, "Fortitude": 8, "Logic": 10, "Knowledge": 8, "Willpower": 10, "Charm": 12},
+    "x": 2, "y": 2,
+    "known_skills": ["basic_attack", "concussive__strike", "focused__blast", "minor__shove", "quick__leap"],
+}]
+DEFAULT_TEAM_B = [{
+    "id": "E1", "name": "Gravity Bear",
+    "hp": 32, "max_hp": 32, "composure": 10, "max_composure": 10,
+    "stamina": 13, "max_stamina": 13, "focus": 8, "max_focus": 8,
+    "stats": {"Might": 14, "Endurance": 12, "Vitality": 12, "Fortitude": 10, "Logic": 8, "Knowledge": 8},
+    "x": 5, "y": 5,
+    "known_skills": ["minor__shove", "concussive__strike"],
+}]
+
+TEAM_A = "Player"
+TEAM_B = "Enemy"
+
+RosterEntry = Union[EntityState, Dict[str, Any]]
+
+@dataclass
+class SimulationConfig:
+    team_a: List[Dict[str, Any]] = field(default_factory=lambda: [dict(e) for e in DEFAULT_TEAM_A])
+    team_b: List[Dict[str, Any]] = field(default_factory=lambda: [dict(e) for e in DEFAULT_TEAM_B])
+    map_radius: int = 10
+    biome: Optional[str] = None # None -> empty map, else ProcGen terrain
+    map_seed: Optional[int] = None
+    max_rounds: int = 50
+    max_actions_per_turn: int = 10
+    use_store: bool = False # Array-backed EntityStore (pays off with large rosters)
+    difficulty: Optional[str] = None # AI lookahead budget (planner.DIFFICULTY_BUDGETS); None = heuristic AI
+
+@dataclass
+class BattleResult:
+    winner: str # "Player", "Enemy" or "Draw"
+    rounds: int
+    elapsed: float
+    damage_by_ability: Dict[str, int] = field(default_factory=dict)
+    uses_by_ability: Dict[str, int] = field(default_factory=dict)
+
+@dataclass
+class SimulationReport:
+    battles: int = 0
+    wins: Dict[str, int] = field(default_factory=lambda: {TEAM_A: 0, TEAM_B: 0, "Draw": 0})
+    total_rounds: int = 0
+    battle_time: float = 0.0 # Summed per-battle time (CPU side)
+    wall_time: float = 0.0
+    workers: int = 1
+    damage_by_ability: Dict[str, int] = field(default_factory=dict)
+    uses_by_ability: Dict[str, int] = field(default_factory=dict)
+
+    def add(self, result: BattleResult):
+        self.battles += 1
+        self.wins[result.winner] = self.wins.get(result.winner, 0) + 1
+        self.total_rounds += result.rounds
+        self.battle_time += result.elapsed
+        for k, v in result.damage_by_ability.items():
+            self.damage_by_ability[k] = self.damage_by_ability.get(k, 0) + v
+        for k, v in result.uses_by_ability.items():
+            self.uses_by_ability[k] = self.uses_by_ability.get(k, 0) + v
+
+    def merge(self, other: 'SimulationReport'):
+        self.battles += other.battles
+        for k, v in other.wins.items():
+            self.wins[k] = self.wins.get(k, 0) + v
+        self.total_rounds += other.total_rounds
+        self.battle_time += other.battle_time
+        for k, v in other.damage_by_ability.items():
+            self.damage_by_ability[k] = self.damage_by_ability.get(k, 0) + v
+        for k, v in other.uses_by_ability.items():
+            self.uses_by_ability[k] = self.uses_by_ability.get(k, 0) + v
+
+    def to_dict(self) -> Dict[str, Any]:
+        n = max(1, self.battles)
+        return {
+            "battles": self.battles,
+            "workers": self.workers,
+            "win_rates": {k: v / n for k, v in self.wins.items()},
+            "wins": dict(self.wins),
+            "avg_rounds": self.total_rounds / n,
+            "avg_time_per_battle_ms": 1000 * self.battle_time / n,
+            "battles_per_second": self.battles / self.wall_time if self.wall_time else 0.0,
+            "battles_per_second_per_core": n / self.battle_time if self.battle_time else 0.0,
+            "wall_time_s": self.wall_time,
+            "damage_per_ability": {
+                k: {
+                    "total": self.damage_by_ability.get(k, 0),
+                    "uses": uses,
+                    "avg": self.damage_by_ability.get(k, 0) / uses if uses else 0.0,
+                }
+                for k, uses in sorted(self.uses_by_ability.items())
+            },
+        }
+
+class _NullWriter:
+    # The engine logs with print(); swallow it in the hot loop
+    def write(self, s): return len(s)
+    def flush(self): pass
+
+def _roster_dicts(roster: List[RosterEntry]) -> List[Dict[str, Any]]:
+    return [e.model_dump() if isinstance(e, EntityState) else dict(e) for e in roster]
+
+class BattleSimulator:
+    """
+    Runs single battles headlessly. One instance per process; engine data is loaded once.
+    """
+    def __init__(self, mechanics: Optional[MechanicsEngine] = None):
+        self.mechanics = mechanics or MechanicsEngine()
+        self._empty_maps: Dict[int, GridManager] = {} # radius -> map; battles never change terrain
+
+    def _build_grid(self, config: SimulationConfig, rng: RNGStream) -> GridManager:
+        if not config.biome:
+            # Identical every battle (and draws nothing from the RNG): built once, so its
+            # terrain version - and the influence layout cached for it - carries over
+            grid = self._empty_maps.get(config.map_radius)
+            if grid is None:
+                grid = self._empty_maps[config.map_radius] = GridManager(radius=config.map_radius)
+                grid.generate_empty_map()
+            return grid
+        grid = GridManager(radius=config.map_radius)
+        grid.generate_empty_map()
+        ProcGen(seed=config.map_seed, rng=rng).generate_terrain(grid, biome_type=config.biome)
+        return grid
+
+    def run_battle(self, config: SimulationConfig, rng: Optional[RNGStream] = None) -> BattleResult:
+        start = time.perf_counter()
+        rng = rng or RNGStream()
+
+        # Every engine object in this battle draws from the battle's own stream
+        mechanics = self.mechanics.fork(rng)
+        grid = self._build_grid(config, rng)
+        ai = AIEngine(ActionResolver(grid), AbilityResolver(mechanics), mechanics, difficulty=config.difficulty)
+
+        tm = TurnManager(rng=rng, store=EntityStore() if config.use_store else None)
+        for team, roster in ((TEAM_A, config.team_a), (TEAM_B, config.team_b)):
+            for entry in roster:
+                data = dict(entry)
+                data["team"] = team
+                tm.add_entity(EntityState(**data))
+
+        damage: Dict[str, int] = {}
+        uses: Dict[str, int] = {}
+
+        tm.start_combat()
+        actor = tm.get_current_actor()
+        state = tm.check_victory_condition()
+
+        while state == "Ongoing" and actor and tm.round <= config.max_rounds:
+            for res in ai.take_turn(actor, tm, config.max_actions_per_turn):
+                if res.get("action") in ("UseSkill", "Attack"):
+                    key = res.get("skill_id", "basic_attack")
+                    uses[key] = uses.get(key, 0) + 1
+                    damage[key] = damage.get(key, 0) + res.get("damage", 0)
+            state = tm.check_victory_condition()
+            if state != "Ongoing":
+                break
+            actor = tm.next_turn()
+
+        if state == "Victory":
+            winner = TEAM_A
+        elif state == "Defeat":
+            winner = TEAM_B
+        else:
+            winner = "Draw"
+
+        return BattleResult(
+            winner=winner,
+            rounds=min(tm.round, config.max_rounds),
+            elapsed=time.perf_counter() - start,
+            damage_by_ability=damage,
+            uses_by_ability=uses,
+        )
+
+    def run_many(self, config: SimulationConfig, provider: RNGProvider, indices: List[int]) -> SimulationReport:
+        # Battle i always gets substream i, so results don't depend on how work is split
+        report = SimulationReport()
+        with contextlib.redirect_stdout(_NullWriter()):
+            for i in indices:
+                report.add(self.run_battle(config, provider.substream(i)))
+        return report
+
+# One simulator per worker process
+_WORKER_SIM: Optional[BattleSimulator] = None
+
+def _run_chunk(config: SimulationConfig, provider: RNGProvider, indices: List[int]) -> SimulationReport:
+    global _WORKER_SIM
+    if _WORKER_SIM is None:
+        with contextlib.redirect_stdout(_NullWriter()):
+            _WORKER_SIM = BattleSimulator()
+    return _WORKER_SIM.run_many(config, provider, indices)
+
+def run_simulation(team_a: Optional[List[RosterEntry]] = None,
+                   team_b: Optional[List[RosterEntry]] = None,
+                   battles: int = 1000,
+                   workers: Optional[int] = None,
+                   seed: Optional[int] = None,
+                   **config_kwargs) -> SimulationReport:
+    """
+    Runs `battles` AI-vs-AI battles of team_a (Player side) vs team_b (Enemy side)
+    across a process pool and returns the aggregated report.
+    """
+    config = SimulationConfig(**config_kwargs)
+    if team_a is not None: config.team_a = _roster_dicts(team_a)
+    if team_b is not None: config.team_b = _roster_dicts(team_b)
+
+    provider = RNGProvider(seed)
+    workers = workers or os.cpu_count() or 1
+    workers = max(1, min(workers, battles))
+
+    start = time.perf_counter()
+    if workers == 1:
+        report = _run_chunk(config, provider, list(range(battles)))
+    else:
+        chunks = [list(range(i, battles, workers)) for i in range(workers)]
+        report = SimulationReport()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for partial in pool.map(_run_chunk, [config] * workers, [provider] * workers, chunks):
+                report.merge(partial)
+
+    report.workers = workers
+    report.wall_time = time.perf_counter() - start
+    return report
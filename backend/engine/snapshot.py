@@ -0,0 +1,206 @@
+from typing import Any, Dict, Iterator, NamedTuple, Optional, Tuple
+
+# Copy-on-write battle snapshots for lookahead, undo and client previews.
+#
+#   base = BattleState.capture(turn_manager, grid)   # O(units + cells), once
+#   child = base.fork()                              # O(1): shares everything
+#   child.update("E1", hp=3); child.move("E1", 2, 0) # copies only that one record
+#   del child                                        # discard = rollback
+#
+# Units are immutable UnitRecord tuples. A fork stores only the records (and
+# occupancy / terrain cells) it changed and reads everything else through its
+# parent chain; chains are compacted once they get deep so lookups stay cheap.
+
+Cell = Tuple[int, int]
+
+class UnitRecord(NamedTuple):
+    id: str
+    name: str
+    team: str
+    hp: int
+    max_hp: int
+    composure: int
+    max_composure: int
+    ap: int
+    stamina: int
+    max_stamina: int
+    focus: int
+    max_focus: int
+    x: int
+    y: int
+    initiative: int
+    stats: Dict[str, int] # Shared with the live entity; treat as read-only
+    known_skills: Tuple[str, ...]
+    status_effects: Tuple[str, ...]
+
+# Fields written back to live entities by BattleState.restore
+RESTORED_FIELDS = ("hp", "composure", "ap", "stamina", "focus", "x", "y", "team")
+
+# Forks deeper than this are flattened so lookups never walk long chains
+MAX_CHAIN = 16
+
+_VACANT = None # Marks a cell a fork has emptied
+
+def _record(entity: Any) -> UnitRecord:
+    return UnitRecord(
+        entity.id, entity.name, entity.team, entity.hp, entity.max_hp, entity.composure, entity.max_composure,
+        entity.ap, entity.stamina, entity.max_stamina, entity.focus, entity.max_focus,
+        entity.x, entity.y, entity.initiative, entity.stats,
+        tuple(entity.known_skills), tuple(entity.status_effects),
+    )
+
+class BattleState:
+    __slots__ = ("parent", "depth", "units", "cells", "terrain", "round", "current_id", "__weakref__")
+
+    def __init__(self, parent: Optional['BattleState'] = None):
+        self.parent = parent
+        self.depth = parent.depth + 1 if parent else 0
+        self.units: Dict[str, UnitRecord] = {} # Records changed at this level
+        self.cells: Dict[Cell, Optional[str]] = {} # Occupancy changed at this level (None = vacated)
+        self.terrain: Dict[Cell, str] = {} # Terrain changed at this level
+        self.round = parent.round if parent else 1
+        self.current_id = parent.current_id if parent else None
+
+    @classmethod
+    def capture(cls, turn_manager: Any, grid: Any = None) -> 'BattleState':
+        """Root snapshot of a live battle (living units occupy their cells)."""
+        state = cls()
+        for entity in turn_manager.entities.values():
+            record = _record(entity)
+            state.units[record.id] = record
+            if record.hp > 0:
+                state.cells[(record.x, record.y)] = record.id
+        if grid is not None:
+            state.terrain = dict(grid.cells)
+        state.round = turn_manager.round
+        current = turn_manager.get_current_actor()
+        state.current_id = current.id if current else None
+        return state
+
+    # --- Forking ---
+
+    def fork(self) -> 'BattleState':
+        """O(1) child that shares everything until it writes."""
+        if self.depth >= MAX_CHAIN:
+            return self.flatten().fork()
+        return BattleState(self)
+
+    def flatten(self) -> 'BattleState':
+        """Equivalent root state with the whole chain merged (O(units + cells))."""
+        flat = BattleState()
+        for level in reversed(list(self._chain())):
+            flat.units.update(level.units)
+            flat.cells.update(level.cells)
+            flat.terrain.update(level.terrain)
+        flat.cells = {c: eid for c, eid in flat.cells.items() if eid is not _VACANT}
+        flat.round = self.round
+        flat.current_id = self.current_id
+        return flat
+
+    def commit(self) -> 'BattleState':
+        """
+        Folds this fork's changes into its parent (accept a speculative line) and returns
+        the parent. Sibling forks of the same parent will see the change, so discard them first.
+        """
+        parent = self.parent
+        if parent is None:
+            return self
+        parent.units.update(self.units)
+        parent.cells.update(self.cells)
+        parent.terrain.update(self.terrain)
+        parent.round = self.round
+        parent.current_id = self.current_id
+        return parent
+
+    def _chain(self) -> Iterator['BattleState']:
+        level = self
+        while level is not None:
+            yield level
+            level = level.parent
+
+    # --- Reads ---
+
+    def unit(self, entity_id: str) -> Optional[UnitRecord]:
+        for level in self._chain():
+            record = level.units.get(entity_id)
+            if record is not None:
+                return record
+        return None
+
+    def all_units(self) -> Dict[str, UnitRecord]:
+        merged: Dict[str, UnitRecord] = {}
+        for level in self._chain():
+            for eid, record in level.units.items():
+                merged.setdefault(eid, record)
+        return merged
+
+    def living(self, team: Optional[str] = None, exclude_team: Optional[str] = None):
+        return [u for u in self.all_units().values()
+                if u.hp > 0 and (team is None or u.team == team) and (exclude_team is None or u.team != exclude_team)]
+
+    def occupant(self, x: int, y: int) -> Optional[str]:
+        cell = (x, y)
+        for level in self._chain():
+            if cell in level.cells:
+                return level.cells[cell]
+        return None
+
+    def terrain_at(self, x: int, y: int) -> Optional[str]:
+        cell = (x, y)
+        for level in self._chain():
+            if cell in level.terrain:
+                return level.terrain[cell]
+        return None
+
+    def in_bounds(self, x: int, y: int) -> bool:
+        return self.terrain_at(x, y) is not None
+
+    # --- Writes (only ever touch this level) ---
+
+    def update(self, entity_id: str, **changes) -> UnitRecord:
+        record = self.unit(entity_id)._replace(**changes)
+        self.units[entity_id] = record
+        if "hp" in changes and record.hp <= 0 and self.occupant(record.x, record.y) == entity_id:
+            self.cells[(record.x, record.y)] = _VACANT # The dead don't block
+        return record
+
+    def move(self, entity_id: str, x: int, y: int) -> UnitRecord:
+        record = self.unit(entity_id)
+        if self.occupant(record.x, record.y) == entity_id:
+            self.cells[(record.x, record.y)] = _VACANT
+        if record.hp > 0:
+            self.cells[(x, y)] = entity_id
+        return self.update(entity_id, x=x, y=y)
+
+    def set_terrain(self, x: int, y: int, kind: str):
+        self.terrain[(x, y)] = kind
+
+    # --- Live battle ---
+
+    def restore(self, turn_manager: Any, grid: Any = None):
+        """
+        Writes this state back into a live battle (undo). Goes through normal attribute
+        writes so the turn manager's spatial index, scheduler and team counts follow.
+        """
+        for eid, record in self.all_units().items():
+            entity = turn_manager.entities.get(eid)
+            if entity is None:
+                continue
+            for field in RESTORED_FIELDS:
+                value = getattr(record, field)
+                if getattr(entity, field) != value:
+                    setattr(entity, field, value)
+            if tuple(entity.status_effects) != record.status_effects:
+                # Keep the status engine's books in step with the restored list
+                for status_id in [s for s in entity.status_effects if s not in record.status_effects]:
+                    turn_manager.statuses.remove(entity, status_id)
+                entity.status_effects[:] = list(record.status_effects)
+                turn_manager.statuses.adopt(entity)
+        turn_manager.round = self.round
+        if self.current_id in turn_manager.turn_order:
+            turn_manager.current_index = turn_manager.turn_order.index(self.current_id)
+        if grid is not None:
+            terrain = {}
+            for level in reversed(list(self._chain())):
+                terrain.update(level.terrain)
+            grid.cells = terrain
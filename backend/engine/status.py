@@ -0,0 +1,166 @@
+import re
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Set, Union
+
+from backend.engine.dice_expr import DiceExpr, compile_dice
+
+# Duration-tracked status effects.
+# Each entity has a status_id -> StatusInstance dict (O(1) apply/refresh/remove).
+# Expiries sit in a round-indexed timing wheel: bucket[round][entity_id] holds the
+# statuses that end when that entity starts its turn in that round, so a turn
+# start only touches the statuses that actually tick or expire for that actor.
+# EntityState.status_effects stays a plain list of ids for the API / Unity client.
+
+MAX_STACKS = 5
+
+@dataclass
+class StatusTick:
+    """Per-turn effect: `hp` dice are subtracted (damage) or added (heal=True), scaled by stacks."""
+    amount: DiceExpr
+    heal: bool = False
+
+# Tick rules keyed by status naming conventions in the skills data,
+# e.g. "Bleeding (T2)", "Poisoned (T1)", "Regeneration (1d4)"
+TICK_RULES = [
+    (re.compile(r"^Bleeding \(T(\d+)\)"), lambda m: StatusTick(compile_dice(m.group(1)))),
+    (re.compile(r"^Poisoned \(T(\d+)\)"), lambda m: StatusTick(compile_dice(f"{m.group(1)}d4"))),
+    (re.compile(r"^Regeneration \((\d*d\d+)\)"), lambda m: StatusTick(compile_dice(m.group(1)), heal=True)),
+]
+
+def tick_for(status_id: str) -> Optional[StatusTick]:
+    for pattern, build in TICK_RULES:
+        m = pattern.match(status_id)
+        if m:
+            return build(m)
+    return None
+
+def rounds_for(duration: Union[int, str, None]) -> Optional[int]:
+    """Effect duration -> rounds; None for open-ended ("scene", "special", 0 / unset)."""
+    if isinstance(duration, int) and duration > 0:
+        return duration
+    return None
+
+@dataclass
+class StatusInstance:
+    status_id: str
+    source_id: Optional[str] = None
+    stacks: int = 1
+    applied_round: int = 1
+    expires_round: Optional[int] = None # None = lasts until removed / the scene ends
+    tick: Optional[StatusTick] = field(default=None, repr=False)
+
+    def remaining(self, current_round: int) -> Optional[int]:
+        if self.expires_round is None:
+            return None
+        return max(0, self.expires_round - current_round)
+
+    def to_dict(self, current_round: int) -> Dict[str, Any]:
+        return {
+            "status_id": self.status_id,
+            "source_id": self.source_id,
+            "stacks": self.stacks,
+            "remaining": self.remaining(current_round),
+        }
+
+class StatusEngine:
+    def __init__(self, clock: Callable[[], int] = lambda: 1):
+        self.clock = clock # Current round
+        self.books: Dict[str, Dict[str, StatusInstance]] = {}
+        self.wheel: Dict[int, Dict[str, Set[str]]] = {}
+        self.tickers: Dict[str, Set[str]] = {} # entity -> statuses with tick effects
+
+    def clear(self):
+        self.books.clear()
+        self.wheel.clear()
+        self.tickers.clear()
+
+    def get(self, entity_id: str, status_id: str) -> Optional[StatusInstance]:
+        return self.books.get(entity_id, {}).get(status_id)
+
+    def statuses(self, entity_id: str) -> List[StatusInstance]:
+        return list(self.books.get(entity_id, {}).values())
+
+    def adopt(self, entity: Any):
+        """Tracks statuses already listed on an entity (e.g. a loaded save) as open-ended."""
+        for status_id in entity.status_effects:
+            if self.get(entity.id, status_id) is None:
+                self._store(entity.id, StatusInstance(status_id, applied_round=self.clock(), tick=tick_for(status_id)))
+
+    def apply(self, entity: Any, status_id: str, duration: Union[int, str, None] = None,
+              source_id: Optional[str] = None) -> StatusInstance:
+        """Adds a status or refreshes it (stacking up to MAX_STACKS, keeping the later expiry)."""
+        now = self.clock()
+        rounds = rounds_for(duration)
+        expires = now + rounds if rounds else None
+        inst = self.get(entity.id, status_id)
+        if inst is None:
+            inst = StatusInstance(status_id, source_id, 1, now, expires, tick_for(status_id))
+            self._store(entity.id, inst)
+            entity.status_effects.append(status_id)
+            print(f"[Effect] Applied {status_id} to {entity.name}")
+            return inst
+
+        inst.stacks = min(MAX_STACKS, inst.stacks + 1)
+        inst.source_id = source_id or inst.source_id
+        if inst.expires_round is not None and (expires is None or expires > inst.expires_round):
+            self._unschedule(entity.id, inst)
+            inst.expires_round = expires
+            self._schedule(entity.id, inst)
+        return inst
+
+    def remove(self, entity: Any, status_id: str) -> bool:
+        inst = self.books.get(entity.id, {}).pop(status_id, None)
+        if inst is None:
+            if status_id in entity.status_effects:
+                entity.status_effects.remove(status_id)
+                return True
+            return False
+        self._unschedule(entity.id, inst)
+        self.tickers.get(entity.id, set()).discard(status_id)
+        if status_id in entity.status_effects:
+            entity.status_effects.remove(status_id)
+        return True
+
+    def on_round_start(self, current_round: int):
+        # Entities that missed their turn (dead, removed) leave stale buckets; fold them forward
+        for r in [r for r in self.wheel if r < current_round]:
+            for entity_id, ids in self.wheel.pop(r).items():
+                self.wheel.setdefault(current_round, {}).setdefault(entity_id, set()).update(ids)
+
+    def on_turn_start(self, entity: Any, dice: Any) -> List[Dict[str, Any]]:
+        """Runs this actor's ticks, then expires what ends now. Returns log events."""
+        events = []
+        for status_id in sorted(self.tickers.get(entity.id, ())):
+            inst = self.books[entity.id][status_id]
+            amount = sum(max(0, inst.tick.amount.roll(dice)) for _ in range(inst.stacks))
+            if inst.tick.heal:
+                entity.hp = min(entity.max_hp, entity.hp + amount)
+            else:
+                entity.hp = max(0, entity.hp - amount)
+            events.append({"entity_id": entity.id, "status_id": status_id, "tick": -amount if not inst.tick.heal else amount})
+
+        bucket = self.wheel.get(self.clock())
+        expiring = bucket.pop(entity.id, set()) if bucket else set()
+        for status_id in sorted(expiring):
+            if self.remove(entity, status_id):
+                events.append({"entity_id": entity.id, "status_id": status_id, "expired": True})
+                print(f"[Effect] {status_id} wore off {entity.name}")
+        return events
+
+    def _store(self, entity_id: str, inst: StatusInstance):
+        self.books.setdefault(entity_id, {})[inst.status_id] = inst
+        self._schedule(entity_id, inst)
+        if inst.tick:
+            self.tickers.setdefault(entity_id, set()).add(inst.status_id)
+
+    def _schedule(self, entity_id: str, inst: StatusInstance):
+        if inst.expires_round is not None:
+            self.wheel.setdefault(inst.expires_round, {}).setdefault(entity_id, set()).add(inst.status_id)
+
+    def _unschedule(self, entity_id: str, inst: StatusInstance):
+        if inst.expires_round is None:
+            return
+        bucket = self.wheel.get(inst.expires_round, {})
+        ids = bucket.get(entity_id)
+        if ids:
+            ids.discard(inst.status_id)
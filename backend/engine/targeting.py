@@ -0,0 +1,123 @@
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+# Area-of-effect targeting.
+# Shapes are rasterized once per (shape, size, direction) into offset templates
+# and placed on the grid by translation. The grid is 4-way (Manhattan), so
+# bursts are diamonds and directions snap to the dominant axis.
+#
+#   burst  - every cell within `size` of the centre (legacy "radius")
+#   ring   - cells exactly `size` from the centre
+#   cone   - widens by one cell per step away from the caster
+#   line   - `size` cells straight out from the caster (legacy "wall")
+
+Cell = Tuple[int, int]
+
+SHAPE_ALIASES = {"radius": "burst", "circle": "burst", "wall": "line"}
+SHAPES = ("single", "burst", "ring", "cone", "line")
+
+# Bursts/rings are centred on the aimed cell; cones/lines start next to the caster
+CASTER_ORIGIN_SHAPES = ("cone", "line")
+
+DIRECTIONS: Tuple[Cell, ...] = ((1, 0), (0, 1), (-1, 0), (0, -1))
+
+def normalize_shape(shape: Optional[str]) -> str:
+    shape = (shape or "single").lower()
+    shape = SHAPE_ALIASES.get(shape, shape)
+    if shape not in SHAPES:
+        raise ValueError(f"Unknown area shape: {shape}")
+    return shape
+
+def direction_to(origin: Cell, target: Cell) -> Cell:
+    """Unit direction from origin towards target along the dominant axis (east if they coincide)."""
+    dx, dy = target[0] - origin[0], target[1] - origin[1]
+    if dx == 0 and dy == 0:
+        return (1, 0)
+    if abs(dx) >= abs(dy):
+        return (1 if dx > 0 else -1, 0)
+    return (0, 1 if dy > 0 else -1)
+
+@lru_cache(maxsize=None)
+def shape_template(shape: str, size: int, direction: Cell = (1, 0)) -> FrozenSet[Cell]:
+    """Offsets covered by a shape relative to its origin. Cached per (shape, size, direction)."""
+    shape = normalize_shape(shape)
+    size = max(0, size)
+    fx, fy = direction
+    px, py = -fy, fx # Perpendicular
+    cells: Set[Cell] = set()
+    if shape == "single":
+        cells.add((0, 0))
+    elif shape in ("burst", "ring"):
+        low = size if shape == "ring" else 0
+        for dx in range(-size, size + 1):
+            for dy in range(-size, size + 1):
+                if low <= abs(dx) + abs(dy) <= size:
+                    cells.add((dx, dy))
+    elif shape == "cone":
+        for forward in range(1, size + 1):
+            for lateral in range(-(forward - 1), forward):
+                cells.add((fx * forward + px * lateral, fy * forward + py * lateral))
+    elif shape == "line":
+        for forward in range(1, size + 1):
+            cells.add((fx * forward, fy * forward))
+    return frozenset(cells)
+
+def rasterize(shape: str, size: int, caster: Cell, aim: Cell) -> FrozenSet[Cell]:
+    """Grid cells hit by a shape cast by `caster` at `aim`."""
+    shape = normalize_shape(shape)
+    if shape in CASTER_ORIGIN_SHAPES:
+        origin, direction = caster, direction_to(caster, aim)
+    else:
+        origin, direction = aim, (1, 0)
+    ox, oy = origin
+    return frozenset((ox + dx, oy + dy) for dx, dy in shape_template(shape, size, direction))
+
+class SpatialIndex:
+    """cell -> entity ids, kept current by TurnManager as entities move."""
+
+    def __init__(self):
+        self.cells: Dict[Cell, Set[str]] = {}
+
+    def clear(self):
+        self.cells.clear()
+
+    def add(self, entity_id: str, cell: Cell):
+        self.cells.setdefault(cell, set()).add(entity_id)
+
+    def remove(self, entity_id: str, cell: Cell):
+        ids = self.cells.get(cell)
+        if ids:
+            ids.discard(entity_id)
+            if not ids:
+                del self.cells[cell]
+
+    def move(self, entity_id: str, old: Cell, new: Cell):
+        if old != new:
+            self.remove(entity_id, old)
+            self.add(entity_id, new)
+
+    def at(self, cell: Cell) -> Set[str]:
+        return self.cells.get(cell, set())
+
+    def query(self, cells: Iterable[Cell]) -> List[str]:
+        """Ids of entities standing in any of the cells (sorted for deterministic resolution order)."""
+        found: List[str] = []
+        index = self.cells
+        for cell in cells:
+            ids = index.get(cell)
+            if ids:
+                found.extend(ids)
+        return sorted(found)
+
+def ability_area(ability: Any) -> Tuple[str, int]:
+    """
+    (shape, size) for an ability: its targeting shape if set, otherwise the first
+    effect that carries a legacy `shape` (whose `range` is the area size).
+    """
+    targeting = ability.targeting
+    if targeting.shape and normalize_shape(targeting.shape) != "single":
+        return normalize_shape(targeting.shape), targeting.size
+    for effect in ability.effects:
+        if effect.shape:
+            return normalize_shape(effect.shape), effect.range or 1
+    return "single", 0
@@ -1,6 +1,18 @@
-from typing import List, Dict, Optional
-import random
-from pydantic import BaseModel
+import bisect
+from typing import Any, Callable, List, Dict, Optional
+from pydantic import BaseModel, PrivateAttr
+
+from backend.engine.dice import DiceEngine
+from backend.engine.rng import RNGStream
+from backend.engine.scheduler import TurnScheduler
+from backend.engine.snapshot import BattleState
+from backend.engine.status import StatusEngine
+from backend.engine.targeting import SpatialIndex
+
+# Fields whose changes are reported to the owning TurnManager
+OBSERVED_FIELDS = frozenset(("x", "y", "hp", "team"))
+
+TURN_AP = 5 # AP every actor starts its turn with
 
 class EntityState(BaseModel):
     id: str
@@ -26,16 +38,172 @@ class EntityState(BaseModel):
     known_skills: List[str] = []
     status_effects: List[str] = []
 
+    # Set by TurnManager.add_entity: called as observer(entity, field, old_value) after x/y/hp/team change
+    _observer: Optional[Callable[['EntityState', str, Any], None]] = PrivateAttr(default=None)
+
+    def __setattr__(self, name, value):
+        # The private slot is read directly: pydantic's private-attribute lookup dominates a move otherwise
+        observer = self.__pydantic_private__.get("_observer") if name in OBSERVED_FIELDS else None
+        if observer is not None:
+            old = self.__dict__[name]
+            super().__setattr__(name, value)
+            if old != value:
+                observer(self, name, old)
+            return
+        super().__setattr__(name, value)
+
+    def __deepcopy__(self, memo=None):
+        # Copies are detached: deep-copying the observer would clone the whole TurnManager
+        observer = self._observer
+        self._observer = None
+        try:
+            return super().__deepcopy__(memo)
+        finally:
+            self._observer = observer
+
 class TurnManager:
-    def __init__(self):
-        self.entities: Dict[str, EntityState] = {}
-        self.turn_order: List[str] = []
+    def __init__(self, rng: Optional[RNGStream] = None, store: Any = None):
+        self.rng = rng or RNGStream()
+        # Optional EntityStore (entity_store.py): entities become array-backed proxies
+        self.store = store
+        self.spatial = SpatialIndex()
+        self.statuses = StatusEngine(clock=lambda: self.round)
+        self.dice = DiceEngine(rng=self.rng) # Status ticks
+        self.turn_events: List[Dict] = [] # Ticks / expiries from the latest turn start
+        self.scheduler = TurnScheduler()
+        self.living_by_team: Dict[str, int] = {} # Kept current by the hp/team observer
+        self._entities: Dict[str, EntityState] = {}
+        self._turn_order: List[str] = []
+        self._order_keys: List[tuple] = [] # Scheduler keys parallel to turn_order
         self.current_index: int = 0
         self.round: int = 1
         self.combat_active: bool = False
+
+    @property
+    def entities(self) -> Dict[str, EntityState]:
+        return self._entities
+
+    @entities.setter
+    def entities(self, entities: Dict[str, EntityState]):
+        # Replacing the roster (new battle, loaded save) rebuilds every index
+        self._entities = {}
+        self.spatial.clear()
+        self.statuses.clear()
+        self.living_by_team = {}
+        self.turn_order = []
+        self.current_index = 0
+        if self.store is not None:
+            self.store.clear()
+        in_combat = self.combat_active
+        self.combat_active = False # Not reinforcements: rebuild the order below instead of splicing each one in
+        for entity in entities.values():
+            self.add_entity(entity)
+        self.combat_active = in_combat
+        if in_combat:
+            # Callers restoring a saved turn set turn_order / current_index afterwards
+            self.turn_order = sorted(self._entities, key=lambda x: self._entities[x].initiative, reverse=True)
+
+    @property
+    def turn_order(self) -> List[str]:
+        return self._turn_order
+
+    @turn_order.setter
+    def turn_order(self, order: List[str]):
+        # Also used by SessionManager.load_game to restore a saved order
+        self.scheduler.clear()
+        self._turn_order = list(order)
+        self._order_keys = []
+        for eid in self._turn_order:
+            entity = self._entities[eid]
+            self._order_keys.append(self.scheduler.assign(eid, entity.initiative))
+            if entity.hp > 0:
+                self.scheduler.add(eid)
         
     def add_entity(self, entity: EntityState):
-        self.entities[entity.id] = entity
+        old = self._entities.get(entity.id)
+        if old is not None:
+            self.spatial.remove(old.id, (old.x, old.y))
+            if old.hp > 0:
+                self._count(old.team, -1)
+        if self.store is not None and isinstance(entity, EntityState):
+            entity = self.store.add(entity)
+        self._entities[entity.id] = entity
+        entity._observer = self._on_entity_changed
+        self.spatial.add(entity.id, (entity.x, entity.y))
+        self.statuses.adopt(entity)
+        if entity.hp > 0:
+            self._count(entity.team, 1)
+
+        if entity.id in self.scheduler.key_of:
+            # Same actor re-added: keep its slot, refresh whether it can act
+            if entity.hp > 0: self.scheduler.add(entity.id)
+            else: self.scheduler.discard(entity.id)
+        elif self.combat_active:
+            self._insert_into_order(entity)
+
+    def _insert_into_order(self, entity: EntityState):
+        """Summons / reinforcements join mid-combat at their initiative slot."""
+        key = self.scheduler.assign(entity.id, entity.initiative)
+        i = bisect.bisect_left(self._order_keys, key)
+        self._order_keys.insert(i, key)
+        self._turn_order.insert(i, entity.id)
+        if i <= self.current_index and len(self._turn_order) > 1:
+            self.current_index += 1 # Keep pointing at the same current actor
+        if entity.hp > 0:
+            self.scheduler.add(entity.id)
+
+    def _count(self, team: str, delta: int):
+        self.living_by_team[team] = self.living_by_team.get(team, 0) + delta
+
+    def _on_entity_changed(self, entity: EntityState, field: str, old):
+        if self._entities.get(entity.id) is not entity:
+            return # A copy that still carries our observer
+        if field == "x":
+            self.spatial.move(entity.id, (old, entity.y), (entity.x, entity.y))
+        elif field == "y":
+            self.spatial.move(entity.id, (entity.x, old), (entity.x, entity.y))
+        elif field == "hp":
+            was_alive, alive = old > 0, entity.hp > 0
+            if was_alive != alive:
+                self._count(entity.team, 1 if alive else -1)
+                if entity.id in self.scheduler.key_of:
+                    if alive: self.scheduler.add(entity.id)
+                    else: self.scheduler.discard(entity.id)
+        elif field == "team" and entity.hp > 0:
+            self._count(old, -1)
+            self._count(entity.team, 1)
+
+    def entity_states(self) -> Dict[str, EntityState]:
+        """The roster as EntityState models (materializes store proxies) for saving / the API."""
+        return {eid: e if isinstance(e, EntityState) else e.to_state() for eid, e in self._entities.items()}
+
+    def snapshot(self, grid: Any = None) -> BattleState:
+        """Copy-on-write snapshot of the battle; fork() it for lookahead, restore() it to undo."""
+        return BattleState.capture(self, grid)
+
+    def nearest_hostile(self, actor: Any) -> Optional[EntityState]:
+        """Closest living entity on another team (first added wins ties)."""
+        if self.store is not None:
+            return self.store.nearest(actor.x, actor.y, exclude_team=actor.team)
+        nearest, best = None, None
+        for entity in self._entities.values():
+            if entity.team != actor.team and entity.hp > 0:
+                d = abs(entity.x - actor.x) + abs(entity.y - actor.y)
+                if best is None or d < best:
+                    nearest, best = entity, d
+        return nearest
+
+    def hostiles_within(self, actor: Any, radius: int) -> List[EntityState]:
+        """Living entities on other teams within Manhattan `radius` of the actor."""
+        if self.store is not None:
+            return self.store.within(actor.x, actor.y, radius, exclude_team=actor.team)
+        return [e for e in self._entities.values()
+                if e.team != actor.team and e.hp > 0 and abs(e.x - actor.x) + abs(e.y - actor.y) <= radius]
+
+    def entities_at(self, cells, living_only: bool = True) -> List[EntityState]:
+        """Entities standing in the given cells, via the spatial index."""
+        found = [self._entities[eid] for eid in self.spatial.query(cells)]
+        return [e for e in found if e.hp > 0] if living_only else found
         
     def start_combat(self):
         """Starts combat mode."""
@@ -47,7 +215,7 @@ class TurnManager:
         """Rolls initiative for all entities and sorts the turn order."""
         for eid, entity in self.entities.items():
             if entity.initiative < 90:
-                roll = random.randint(1, 20)
+                roll = self.rng.randint(1, 20)
                 entity.initiative = roll
             
         self.turn_order = sorted(
@@ -70,39 +238,57 @@ class TurnManager:
             return None
         return self.entities[self.turn_order[self.current_index]]
         
+    def upcoming(self) -> List[str]:
+        """Living actors in the order they will act after the current one (one full cycle, no side effects)."""
+        if not self.combat_active or not self._turn_order:
+            return []
+        order: List[str] = []
+        current_id = self._turn_order[self.current_index]
+        for _ in range(len(self.scheduler)):
+            current_id, _wrapped = self.scheduler.next_after(current_id)
+            if current_id is None:
+                break
+            order.append(current_id)
+        return order
+
     def next_turn(self):
         """Advances to the next living actor."""
         if not self.combat_active:
             return None
-            
-        # Loop until we find a living actor or exhaust list
-        attempts = 0
-        while attempts < len(self.turn_order):
-            self.current_index += 1
-            if self.current_index >= len(self.turn_order):
-                self.current_index = 0
+
+        # The scheduler only holds living actors, so dead ones are never visited
+        current_id = self._turn_order[self.current_index] if self._turn_order else None
+        for _ in range(len(self.scheduler) + 1):
+            next_id, wrapped = self.scheduler.next_after(current_id)
+            if next_id is None:
+                break
+            if wrapped:
                 self.round += 1
+                self.statuses.on_round_start(self.round)
                 print(f"--- Round {self.round} Start ---")
-            
-            actor = self.get_current_actor()
-            if actor and actor.hp > 0:
-                self._start_turn_logic(actor)
+            self.current_index = bisect.bisect_left(self._order_keys, self.scheduler.key_of[next_id])
+
+            actor = self._entities[next_id]
+            self._start_turn_logic(actor)
+            if actor.hp > 0: # A damage tick can end it before it acts
                 return actor
-            
-            attempts += 1
+            current_id = next_id
             
         print("All entities dead?")
         return None
         
     def _start_turn_logic(self, actor: EntityState):
         # Reset AP
-        actor.ap = 5 
+        actor.ap = TURN_AP
         print(f"Start Turn: {actor.name} (AP: {actor.ap})")
+        # Only this actor's ticking / expiring statuses are touched
+        self.turn_events = self.statuses.on_turn_start(actor, self.dice)
 
     def check_victory_condition(self) -> str:
         """Returns 'Ongoing', 'Victory' (Player Win), or 'Defeat' (Player Loss)"""
-        players_alive = any(e.hp > 0 and e.team == "Player" for e in self.entities.values())
-        enemies_alive = any(e.hp > 0 and e.team == "Enemy" for e in self.entities.values())
+        # O(1): per-team living counts are maintained by the hp/team observer
+        players_alive = self.living_by_team.get("Player", 0) > 0
+        enemies_alive = self.living_by_team.get("Enemy", 0) > 0
         
         if not players_alive:
             self.combat_active = False
@@ -0,0 +1,43 @@
+"""
+Microbenchmarks for the dice engine: single rolls (gameplay path) vs batched rolls (Monte Carlo path).
+
+Usage (from repo root):
+    python backend/scripts/bench_dice.py
+"""
+import os
+import random
+import sys
+import timeit
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.engine.dice import DiceEngine
+
+SINGLE_ROLLS = 200_000
+BATCH_SIZE = 1_000_000
+
+def legacy_roll(sides: int = 20, count: int = 1) -> int:
+    # Previous MechanicsEngine.roll_dice implementation, kept for comparison
+    return sum(random.randint(1, sides) for _ in range(count))
+
+def report(label: str, seconds: float, rolls: int):
+    print(f"{label:<40} {1e9 * seconds / rolls:>9.1f} ns/roll  ({rolls / seconds / 1e6:.2f} M rolls/s)")
+
+def main():
+    dice = DiceEngine(seed=42)
+
+    print("--- Single Rolls ---")
+    report("legacy sum(randint) 1d20", timeit.timeit(lambda: legacy_roll(20), number=SINGLE_ROLLS), SINGLE_ROLLS)
+    report("DiceEngine.roll 1d20", timeit.timeit(lambda: dice.roll(20), number=SINGLE_ROLLS), SINGLE_ROLLS)
+    report("legacy sum(randint) 3d6", timeit.timeit(lambda: legacy_roll(6, 3), number=SINGLE_ROLLS), SINGLE_ROLLS)
+    report("DiceEngine.roll 3d6", timeit.timeit(lambda: dice.roll(6, 3), number=SINGLE_ROLLS), SINGLE_ROLLS)
+
+    print("--- Batched Rolls ---")
+    if dice.generator is None:
+        print("numpy not installed; batched rolls use the scalar loop.")
+    report(f"DiceEngine.roll_batch 1d20 x{BATCH_SIZE}", timeit.timeit(lambda: dice.roll_batch(20, 1, BATCH_SIZE), number=5), 5 * BATCH_SIZE)
+    report(f"DiceEngine.roll_batch 3d6 x{BATCH_SIZE}", timeit.timeit(lambda: dice.roll_batch(6, 3, BATCH_SIZE), number=5), 5 * BATCH_SIZE)
+    report("scalar loop 3d6 x100000", timeit.timeit(lambda: [dice.roll(6, 3) for _ in range(100_000)], number=1), 100_000)
+
+if __name__ == "__main__":
+    main()
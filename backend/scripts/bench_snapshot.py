@@ -0,0 +1,73 @@
+"""
+Benchmarks battle lookahead state: copy-on-write snapshots vs deep-copying the live battle.
+Each cycle forks the state, mutates a couple of units (a move and a hit), then discards it.
+
+Usage (from repo root):
+    python backend/scripts/bench_snapshot.py [--units 8 64 512]
+"""
+import argparse
+import copy
+import os
+import sys
+import timeit
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.engine.grid import GridManager
+from backend.engine.turn_manager import EntityState, TurnManager
+
+CYCLES = 20_000
+
+def build(units: int):
+    grid = GridManager(radius=max(10, int(units ** 0.5)))
+    grid.generate_empty_map()
+    tm = TurnManager()
+    for i in range(units):
+        tm.add_entity(EntityState(id=f"U{i}", name=f"U{i}", hp=20, max_hp=20, composure=10, max_composure=10,
+                                  x=i % grid.radius, y=i // grid.radius, team="Player" if i % 2 else "Enemy",
+                                  stats={"Might": 12, "Reflexes": 10}, known_skills=["basic_attack"]))
+    return tm, grid
+
+def deepcopy_cycle(tm: TurnManager, grid: GridManager):
+    # What a naive lookahead has to do today: clone every entity model and the terrain
+    entities = {eid: e.model_copy(deep=True) for eid, e in tm.entities.items()}
+    cells = copy.deepcopy(grid.cells)
+    entities["U0"].x += 1
+    entities["U1"].hp -= 5
+    del entities, cells
+
+def fork_cycle(base):
+    child = base.fork()
+    mover = child.unit("U0")
+    child.move("U0", mover.x + 1, mover.y)
+    child.update("U1", hp=child.unit("U1").hp - 5)
+    del child
+
+def nested_cycle(base, depth: int = 4):
+    # A short search line: fork of a fork of a fork..., each ply touching one unit
+    state = base
+    for ply in range(depth):
+        state = state.fork()
+        state.update(f"U{ply}", hp=state.unit(f"U{ply}").hp - 1)
+    del state
+
+def report(label: str, seconds: float, cycles: int):
+    print(f"{label:<36} {1e6 * seconds / cycles:>9.2f} us/cycle")
+
+def main():
+    parser = argparse.ArgumentParser(description="Snapshot fork/mutate/discard benchmark")
+    parser.add_argument("--units", type=int, nargs="+", default=[8, 64, 512])
+    args = parser.parse_args()
+
+    for units in args.units:
+        tm, grid = build(units)
+        print(f"--- {units} units, {len(grid.cells)} cells ---")
+        cycles = max(100, CYCLES // units)
+        report("deepcopy entities + grid", timeit.timeit(lambda: deepcopy_cycle(tm, grid), number=cycles), cycles)
+        report("capture snapshot", timeit.timeit(lambda: tm.snapshot(grid), number=cycles), cycles)
+        base = tm.snapshot(grid)
+        report("fork/mutate/discard", timeit.timeit(lambda: fork_cycle(base), number=CYCLES), CYCLES)
+        report("4-ply nested forks", timeit.timeit(lambda: nested_cycle(base), number=CYCLES), CYCLES)
+
+if __name__ == "__main__":
+    main()
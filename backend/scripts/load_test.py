@@ -0,0 +1,300 @@
+"""
+Load-testing harness for the battle API.
+
+Simulates N concurrent players, each running full battles
+(start -> move -> ambush attack -> abilities/attacks/commands -> end turn with AI)
+and reports throughput, latency percentiles per endpoint and error rates.
+
+The server keeps a single global battle (turn_manager / grid_manager in server.py),
+so every simulated player drives that same battle: one player's /battle/start
+resets it under the others, and their actions interleave. The numbers measure how
+the API holds up under contention on one shared battle - request latency and
+errors - not N independent games; battle outcomes are only indicative.
+
+By default the FastAPI app is driven in-process through an ASGI transport.
+Pass --url to hit a server that is already running on localhost instead.
+Use --offline (in-process only) to swap the LLM and voice services for
+local stand-ins so the run needs neither Ollama nor Whisper.
+
+Usage (from repo root):
+    python backend/scripts/load_test.py --players 8 --battles 5 --offline
+    python backend/scripts/load_test.py --url http://127.0.0.1:8000 --players 4
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import sys
+import time
+import wave
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+# Add the repo root to sys.path so `backend.*` imports resolve when run as a script
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+
+# --- Offline stand-ins ---
+
+class OfflineLLMClient:
+    """Drop-in for LLMClient that answers locally with a fixed latency."""
+
+    def __init__(self, latency_ms: float = 0.0):
+        self.model = "offline"
+        self.host = "local"
+        self.latency = latency_ms / 1000.0
+
+    def check_connection(self) -> bool:
+        return True
+
+    def generate(self, prompt: str, system: str = "") -> str:
+        if self.latency:
+            time.sleep(self.latency)
+        return "The chaos shifts..."
+
+    def generate_json(self, prompt: str, schema: Dict[str, Any], system: str = "") -> Dict[str, Any]:
+        if self.latency:
+            time.sleep(self.latency)
+
+        # Mimic the parser contract well enough for the server to execute something
+        text = prompt.lower()
+        coords = re.search(r"(-?\d+)\s*,\s*(-?\d+)", text.split("player input:")[-1])
+        if "move" in text and coords:
+            return {"action": "Move", "params": {"target_pos": [int(coords.group(1)), int(coords.group(2))]}}
+        target = re.search(r"'id': '([^']+)'", prompt)
+        if "attack" in text and target:
+            return {"action": "Attack", "params": {"target_id": target.group(1)}}
+        return {"action": "Unknown", "params": {}, "reason": "offline stand-in"}
+
+
+class OfflineVoiceInterface:
+    """Drop-in for VoiceInterface: fixed transcript, silent WAV output."""
+
+    def __init__(self):
+        self.enabled = True
+        self.model_size = "offline"
+
+    def transcribe(self, audio_path: str) -> str:
+        return "attack the bear"
+
+    def speak(self, text: str, output_path: str = "output.wav"):
+        with wave.open(output_path, "wb") as f:
+            f.setnchannels(1)
+            f.setsampwidth(1)
+            f.setframerate(8000)
+            f.writeframes(b"\x80" * 800)
+        return output_path
+
+
+def install_offline_services(server, llm_latency_ms: float = 0.0):
+    """Rewires the in-process server module to use the offline stand-ins."""
+    llm = OfflineLLMClient(latency_ms=llm_latency_ms)
+    server.llm_client = llm
+    server.parser_agent.llm = llm
+    server.narrator_agent.llm = llm
+    server.voice_interface = OfflineVoiceInterface()
+
+
+# --- Metrics ---
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an unsorted sample list."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+class LoadStats:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.battles_completed = 0
+        self.battle_outcomes: Dict[str, int] = defaultdict(int)
+
+    def record(self, endpoint: str, elapsed: float, ok: bool):
+        self.latencies[endpoint].append(elapsed)
+        if not ok:
+            self.errors[endpoint] += 1
+
+    def report(self, wall_time: float) -> Dict[str, Any]:
+        total = sum(len(v) for v in self.latencies.values())
+        total_errors = sum(self.errors.values())
+        endpoints = {}
+        for name, samples in sorted(self.latencies.items()):
+            endpoints[name] = {
+                "count": len(samples),
+                "errors": self.errors.get(name, 0),
+                "error_rate": self.errors.get(name, 0) / len(samples),
+                "mean_ms": 1000 * sum(samples) / len(samples),
+                "p50_ms": 1000 * percentile(samples, 50),
+                "p90_ms": 1000 * percentile(samples, 90),
+                "p99_ms": 1000 * percentile(samples, 99),
+                "max_ms": 1000 * max(samples),
+            }
+        return {
+            "wall_time_s": wall_time,
+            "requests": total,
+            "throughput_rps": total / wall_time if wall_time else 0.0,
+            "errors": total_errors,
+            "error_rate": total_errors / total if total else 0.0,
+            "battles_completed": self.battles_completed,
+            "battles_per_s": self.battles_completed / wall_time if wall_time else 0.0,
+            "outcomes": dict(self.battle_outcomes),
+            "endpoints": endpoints,
+        }
+
+
+def print_report(report: Dict[str, Any]):
+    print(f"\n=== Load Test Report ({report['wall_time_s']:.2f}s) ===")
+    print(f"Requests: {report['requests']}  Throughput: {report['throughput_rps']:.1f} req/s  "
+          f"Errors: {report['errors']} ({100 * report['error_rate']:.2f}%)")
+    print(f"Battles: {report['battles_completed']} ({report['battles_per_s']:.2f}/s)  Outcomes: {report['outcomes']}"
+          "  (all players share the server's one battle)")
+    header = f"{'endpoint':<28}{'count':>7}{'err%':>8}{'mean':>9}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}"
+    print(header)
+    print("-" * len(header))
+    for name, row in report["endpoints"].items():
+        print(f"{name:<28}{row['count']:>7}{100 * row['error_rate']:>7.1f}%"
+              f"{row['mean_ms']:>8.2f}ms{row['p50_ms']:>7.2f}ms{row['p90_ms']:>7.2f}ms"
+              f"{row['p99_ms']:>7.2f}ms{row['max_ms']:>7.2f}ms")
+
+
+# --- Player Simulation ---
+
+class SimulatedPlayer:
+    def __init__(self, player_id: int, client: httpx.AsyncClient, stats: LoadStats,
+                 rng: random.Random, max_turns: int = 20, use_voice: bool = False):
+        self.player_id = player_id
+        self.client = client
+        self.stats = stats
+        self.rng = rng
+        self.max_turns = max_turns
+        self.use_voice = use_voice
+
+    async def call(self, method: str, path: str, **kwargs) -> Optional[Dict[str, Any]]:
+        start = time.perf_counter()
+        ok = False
+        data = None
+        try:
+            response = await self.client.request(method, path, **kwargs)
+            ok = response.status_code < 400
+            if ok and response.headers.get("content-type", "").startswith("application/json"):
+                data = response.json()
+        except Exception as e:
+            print(f"[LoadTest] P{self.player_id} {method} {path} raised {e}")
+        self.stats.record(f"{method} {path}", time.perf_counter() - start, ok)
+        return data
+
+    async def run_battle(self):
+        # Shared with every other simulated player: the server has one battle (see module docstring)
+        await self.call("POST", "/battle/start")
+        await self.call("GET", "/entities")
+
+        # Close the gap to the enemy and open combat with an ambush
+        await self.call("POST", "/battle/action/move", json={"actor_id": "P1", "target_pos": [4, 5]})
+        state = "Ongoing"
+        res = await self.call("POST", "/battle/action/attack", json={"actor_id": "P1", "target_id": "E1"})
+        if res:
+            state = res.get("battle_state", state)
+
+        for _ in range(self.max_turns):
+            if state != "Ongoing":
+                break
+
+            roll = self.rng.random()
+            if roll < 0.4:
+                res = await self.call("POST", "/battle/action/attack", json={"actor_id": "P1", "target_id": "E1"})
+            elif roll < 0.7:
+                ability = self.rng.choice(["concussive__strike", "focused__blast", "minor__shove"])
+                res = await self.call("POST", "/battle/action/ability",
+                                      json={"actor_id": "P1", "target_id": "E1", "ability_id": ability})
+            else:
+                res = await self.call("POST", "/brain/command", json={"text": "attack the bear", "actor_id": "P1"})
+            if res and "battle_state" in res:
+                state = res["battle_state"]
+                if state != "Ongoing":
+                    break
+
+            if self.use_voice:
+                await self.call("POST", "/interface/tts", json={"text": "The bear roars."})
+
+            await self.call("POST", "/battle/turn/end")
+            await self.call("GET", "/battle/state")
+
+        self.stats.battles_completed += 1
+        self.stats.battle_outcomes[state] += 1
+
+    async def run(self, battles: int):
+        for _ in range(battles):
+            await self.run_battle()
+
+
+async def run_load_test(players: int = 4, battles: int = 3, url: Optional[str] = None,
+                        offline: bool = False, seed: Optional[int] = None, max_turns: int = 20,
+                        llm_latency_ms: float = 0.0, use_voice: bool = False) -> Dict[str, Any]:
+    stats = LoadStats()
+    master = random.Random(seed)
+
+    if url:
+        transport = None
+        base_url = url
+    else:
+        if seed is not None:
+            # Pins the server's engine streams; must be set before the module is imported
+            os.environ.setdefault("SHATTERED_SEED", str(seed))
+        from backend import server
+        if offline:
+            install_offline_services(server, llm_latency_ms)
+        transport = httpx.ASGITransport(app=server.app)
+        base_url = "http://loadtest"
+
+    limits = httpx.Limits(max_connections=players, max_keepalive_connections=players)
+    async with httpx.AsyncClient(transport=transport, base_url=base_url, limits=limits, timeout=30.0) as client:
+        sims = [
+            SimulatedPlayer(i, client, stats, random.Random(master.random()), max_turns, use_voice)
+            for i in range(players)
+        ]
+        start = time.perf_counter()
+        await asyncio.gather(*(sim.run(battles) for sim in sims))
+        wall_time = time.perf_counter() - start
+
+    return stats.report(wall_time)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the battle API with concurrent simulated players.")
+    parser.add_argument("--players", type=int, default=4, help="Concurrent simulated players")
+    parser.add_argument("--battles", type=int, default=3, help="Battles per player")
+    parser.add_argument("--max-turns", type=int, default=20, help="Turn cap per battle")
+    parser.add_argument("--url", default=None, help="Target a running server instead of the in-process app")
+    parser.add_argument("--offline", action="store_true", help="Use local LLM/voice stand-ins (in-process only)")
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="Simulated stand-in LLM latency")
+    parser.add_argument("--voice", action="store_true", help="Also exercise the TTS endpoint each turn")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for reproducible player behaviour")
+    parser.add_argument("--json", dest="json_path", default=None, help="Write the report to this JSON file")
+    args = parser.parse_args()
+
+    if args.url and args.offline:
+        print("[LoadTest] --offline only applies to the in-process app; ignoring it for --url.")
+
+    report = asyncio.run(run_load_test(
+        players=args.players, battles=args.battles, url=args.url,
+        offline=args.offline and not args.url, seed=args.seed, max_turns=args.max_turns,
+        llm_latency_ms=args.llm_latency_ms, use_voice=args.voice,
+    ))
+    print_report(report)
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Headless balance runs: pits two rosters against each other for thousands of AI-vs-AI battles.
+
+Rosters are JSON files holding a list of EntityState definitions (team is assigned by side).
+Without rosters the /battle/start matchup is used.
+
+Usage (from repo root):
+    python backend/scripts/simulate.py --battles 5000 --workers 4 --seed 1
+    python backend/scripts/simulate.py --team-a heroes.json --team-b swarm.json --biome Standard --json report.json
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.engine.planner import DIFFICULTY_BUDGETS
+from backend.engine.simulator import run_simulation
+
+def load_roster(path: str):
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    # Accept either a bare list or the /entities payload shape
+    if isinstance(data, dict):
+        data = data.get("entities", [])
+    return data
+
+def print_report(report: dict):
+    print(f"\n=== Simulation: {report['battles']} battles on {report['workers']} worker(s) in {report['wall_time_s']:.2f}s ===")
+    print("Win rates: " + ", ".join(f"{k} {100 * v:.1f}%" for k, v in report["win_rates"].items()))
+    print(f"Avg rounds: {report['avg_rounds']:.2f}  Avg time/battle: {report['avg_time_per_battle_ms']:.3f} ms")
+    print(f"Throughput: {report['battles_per_second']:.0f} battles/s ({report['battles_per_second_per_core']:.0f}/s per core)")
+    print(f"{'ability':<28}{'uses':>10}{'total dmg':>12}{'avg dmg':>10}")
+    for name, row in report["damage_per_ability"].items():
+        print(f"{name:<28}{row['uses']:>10}{row['total']:>12}{row['avg']:>10.2f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Run headless AI-vs-AI battles for balance tuning.")
+    parser.add_argument("--team-a", default=None, help="JSON roster for the Player side")
+    parser.add_argument("--team-b", default=None, help="JSON roster for the Enemy side")
+    parser.add_argument("--battles", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=None, help="Process pool size (default: CPU count)")
+    parser.add_argument("--seed", type=int, default=None, help="Root seed; battle i uses substream i")
+    parser.add_argument("--radius", type=int, default=10, help="Map radius")
+    parser.add_argument("--biome", default=None, help="Generate ProcGen terrain with this biome")
+    parser.add_argument("--map-seed", type=int, default=None)
+    parser.add_argument("--max-rounds", type=int, default=50)
+    parser.add_argument("--store", action="store_true", help="Use the array-backed EntityStore (large rosters)")
+    parser.add_argument("--difficulty", default=None, choices=sorted(DIFFICULTY_BUDGETS),
+                        help="Use the lookahead planner with this time budget (default: heuristic AI)")
+    parser.add_argument("--json", dest="json_path", default=None, help="Write the report to this JSON file")
+    args = parser.parse_args()
+
+    report = run_simulation(
+        team_a=load_roster(args.team_a) if args.team_a else None,
+        team_b=load_roster(args.team_b) if args.team_b else None,
+        battles=args.battles,
+        workers=args.workers,
+        seed=args.seed,
+        map_radius=args.radius,
+        biome=args.biome,
+        map_seed=args.map_seed,
+        max_rounds=args.max_rounds,
+        use_store=args.store,
+        difficulty=args.difficulty,
+    ).to_dict()
+    print_report(report)
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.json_path}")
+
+if __name__ == "__main__":
+    main()
@@ -2,15 +2,23 @@ from fastapi import FastAPI, HTTPException
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import HTMLResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from typing import Optional, Dict
+import asyncio
+import bisect
+import functools
 import os
 import sys
 
 # Add the parent directory to sys.path to import engine modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from backend.engine.mechanics import MechanicsEngine
+from backend.engine.mechanics import MechanicsEngine, RULE_FILES
+from backend.engine.data_watcher import DataWatcher
+from backend.engine.abilities import Ability, DB
+from backend.engine.targeting import ability_area
+from backend.engine.rng import RNGProvider
 
 app = FastAPI(title="The Shattered World Backend")
 
@@ -22,7 +30,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-engine = MechanicsEngine()
+# Per-session random streams. Set SHATTERED_SEED to pin them (tests, load runs).
+rng_provider = RNGProvider(seed=int(os.environ["SHATTERED_SEED"]) if os.environ.get("SHATTERED_SEED") else None)
+session_rng = rng_provider.stream("default")
+
+engine = MechanicsEngine(rng=session_rng)
 from backend.engine.grid import GridManager
 from backend.engine.procgen import ProcGen
 
@@ -32,23 +44,59 @@ from backend.engine.actions import ActionResolver
 from backend.engine.session import SessionManager
 from backend.interface.voice import VoiceInterface
 from backend.brain.llm_client import LLMClient
+from backend.brain.llm_cache import LLMCache
+from backend.brain.async_llm_client import AsyncLLMClient
 from backend.brain.parser_agent import ParserAgent
 from backend.brain.narrator_agent import NarratorAgent
 
 grid_manager = GridManager(radius=5)
 grid_manager.generate_empty_map() # Initialize default map
-proc_gen = ProcGen()
-turn_manager = TurnManager()
+proc_gen = ProcGen(rng=session_rng)
+turn_manager = TurnManager(rng=session_rng)
+# One writer at a time: /battle/turn/end plays AI turns on a worker thread against
+# this same turn_manager / grid_manager, so every handler that changes them holds the lock
+battle_lock = asyncio.Lock()
+
+def holds_battle_lock(handler):
+    @functools.wraps(handler) # Keeps the signature FastAPI reads parameters from
+    async def locked(*args, **kwargs):
+        async with battle_lock:
+            return await handler(*args, **kwargs)
+    return locked
+
 action_resolver = ActionResolver(grid_manager)
 session_manager = SessionManager()
 voice_interface = VoiceInterface()
 
 # Initialize Brain
-llm_client = LLMClient() 
+# Responses are cached in memory + SQLite (SHATTERED_LLM_CACHE=0 disables, SHATTERED_LLM_CACHE_TTL in seconds)
+llm_client = LLMClient(cache=LLMCache.from_env())
+# Request-path client: pooled, time-limited, concurrency-capped, coalesces identical prompts
+async_llm_client = AsyncLLMClient(
+    model=llm_client.model, host=llm_client.host, cache=llm_client.cache,
+    timeout=float(os.environ.get("SHATTERED_LLM_TIMEOUT", "60")),
+    max_concurrency=int(os.environ.get("SHATTERED_LLM_CONCURRENCY", "4")),
+)
 # llm_client.check_connection() # Optional: check on startup
-parser_agent = ParserAgent(llm_client)
+parser_agent = ParserAgent(llm_client, async_llm=async_llm_client)
 narrator_agent = NarratorAgent(llm_client)
 
+# Hot reload of rules/skills data without dropping in-memory battles. SHATTERED_HOT_RELOAD=0 disables it.
+data_watcher = DataWatcher(interval=float(os.environ.get("SHATTERED_RELOAD_INTERVAL", "1.0")))
+for _path in RULE_FILES.values():
+    data_watcher.watch(_path, engine.reload)
+if DB.skills_dir:
+    data_watcher.watch(DB.skills_dir, DB.reload_files)
+
+@app.on_event("startup")
+async def start_data_watcher():
+    if os.environ.get("SHATTERED_HOT_RELOAD", "1") != "0":
+        data_watcher.start()
+
+@app.on_event("shutdown")
+async def stop_data_watcher():
+    data_watcher.stop()
+
 # --- Models ---
 class MapRequest(BaseModel):
     radius: int = 5
@@ -91,6 +139,60 @@ async def get_abilities_list():
     # Return as { "skills": [ ... ] } for Unity
     return {"skills": list(DB.skills.values())}
 
+ABILITY_QUERY_MAX_LIMIT = 200
+
+@app.get("/data/abilities/query")
+async def query_abilities(ids: Optional[str] = None, school: Optional[str] = None, tier: Optional[int] = None,
+                          cost_type: Optional[str] = None, actor_id: Optional[str] = None, known: bool = False,
+                          max_range: Optional[int] = None, fields: Optional[str] = None,
+                          cursor: Optional[str] = None, limit: int = 50):
+    """
+    Filtered, paginated ability lookup for the skill menus.
+    ids / fields are comma separated. actor_id keeps only what that actor can afford right now
+    (known=true also restricts to its known skills). Pass next_cursor back as cursor for the next page.
+    """
+    actor = None
+    id_filter = set(ids.split(",")) if ids else None
+    if known and not actor_id:
+        raise HTTPException(status_code=422, detail="known=true needs an actor_id")
+    if actor_id:
+        actor = turn_manager.entities.get(actor_id)
+        if not actor:
+            raise HTTPException(status_code=404, detail="Actor not found")
+        if known:
+            id_filter = set(actor.known_skills) if id_filter is None else id_filter & set(actor.known_skills)
+
+    projection = None
+    if fields:
+        projection = ["id"] + [f for f in fields.split(",") if f and f != "id"]
+        unknown = [f for f in projection if f not in Ability.model_fields]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown ability fields: {unknown}")
+
+    matches = DB.query(school=school, tier=tier, cost_type=cost_type, max_range=max_range,
+                       affordable_by=actor, ids=id_filter)
+
+    # Results are sorted by id, so the cursor is simply the last id already sent
+    start = 0
+    if cursor:
+        start = bisect.bisect_right(matches, cursor, key=lambda a: a.id)
+    limit = max(1, min(limit, ABILITY_QUERY_MAX_LIMIT))
+    page = matches[start:start + limit]
+
+    skills = []
+    for ability in page:
+        data = DB.serialized(ability)
+        skills.append({f: data[f] for f in projection} if projection else data)
+
+    more = start + limit < len(matches)
+    return {"skills": skills, "total": len(matches), "next_cursor": page[-1].id if more else None,
+            "version": DB.version}
+
+@app.get("/data/version")
+async def get_data_version():
+    # Clients can poll this and refetch cached data after a hot reload
+    return {"rules": engine.rules.version, "abilities": DB.version, "reloads": data_watcher.reloads}
+
 @app.get("/data/all")
 async def get_all_data():
     return engine.data
@@ -108,6 +210,14 @@ async def resolve_attack(req: AttackRequest):
     )
     return result
 
+@app.post("/mechanics/odds")
+async def attack_odds(req: AttackRequest):
+    # Same inputs as /mechanics/attack, but returns exact probabilities instead of rolling
+    return engine.attack_odds(
+        req.attack_stat, req.skill_bonus,
+        req.defense_stat, req.armor_bonus, req.defense_skill_bonus
+    )
+
 
 # --- Character Validation Models ---
 class Attributes(BaseModel):
@@ -149,13 +259,14 @@ async def validate_character(sheet: CharacterSheet):
     return {"valid": True, "message": "Character Sheet is valid."}
 
 @app.post("/map/generate")
+@holds_battle_lock
 async def generate_map(request: MapRequest):
     # Use Global GridManager
     global grid_manager 
     grid_manager.radius = request.radius
     grid_manager.generate_empty_map()
     
-    proc_gen = ProcGen()
+    proc_gen = ProcGen(rng=session_rng)
     map_data = proc_gen.generate_terrain(grid_manager, biome_type=request.biome)
     
     # Serialize for Frontend
@@ -177,6 +288,7 @@ async def generate_map(request: MapRequest):
     }
 
 @app.post("/battle/start")
+@holds_battle_lock
 async def start_battle():
     # Setup dummy entities for testing
     
@@ -243,6 +355,7 @@ class MoveRequest(BaseModel):
     target_pos: list  # [q, r]
     
 @app.post("/battle/action/move")
+@holds_battle_lock
 async def execute_move(req: MoveRequest):
     actor = turn_manager.entities.get(req.actor_id)
     if not actor:
@@ -285,6 +398,7 @@ class BattleAttackRequest(BaseModel):
     target_id: str
 
 @app.post("/battle/action/attack")
+@holds_battle_lock
 async def execute_attack(req: BattleAttackRequest):
     attacker = turn_manager.entities.get(req.actor_id)
     target = turn_manager.entities.get(req.target_id)
@@ -339,56 +453,73 @@ async def execute_attack(req: BattleAttackRequest):
 
 from backend.engine.abilities import AbilityResolver, DB
 from backend.engine.ai_engine import AIEngine
+from backend.engine.round_planner import RoundPlanner
 
 # ... inside startup or global ...
 # ... inside startup or global ...
 ability_resolver = AbilityResolver(engine)
-ai_engine = AIEngine(action_resolver, ability_resolver, engine)
+# Unset keeps the one-ply heuristic AI; easy/normal/hard/nightmare enable the lookahead planner.
+# SHATTERED_AI_DEBUG=1 attaches a decision trace to every AI action (also per call: /battle/turn/end?debug=true)
+ai_engine = AIEngine(action_resolver, ability_resolver, engine, difficulty=os.environ.get("SHATTERED_AI_DIFFICULTY") or None,
+                     trace=os.environ.get("SHATTERED_AI_DEBUG", "0") == "1")
+round_planner = RoundPlanner(ai_engine, budget=float(os.environ.get("SHATTERED_AI_ROUND_BUDGET", "2.0")))
+
+@app.on_event("shutdown")
+async def stop_round_planner():
+    round_planner.shutdown()
+
+@app.on_event("shutdown")
+async def close_llm_client():
+    await async_llm_client.aclose()
 
 class BattleAbilityRequest(BaseModel):
     actor_id: str
-    target_id: str
     ability_id: str
+    target_id: Optional[str] = None
+    # Aimed cell for area abilities (defaults to the target's position)
+    target_x: Optional[int] = None
+    target_y: Optional[int] = None
+
+def _is_free_cell(x: int, y: int) -> bool:
+    # Forced movement stops at the map edge and at living units (spatial index lookup)
+    if grid_manager.cells and (x, y) not in grid_manager.cells:
+        return False
+    return not turn_manager.entities_at([(x, y)])
 
 @app.post("/battle/action/ability")
+@holds_battle_lock
 async def execute_ability(req: BattleAbilityRequest):
     attacker = turn_manager.entities.get(req.actor_id)
-    target = turn_manager.entities.get(req.target_id)
+    target = turn_manager.entities.get(req.target_id) if req.target_id else None
+    aimed = req.target_x is not None and req.target_y is not None
     
-    if not attacker or not target:
+    if not attacker or not (target or aimed):
         raise HTTPException(status_code=404, detail="Entity not found")
+
+    ability = DB.get(req.ability_id)
+    if aimed or (ability and ability_area(ability)[0] != "single"):
+        aim = (req.target_x, req.target_y) if aimed else (target.x, target.y)
+        print(f"[Ability] {req.ability_id}: {attacker.id} -> {aim}")
+        result = ability_resolver.resolve_area(req.ability_id, attacker, aim, turn_manager)
+        if result["success"]:
+            ability_resolver.apply_area_result(result, attacker, turn_manager.entities, _is_free_cell,
+                                               turn_manager.statuses)
+            print(f"[Ability] Success. {len(result['targets'])} caught, total dmg {result['total_damage']}")
+    else:
+        print(f"[Ability] {req.ability_id}: {attacker.id} -> {target.id}")
         
-    print(f"[Ability] {req.ability_id}: {attacker.id} -> {target.id}")
-    
-    # Resolve
-    result = ability_resolver.resolve_ability(req.ability_id, attacker, target)
-    
-    if result["success"]:
-        # Deduct Costs
-        attacker.ap -= result["cost"]
-        r_cost = result.get("resource_cost", 0)
-        r_type = result.get("resource_type", "")
-        
-        if r_type == "stamina": attacker.stamina = max(0, attacker.stamina - r_cost)
-        elif r_type == "focus": attacker.focus = max(0, attacker.focus - r_cost)
-        
-        # Apply Damage
-        mech = result["mechanics"]
-        dmg = mech.get("damage_amount", 0)
-        dtype = mech.get("damage_type", "Meat")
+        # Resolve
+        result = ability_resolver.resolve_ability(req.ability_id, attacker, target)
         
-        if dmg > 0:
-            if dtype == "Meat": target.hp = max(0, target.hp - dmg)
-            else: target.composure = max(0, target.composure - dmg) # Shock/Burn?
-            
-        # Apply Statuses
-        statuses = result.get("applied_statuses", [])
-        for s in statuses:
-            if s not in target.status_effects:
-                target.status_effects.append(s)
-                print(f"[Effect] Applied {s} to {target.name}")
-            
-        print(f"[Ability] Success. Dmg: {dmg} ({dtype}). Statuses: {statuses}")
+        if result["success"]:
+            # Costs, damage, healing, statuses and forced movement (stops at walls / other units)
+            ability_resolver.apply_result(result, attacker, target, turn_manager.entities, _is_free_cell,
+                                          turn_manager.statuses)
+
+            mech = result["mechanics"]
+            dmg = mech.get("damage_amount", 0)
+            dtype = mech.get("damage_type", "Meat")
+            print(f"[Ability] Success. Dmg: {dmg} ({dtype}). Statuses: {result['applied_statuses']}")
         
     return {
         "result": result,
@@ -396,62 +527,98 @@ async def execute_ability(req: BattleAbilityRequest):
         "battle_state": turn_manager.check_victory_condition()
     }
 
+class BattleOddsRequest(BaseModel):
+    actor_id: str
+    target_id: str
+    ability_id: Optional[str] = None
+
+@app.post("/battle/odds")
+async def battle_odds(req: BattleOddsRequest):
+    # Hit chances for the client's targeting UI, using the same stats the resolvers roll with
+    attacker = turn_manager.entities.get(req.actor_id)
+    target = turn_manager.entities.get(req.target_id)
+
+    if not attacker or not target:
+        raise HTTPException(status_code=404, detail="Entity not found")
+
+    if req.ability_id:
+        ability = DB.get(req.ability_id)
+        if not ability:
+            raise HTTPException(status_code=404, detail=f"Unknown Ability: {req.ability_id}")
+        atk_stat, def_stat = ability_resolver.attack_stats(ability, attacker, target)
+        return engine.attack_odds(atk_stat, 0, def_stat, 0)
+
+    atk_stat = attacker.stats.get('Might', 12)
+    def_stat = target.stats.get('Reflexes', 10)
+    # The basic attack always deals at least 1 Meat damage (ActionResolver.resolve_attack)
+    return engine.attack_odds(atk_stat, 0, def_stat, 0, min_damage=1)
+
+def _play_ai_block(current, debug: bool):
+    # Runs on a worker thread (CPU-bound planning / AI turns) while end_turn holds battle_lock,
+    # so nothing else touches the battle or the tracer flag until it returns
+    tracing = ai_engine.tracer.enabled
+    ai_engine.tracer.enabled = tracing or debug
+    try:
+        return round_planner.run(current, turn_manager, grid_manager)
+    finally:
+        ai_engine.tracer.enabled = tracing
+
 @app.post("/battle/turn/end")
-async def end_turn():
+@holds_battle_lock
+async def end_turn(debug: bool = False):
     # 1. Advance to next actor initially
     current = turn_manager.next_turn()
-    log_events = []
-    ai_actions = [] 
-    
-    # 2. Loop while it is an Enemy's turn
-    # Safety break: max 10 steps to prevent infinite loops if everyone is AI
-    steps = 0
-    while current.team == "Enemy" and steps < 10:
-        steps += 1
-        
-        try:
-            # Calculate Action
-            print(f"[Loop] Processing AI Turn for {current.id} ({current.name})")
-            action_log = ai_engine.process_turn(current, turn_manager)
-            
-            # Enrich with actor_id for frontend animation
-            action_log["actor_id"] = current.id
-            ai_actions.append(action_log)
-            
-            log_events.append(f"{current.name}: {action_log}")
-            
-            # IMPORTANT: ai_engine.process_turn MUST update backend state (AP, Position, HP)
-            # We assume it does.
-            
-        except Exception as e:
-            print(f"[Loop] CRITICAL AI ERROR: {e}")
-            log_events.append(f"{current.name}: ERROR {e}")
-
-        # Advance Turn
-        current = turn_manager.next_turn()
-        print(f"[Loop] Advanced to {current.id}. Team: {current.team}")
-        
-    # AI Hook: If next actor is Enemy/AI, we should trigger AI logic here or return a flag
-    # For now, just return the state
+    status_events = list(turn_manager.turn_events) # Ticks / expiries at each turn start
+
+    # 2. Play every AI turn up to the next player, off the event loop so other requests keep being served.
+    # With SHATTERED_AI_DIFFICULTY set the turns are planned concurrently and applied in initiative order;
+    # unset, each actor plays its heuristic take_turn in sequence.
+    # Bounded by a time budget; if it runs out, `pending_ai` tells the client to end the turn again.
+    # In debug mode every AI action carries a `trace` of how it was chosen.
+    block = await run_in_threadpool(_play_ai_block, current, debug)
+    current = block.current
+    status_events.extend(block.status_events)
+    log_events = block.log_events
     
     # Narrator needs to speak these events?
     narrative = ""
     if log_events:
-        narrative = narrator_agent.narrate_event(log_events) # Just feed raw logs for now
+        # Sync NarratorAgent (may call the LLM): on a worker thread, not the event loop
+        narrative = await run_in_threadpool(narrator_agent.narrate_event, log_events) # Just feed raw logs for now
 
     return {
         "message": "Turn Ended",
-        "current_turn": current.id,
+        "current_turn": current.id if current else "None",
         "round": turn_manager.round,
         "narrative": narrative,
-        "ai_actions": ai_actions
+        "ai_actions": block.ai_actions,
+        "status_events": status_events,
+        "pending_ai": block.pending,
+        "ai_stats": block.stats()
     }
 
+@app.get("/battle/ai/metrics")
+async def get_ai_metrics():
+    """Per-stage AI timing histograms plus the decision cache and group assignment counters."""
+    return {
+        "stages": ai_engine.tracer.metrics(),
+        "decision_cache": ai_engine.decisions.metrics(),
+        "group_solves": ai_engine.groups.solves,
+        "tracing": ai_engine.tracer.enabled,
+    }
+
+@app.get("/battle/statuses/{entity_id}")
+async def get_statuses(entity_id: str):
+    if entity_id not in turn_manager.entities:
+        raise HTTPException(status_code=404, detail="Entity not found")
+    return {"statuses": [s.to_dict(turn_manager.round) for s in turn_manager.statuses.statuses(entity_id)]}
+
 # --- Session Models ---
 class SessionRequest(BaseModel):
     session_id: str
 
 @app.post("/session/save")
+@holds_battle_lock
 async def save_session(req: SessionRequest):
     # Placeholder history
     history = ["Battle started", "P1 moved", "P1 attacked E1"] 
@@ -459,6 +626,7 @@ async def save_session(req: SessionRequest):
     return {"message": "Game Saved", "path": path}
 
 @app.post("/session/load")
+@holds_battle_lock
 async def load_session(req: SessionRequest):
     success = session_manager.load_game(req.session_id, turn_manager, grid_manager)
     if not success:
@@ -525,33 +693,36 @@ async def process_command(req: CommandRequest):
     visible = list(turn_manager.entities.values())
     
     # Parse
-    intent = parser_agent.parse_command(req.text, actor, visible)
+    intent = await parser_agent.aparse_command(req.text, actor, visible)
     
-    # Execute if valid (Simplified)
+    # Execute if valid (Simplified). Parsing above may wait on the LLM, so the lock is only taken here
     execution_result = {}
-    if intent.get("action") == "Move":
-        params = intent.get("params", {})
-        target = params.get("target_pos")
-        if target:
-            # We assume LLM returns correct coords, or we validate
-            current_pos = (0, 0)
-            execution_result = action_resolver.resolve_move(actor.id, current_pos, tuple(target), actor.ap)
-            if execution_result["success"]:
-                actor.ap -= execution_result["cost"]
-                
-    elif intent.get("action") == "Attack":
-        params = intent.get("params", {})
-        target_id = params.get("target_id")
-        target_entity = turn_manager.entities.get(target_id)
-        if target_entity:
-            execution_result = action_resolver.resolve_attack(actor, target_entity, engine)
-            if execution_result["success"]:
-                actor.ap -= execution_result["cost"]
+    async with battle_lock:
+        actor = turn_manager.entities.get(req.actor_id, actor) # A restart while parsing replaces the roster
+        if intent.get("action") == "Move":
+            params = intent.get("params", {})
+            target = params.get("target_pos")
+            if target:
+                # We assume LLM returns correct coords, or we validate
+                current_pos = (0, 0)
+                execution_result = action_resolver.resolve_move(actor.id, current_pos, tuple(target), actor.ap)
+                if execution_result["success"]:
+                    actor.ap -= execution_result["cost"]
+
+        elif intent.get("action") == "Attack":
+            params = intent.get("params", {})
+            target_id = params.get("target_id")
+            target_entity = turn_manager.entities.get(target_id)
+            if target_entity:
+                execution_result = action_resolver.resolve_attack(actor, target_entity, engine)
+                if execution_result["success"]:
+                    actor.ap -= execution_result["cost"]
 
     # Narrate
     narrative = ""
     if execution_result.get("success"):
-        narrative = narrator_agent.narrate_event([f"{actor.name} performed {intent.get('action')}", str(execution_result)])
+        narrative = await run_in_threadpool(narrator_agent.narrate_event,
+                                            [f"{actor.name} performed {intent.get('action')}", str(execution_result)])
 
     return {
         "intent": intent,
@@ -559,6 +730,14 @@ async def process_command(req: CommandRequest):
         "narrative": narrative
     }
 
+@app.get("/brain/metrics")
+async def brain_metrics():
+    return {
+        "parser": parser_agent.metrics(),
+        "llm_cache": llm_client.cache.metrics() if llm_client.cache else None,
+        "llm_client": async_llm_client.metrics(),
+    }
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
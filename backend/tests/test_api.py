@@ -54,3 +54,52 @@ def test_engine_pools():
     # Stamina = (12+10)//2 = 11
     pools = engine.calculate_pools(stats)
     assert pools["Stamina"] == 11
+
+def test_attack_odds():
+    payload = {
+        "attack_stat": 12,
+        "skill_bonus": 0,
+        "defense_stat": 12,
+        "armor_bonus": 0
+    }
+    response = client.post("/mechanics/odds", json=payload)
+    assert response.status_code == 200
+    data = response.json()
+    assert abs(sum(data["probabilities"].values()) - 1.0) < 1e-9
+    assert abs(data["probabilities"]["CLASH"] - 0.05) < 1e-9
+
+def test_ability_query_pages():
+    response = client.get("/data/abilities/query", params={"school": "Evocation", "fields": "name,costs", "limit": 10})
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data["skills"]) <= 10
+    seen = [s["id"] for s in data["skills"]]
+    while data["next_cursor"]:
+        data = client.get("/data/abilities/query", params={"school": "Evocation", "cursor": data["next_cursor"]}).json()
+        seen += [s["id"] for s in data["skills"]]
+    assert len(seen) == len(set(seen)) == data["total"]
+
+    assert client.get("/data/abilities/query", params={"fields": "nope"}).status_code == 400
+    assert client.get("/data/abilities/query", params={"known": "true"}).status_code == 422
+
+def test_ai_metrics():
+    response = client.get("/battle/ai/metrics")
+    assert response.status_code == 200
+    data = response.json()
+    assert {"stages", "decision_cache", "group_solves"} <= set(data)
+
+def test_battle_actions_wait_for_the_ai_block():
+    import asyncio
+    import httpx
+    from backend.server import battle_lock
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as ac:
+            await ac.post("/battle/start")
+            async with battle_lock: # Held by /battle/turn/end while the AI plays on a worker thread
+                move = asyncio.create_task(ac.post("/battle/action/move", json={"actor_id": "P1", "target_pos": [2, 3]}))
+                await asyncio.sleep(0.05)
+                assert not move.done()
+            assert (await move).status_code == 200
+
+    asyncio.run(run())
@@ -0,0 +1,72 @@
+import sys
+import os
+import json
+import tempfile
+import unittest
+
+# Add parent dir to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.engine.abilities import AbilityDatabase
+from backend.engine.turn_manager import EntityState
+
+def _skill(sid, school, cost_type="stamina", resource=1, ap=1, rng=1, effect="direct_damage"):
+    return {"id": sid, "name": sid, "school": school, "tier": 1,
+            "costs": {"ap": ap, "resource": resource, "type": cost_type},
+            "targeting": {"range": rng}, "effects": [{"type": effect, "amount": "1d6"}],
+            "narrative": sid}
+
+class TestAbilityIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.skills_dir = os.path.join(self.tmp.name, "skills")
+        os.makedirs(self.skills_dir)
+        self.cache = os.path.join(self.tmp.name, "cache", "index.pkl")
+        self._write("evocation.json", [
+            _skill("bolt", "Evocation", "focus", resource=3, rng=5),
+            _skill("spark", "Evocation", "focus", resource=8, rng=3),
+            _skill("zap", "Evocation", "focus", resource=1, rng=1, effect="heal"),
+        ])
+        self._write("force.json", [_skill("shove", "Force", rng=1, ap=3)])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, name, data):
+        with open(os.path.join(self.skills_dir, name), "w") as f:
+            json.dump(data, f)
+
+    def _db(self):
+        return AbilityDatabase(skills_dir=self.skills_dir, cache_path=self.cache)
+
+    def test_queries(self):
+        db = self._db()
+        ids = lambda abilities: [a.id for a in abilities]
+        self.assertEqual(ids(db.query(school="evocation")), ["bolt", "spark", "zap"])
+        self.assertEqual(ids(db.query(cost_type="focus", min_range=3)), ["bolt", "spark"])
+        self.assertEqual(ids(db.query(effect_type="heal")), ["zap"])
+
+        caster = EntityState(id="c", name="c", hp=10, max_hp=10, composure=10, max_composure=10, focus=5, ap=2)
+        self.assertEqual(ids(db.query(cost_type="focus", min_range=3, affordable_by=caster)), ["bolt"])
+        self.assertEqual(ids(db.query(affordable_by=caster)), ["bolt", "zap"])
+
+    def test_direct_writes_reindex(self):
+        db = self._db()
+        db.skills.pop("bolt")
+        self.assertEqual([a.id for a in db.query(min_range=3)], ["spark"])
+        db.skills["bolt"] = db.skills["spark"].model_copy(update={"id": "bolt"})
+        self.assertEqual(len(db.query(min_range=3)), 2)
+
+    def test_cache_reuse_and_invalidation(self):
+        self._db()
+        self.assertTrue(os.path.exists(self.cache))
+        cached = self._db()
+        self.assertEqual(len(cached.skills), 4)
+
+        self._write("force.json", [_skill("shove", "Force", rng=2), _skill("slam", "Force")])
+        changed = self._db()
+        self.assertEqual(sorted(a.id for a in changed.query(school="Force")), ["shove", "slam"])
+        self.assertEqual(changed.skills["shove"].targeting.range, 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -12,6 +12,7 @@ from backend.engine.grid import GridManager, Point
 from backend.engine.turn_manager import TurnManager, EntityState
 from backend.engine.mechanics import MechanicsEngine
 from backend.engine.abilities import AbilityResolver, DB
+from backend.engine.odds import attack_odds
 
 class TestAILogic(unittest.TestCase):
     def setUp(self):
@@ -117,5 +118,12 @@ class TestAILogic(unittest.TestCase):
         self.assertEqual(res["action"], "UseSkill")
         self.assertEqual(res["skill_id"], "weak_hit")
 
+    def test_basic_attack_estimate_counts_chip_damage(self):
+        # A MISS / CLASH still deals 1 Meat damage, as in /battle/odds and the planner
+        self.e1.known_skills = []
+        estimate = self.ai._expected_damage(self.e1, self.p1)
+        self.assertAlmostEqual(estimate, attack_odds(12, 10, min_damage=1).expected_damage)
+        self.assertGreater(estimate, attack_odds(12, 10).expected_damage)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,58 @@
+import sys
+import os
+import unittest
+
+# Add parent dir to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.engine.ai_engine import AIEngine
+from backend.engine.ai_trace import TimingHistogram
+from backend.engine.actions import ActionResolver
+from backend.engine.grid import GridManager
+from backend.engine.mechanics import MechanicsEngine
+from backend.engine.abilities import AbilityResolver
+from backend.engine.turn_manager import TurnManager, EntityState
+
+def _entity(eid, x, y, team):
+    return EntityState(id=eid, name=eid, hp=20, max_hp=20, composure=10, max_composure=10, x=x, y=y, team=team)
+
+class TestAITrace(unittest.TestCase):
+    def setUp(self):
+        self.grid = GridManager(radius=6)
+        self.grid.generate_empty_map()
+        mechanics = MechanicsEngine()
+        self.ai = AIEngine(ActionResolver(self.grid), AbilityResolver(mechanics), mechanics)
+        self.tm = TurnManager()
+        self.tm.add_entity(_entity("P1", 0, 0, "Player"))
+        self.tm.add_entity(_entity("E1", 4, 0, "Enemy"))
+
+    def test_histogram_quantiles(self):
+        h = TimingHistogram()
+        for ms in [0.2] * 90 + [20.0] * 10:
+            h.observe(ms)
+        data = h.to_dict()
+        self.assertEqual(data["count"], 100)
+        self.assertEqual(data["p50_ms"], 0.25)
+        self.assertEqual(data["p99_ms"], 20.0) # Capped at the largest sample
+        self.assertEqual(data["buckets"], {"<=0.25": 90, "<=25": 10})
+
+    def test_traces_only_in_debug_mode(self):
+        steps = self.ai.take_turn(self.tm.entities["E1"], self.tm)
+        self.assertFalse(any("trace" in s for s in steps))
+        self.assertGreater(self.ai.tracer.metrics()["movement"]["count"], 0)
+
+        self.ai.tracer.enabled = True
+        e1 = self.tm.entities["E1"]
+        e1.x, e1.y, e1.ap = 4, 0, 5
+        steps = self.ai.take_turn(e1, self.tm)
+        advance = steps[0]["trace"]
+        self.assertEqual(advance["kind"], "advance")
+        self.assertEqual(advance["notes"]["target"], "P1")
+        self.assertIn("movement", advance["stages_ms"])
+        self.assertEqual(advance["chosen"]["to"], (1, 0)) # Last tile of the advance
+        attack = steps[3]["trace"]
+        self.assertEqual(attack["chosen"]["action"], "Attack")
+        self.assertIn("target", attack["stages_ms"])
+
+if __name__ == '__main__':
+    unittest.main()
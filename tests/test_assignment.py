@@ -0,0 +1,52 @@
+import sys
+import os
+import itertools
+import random
+import unittest
+
+# Add parent dir to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.engine.assignment import GroupAssigner, hungarian
+from backend.engine.turn_manager import TurnManager, EntityState
+
+def _entity(eid, x, y, team, hp=20):
+    return EntityState(id=eid, name=eid, hp=hp, max_hp=20, composure=10, max_composure=10, x=x, y=y, team=team)
+
+class TestGroupAssignment(unittest.TestCase):
+    def test_hungarian_matches_brute_force(self):
+        rng = random.Random(7)
+        for n, m in ((1, 1), (3, 3), (3, 5), (4, 4)):
+            cost = [[rng.randint(0, 20) for _ in range(m)] for _ in range(n)]
+            cols = hungarian(cost)
+            self.assertEqual(len(set(cols)), n)
+            best = min(sum(cost[i][c] for i, c in enumerate(p)) for p in itertools.permutations(range(m), n))
+            self.assertEqual(sum(cost[i][c] for i, c in enumerate(cols)), best)
+
+    def test_group_spreads_and_caches(self):
+        tm = TurnManager()
+        tm.add_entity(_entity("P1", 0, 0, "Player"))
+        tm.add_entity(_entity("P2", 0, 4, "Player"))
+        tm.add_entity(_entity("E1", 1, 1, "Enemy"))
+        tm.add_entity(_entity("E2", 1, 2, "Enemy")) # Also nearest to P1
+        groups = GroupAssigner(lambda actor, target: 3.0)
+
+        e1, e2 = tm.entities["E1"], tm.entities["E2"]
+        self.assertEqual(groups.target_for(e1, tm).id, "P1")
+        self.assertEqual(groups.target_for(e2, tm).id, "P2")
+        self.assertEqual(groups.solves, 1)
+
+        e2.x = 5 # Own team moving doesn't invalidate
+        tm.entities["P2"].x = 1 # Nor does a small step by a target
+        groups.target_for(e1, tm)
+        self.assertEqual(groups.solves, 1)
+
+        tm.entities["P1"].hp = 4 # HP band changed
+        self.assertEqual(groups.target_for(e1, tm).id, "P1")
+        self.assertEqual(groups.solves, 2)
+        tm.entities["P1"].hp = 0
+        self.assertEqual(groups.target_for(e1, tm).id, "P2")
+        self.assertEqual(groups.solves, 3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import sys
+import os
+import asyncio
+import json
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add parent dir to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.brain.async_llm_client import AsyncLLMClient
+from backend.brain.llm_cache import LLMCache
+
+class FakeOllama(BaseHTTPRequestHandler):
+    """Stand-in for Ollama's /api/chat: echoes the prompt after `delay`; model "slow" never answers in time."""
+    calls = 0
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+    delay = 0.2
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        cls = type(self)
+        with cls.lock:
+            cls.calls += 1
+            cls.active += 1
+            cls.peak = max(cls.peak, cls.active)
+        try:
+            time.sleep(2.0 if body["model"] == "slow" else cls.delay)
+            prompt = body["messages"][-1]["content"]
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.end_headers()
+            if body.get("stream"):
+                for token in prompt.split():
+                    self.wfile.write((json.dumps({"message": {"content": token}, "done": False}) + "\n").encode())
+                    self.wfile.flush()
+                self.wfile.write((json.dumps({"message": {"content": ""}, "done": True}) + "\n").encode())
+            else:
+                self.wfile.write(json.dumps({"message": {"content": f"echo: {prompt}"}, "done": True}).encode())
+        except (BrokenPipeError, ConnectionResetError):
+            pass # Client gave up (timeout test)
+        finally:
+            with cls.lock:
+                cls.active -= 1
+
+    def log_message(self, *args):
+        pass
+
+class TestAsyncLLMClient(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), FakeOllama)
+        cls.server.daemon_threads = True
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.host = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        FakeOllama.calls = FakeOllama.peak = 0
+
+    def run_with(self, client, coro):
+        async def main():
+            try:
+                return await coro
+            finally:
+                await client.aclose()
+        return asyncio.run(main())
+
+    def test_coalesces_identical_prompts_and_caps_concurrency(self):
+        client = AsyncLLMClient(host=self.host, max_concurrency=1)
+        async def burst():
+            return await asyncio.gather(*[client.generate("attack the bear") for _ in range(3)], client.generate("flee"))
+        results = self.run_with(client, burst())
+        self.assertEqual(results, ["echo: attack the bear"] * 3 + ["echo: flee"])
+        self.assertEqual(FakeOllama.calls, 2)
+        self.assertEqual(FakeOllama.peak, 1)
+        self.assertEqual(client.metrics()["coalesced"], 2)
+
+    def test_streaming(self):
+        client = AsyncLLMClient(host=self.host)
+        async def collect():
+            return [token async for token in client.stream("the bear roars")]
+        self.assertEqual(self.run_with(client, collect()), ["the", "bear", "roars"])
+
+    def test_timeout(self):
+        client = AsyncLLMClient(model="slow", host=self.host, timeout=0.2, retries=0)
+        start = time.perf_counter()
+        self.assertEqual(self.run_with(client, client.generate("hello")), "")
+        self.assertLess(time.perf_counter() - start, 1.5)
+        self.assertEqual(client.metrics()["timeouts"], 1)
+
+    def test_unparseable_json_not_cached(self):
+        cache = LLMCache()
+        client = AsyncLLMClient(host=self.host, cache=cache)
+        async def both():
+            return await client.generate_json("attack the bear", {}), await client.generate_json("attack the bear", {})
+        self.assertEqual(self.run_with(client, both()), ({}, {})) # The fake echoes, never JSON
+        self.assertEqual(FakeOllama.calls, 2)
+        self.assertEqual(cache.metrics()["stores"], 0)
+
+if __name__ == '__main__':
+    unittest.main()
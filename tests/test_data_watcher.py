@@ -0,0 +1,83 @@
+import sys
+import os
+import json
+import tempfile
+import unittest
+
+# Add parent dir to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.engine.abilities import AbilityDatabase
+from backend.engine.data_watcher import DataWatcher
+from backend.engine.mechanics import MechanicsEngine, STATS_FILE
+
+def _skill(sid, rng=1):
+    return {"id": sid, "name": sid, "school": "Force", "costs": {"ap": 1}, "targeting": {"range": rng},
+            "effects": [{"type": "direct_damage", "amount": "1d6"}], "narrative": sid}
+
+class TestHotReload(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = self.tmp.name
+        self._write("a.json", [_skill("jab"), _skill("hook")])
+        self._write("b.json", [_skill("kick")])
+        self.db = AbilityDatabase(skills_dir=self.dir, use_cache=False)
+        self.watcher = DataWatcher()
+        self.watcher.watch(self.dir, self.db.reload_files)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, name, data):
+        path = os.path.join(self.dir, name)
+        with open(path, "w") as f:
+            json.dump(data, f)
+        # Make sure the mtime moves even on coarse filesystems
+        st = os.stat(path)
+        os.utime(path, (st.st_atime, st.st_mtime + 5))
+
+    def test_only_changed_file_reloads(self):
+        self.assertEqual(self.watcher.poll(), 0)
+        before = self.db.skills
+        kick = self.db.skills["kick"]
+
+        self._write("a.json", [_skill("jab", rng=4)])
+        self.assertEqual(self.watcher.poll(), 1)
+        self.assertEqual(self.db.version, 1)
+        self.assertNotIn("hook", self.db.skills)
+        self.assertEqual([a.id for a in self.db.query(min_range=3)], ["jab"])
+        self.assertIs(self.db.skills["kick"], kick) # untouched file not re-parsed
+        self.assertIn("hook", before) # readers holding the old index keep a consistent view
+        self.assertEqual(self.db.compiled("jab").ability, self.db.skills["jab"])
+
+    def test_bad_file_keeps_previous(self):
+        with open(os.path.join(self.dir, "b.json"), "w") as f:
+            f.write("[{broken")
+        self.db.reload_files([os.path.join(self.dir, "b.json")])
+        self.assertIn("kick", self.db.skills)
+
+        os.remove(os.path.join(self.dir, "b.json"))
+        self.watcher.poll()
+        self.assertNotIn("kick", self.db.skills)
+
+    def test_fixed_file_clears_its_errors(self):
+        bad = _skill("jab")
+        bad["effects"][0]["amount"] = "2d+"
+        self._write("a.json", [bad])
+        self.db.reload_files([os.path.join(self.dir, "a.json")])
+        self.assertEqual(len(self.db.errors), 1)
+        self._write("a.json", [_skill("jab")])
+        self.db.reload_files([os.path.join(self.dir, "a.json")])
+        self.assertEqual(self.db.errors, [])
+
+    def test_rules_reload_shared_by_forks(self):
+        engine = MechanicsEngine()
+        fork = engine.fork(engine.rng)
+        old = engine.rules
+        self.assertEqual(engine.reload([STATS_FILE]), ["stats"])
+        self.assertIsNot(fork.rules, old)
+        self.assertEqual(fork.rules.version, old.version + 1)
+        self.assertIs(fork.talents, old.talents)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import sys
+import os
+import unittest
+
+# Add parent dir to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.engine.ai_engine import AIEngine
+from backend.engine.actions import ActionResolver
+from backend.engine.grid import GridManager
+from backend.engine.mechanics import MechanicsEngine
+from backend.engine.abilities import AbilityResolver, DB
+from backend.engine.planner import TurnPlanner
+from backend.engine.turn_manager import TurnManager, EntityState
+
+def _entity(eid, x, y, team):
+    return EntityState(id=eid, name=eid, hp=20, max_hp=20, composure=10, max_composure=10, x=x, y=y, team=team)
+
+class TestDecisionCache(unittest.TestCase):
+    def setUp(self):
+        self.grid = GridManager(radius=20) # Neighborhoods clear of the map edge
+        self.grid.generate_empty_map()
+        mechanics = MechanicsEngine()
+        self.ai = AIEngine(ActionResolver(self.grid), AbilityResolver(mechanics), mechanics, difficulty="easy")
+        self.planner = TurnPlanner(self.ai.ability_resolver, budget=1.0, max_depth=5)
+
+    def _battle(self, ox, oy):
+        tm = TurnManager()
+        tm.add_entity(_entity("P1", ox, oy, "Player"))
+        tm.add_entity(_entity("E1", ox + 5, oy, "Enemy"))
+        return tm
+
+    def test_same_situation_elsewhere_replays_translated_plan(self):
+        tm = self._battle(0, 0)
+        first = self.ai.plan_turn(tm.entities["E1"], tm, planner=self.planner)
+        tm = self._battle(-3, 2)
+        again = self.ai.plan_turn(tm.entities["E1"], tm, planner=self.planner)
+        self.assertEqual(self.ai.decisions.metrics()["hits"], 1)
+        self.assertEqual([a.kind for a in again.actions], [a.kind for a in first.actions])
+        self.assertEqual(again.first.to, (1, 2))
+        self.assertEqual(again.actions[-1].target, "P1")
+
+    def test_invalidation(self):
+        tm = self._battle(0, 0)
+        self.ai.plan_turn(tm.entities["E1"], tm, planner=self.planner)
+        DB.version += 1 # Ability data reloaded
+        try:
+            self.ai.plan_turn(tm.entities["E1"], tm, planner=self.planner)
+        finally:
+            DB.version -= 1
+        self.ai.set_difficulty("hard") # AI parameters changed
+        self.assertEqual(self.ai.decisions.metrics()["size"], 0)
+        # Different planner parameters never share entries
+        self.ai.plan_turn(tm.entities["E1"], tm, planner=TurnPlanner(self.ai.ability_resolver, budget=1.0, max_depth=2))
+        self.assertEqual(self.ai.decisions.metrics()["hits"], 0)
+
+    def test_timed_out_plans_not_stored(self):
+        tm = self._battle(0, 0)
+        rushed = TurnPlanner(self.ai.ability_resolver, budget=0.0, max_depth=5)
+        self.assertTrue(self.ai.plan_turn(tm.entities["E1"], tm, planner=rushed).timed_out)
+        self.assertEqual(self.ai.decisions.metrics()["size"], 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import sys
+import os
+import unittest
+
+# Add parent dir to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.engine.dice import DiceEngine
+from backend.engine.mechanics import MechanicsEngine
+from backend.engine.rng import RNGProvider, RNGStream
+from backend.engine.turn_manager import TurnManager, EntityState
+
+class TestDiceEngine(unittest.TestCase):
+    def test_scalar_bounds(self):
+        dice = DiceEngine(seed=1)
+        rolls = [dice.roll(6, 3) for _ in range(2000)]
+        self.assertEqual(min(rolls), 3)
+        self.assertEqual(max(rolls), 18)
+
+    def test_seeded_reproducible(self):
+        a = DiceEngine(seed=7)
+        b = DiceEngine(seed=7)
+        self.assertEqual([a.roll(20) for _ in range(50)], [b.roll(20) for _ in range(50)])
+        self.assertEqual(list(a.roll_batch(8, 2, 100)), list(b.roll_batch(8, 2, 100)))
+
+    def test_batch_totals(self):
+        dice = DiceEngine(seed=3)
+        totals = dice.roll_batch(6, 3, 50_000)
+        self.assertEqual(len(totals), 50_000)
+        self.assertEqual(min(totals), 3)
+        self.assertEqual(max(totals), 18)
+        mean = sum(int(t) for t in totals) / len(totals)
+        self.assertAlmostEqual(mean, 10.5, delta=0.1)
+
+    def test_mechanics_uses_injected_dice(self):
+        a = MechanicsEngine(dice=DiceEngine(seed=11))
+        b = MechanicsEngine(dice=DiceEngine(seed=11))
+        self.assertEqual(a.resolve_attack(12, 0, 10, 0), b.resolve_attack(12, 0, 10, 0))
+
+class TestRNGProvider(unittest.TestCase):
+    def test_session_streams_reproducible(self):
+        a = RNGProvider(seed=99)
+        b = RNGProvider(seed=99)
+        b.stream("other").random() # Order of creation must not matter
+        self.assertEqual([a.stream("s1").randint(1, 100) for _ in range(20)],
+                         [b.stream("s1").randint(1, 100) for _ in range(20)])
+
+    def test_streams_independent(self):
+        provider = RNGProvider(seed=1)
+        s1 = [provider.stream("s1").random() for _ in range(5)]
+        s2 = [provider.stream("s2").random() for _ in range(5)]
+        self.assertNotEqual(s1, s2)
+        w0, w1 = RNGStream(seed=4).spawn(2)
+        self.assertNotEqual(w0.random(), w1.random())
+        self.assertEqual(provider.substream(3).random(), RNGProvider(seed=1).substream(3).random())
+
+    def test_initiative_pinned(self):
+        orders = []
+        for _ in range(2):
+            tm = TurnManager(rng=RNGStream(seed=5))
+            for i in range(6):
+                tm.add_entity(EntityState(id=f"U{i}", name=f"U{i}", hp=10, max_hp=10, composure=5, max_composure=5))
+            tm.roll_initiative()
+            orders.append(list(tm.turn_order))
+        self.assertEqual(orders[0], orders[1])
+
+if __name__ == '__main__':
+    unittest.main()
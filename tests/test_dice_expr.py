@@ -0,0 +1,67 @@
+import sys
+import os
+import pickle
+import unittest
+
+# Add parent dir to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.engine.dice import DiceEngine
+from backend.engine.dice_expr import compile_dice, DiceExpressionError
+from backend.engine.abilities import Ability
+
+class TestDiceExpressions(unittest.TestCase):
+    def setUp(self):
+        self.dice = DiceEngine(seed=2)
+
+    def test_plain_and_modifier(self):
+        expr = compile_dice("2d6+3")
+        rolls = [expr.roll(self.dice) for _ in range(2000)]
+        self.assertEqual(min(rolls), 5)
+        self.assertEqual(max(rolls), 15)
+        self.assertEqual(expr.mean(), 10.0)
+        self.assertEqual(compile_dice(15).roll(self.dice), 15)
+        self.assertEqual(compile_dice("-3").roll(self.dice), -3)
+
+    def test_stat_reference(self):
+        expr = compile_dice("1d8+Might")
+        stats = {"Might": 12}
+        rolls = [expr.roll(self.dice, stats) for _ in range(500)]
+        self.assertEqual(min(rolls), 13)
+        self.assertEqual(max(rolls), 20)
+        self.assertEqual(compile_dice("Knowledge * 3").roll(self.dice, {"Knowledge": 4}), 12)
+
+    def test_keep_highest_lowest(self):
+        self.assertAlmostEqual(compile_dice("2d20kh1").mean(), 13.825)
+        self.assertAlmostEqual(compile_dice("2d20kl1").mean(), 7.175)
+        rolls = [compile_dice("4d6kh3").roll(self.dice) for _ in range(2000)]
+        self.assertEqual(min(rolls), 3)
+        self.assertEqual(max(rolls), 18)
+
+    def test_batch(self):
+        totals = compile_dice("4d6kh3+1").roll_batch(self.dice, 20000)
+        self.assertEqual(len(totals), 20000)
+        self.assertAlmostEqual(sum(int(t) for t in totals) / 20000, compile_dice("4d6kh3+1").mean(), delta=0.1)
+
+    def test_malformed(self):
+        for bad in ["", "2d", "d6+", "1d6 ++ 2", "1d6+Mite", "3d6kh4", "1d6*1d4", "1d6 & 2"]:
+            with self.assertRaises(DiceExpressionError, msg=bad):
+                compile_dice(bad)
+
+    def test_ability_load_reports_errors(self):
+        ability = Ability(
+            id="bad_bolt", name="Bad Bolt", school="Evocation",
+            costs={"ap": 1}, targeting={"range": 3}, narrative="fizzles",
+            effects=[{"type": "direct_damage", "amount": "2d6+3"}, {"type": "direct_damage", "amount": "2dd6"}],
+        )
+        errors = ability.compile()
+        self.assertEqual(len(errors), 1)
+        self.assertIn("bad_bolt", errors[0])
+        self.assertEqual(ability.effects[0].amount_expr.mean(), 10.0)
+
+    def test_pickles(self):
+        expr = pickle.loads(pickle.dumps(compile_dice("1d8+Might")))
+        self.assertEqual(expr.source, "1d8+Might")
+
+if __name__ == '__main__':
+    unittest.main()
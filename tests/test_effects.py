@@ -0,0 +1,78 @@
+import sys
+import os
+import unittest
+
+# Add parent dir to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.engine.dice import DiceEngine
+from backend.engine.mechanics import MechanicsEngine
+from backend.engine.abilities import Ability, AbilityResolver, DB
+from backend.engine.effects import compile_ability
+from backend.engine.turn_manager import EntityState
+
+def _entity(eid, x, **kw):
+    return EntityState(id=eid, name=eid, hp=20, max_hp=30, composure=10, max_composure=10,
+                       stats={"Might": 10, "Willpower": 0}, x=x, y=0, **kw)
+
+class TestEffectPipelines(unittest.TestCase):
+    def setUp(self):
+        self.ability = Ability(
+            id="test_shove", name="Shove", school="Test", costs={"ap": 2, "resource": 3},
+            targeting={"range": 1}, narrative="shoves",
+            effects=[
+                {"type": "heal", "amount": 4},
+                {"type": "move_target_roll", "distance": 3, "save_stat": "Might", "dc": 99},
+                {"type": "apply_status_roll", "status": "Prone", "save_stat": "Willpower", "dc": 99},
+                {"type": "teleport_everyone"},
+            ],
+        )
+        DB.skills[self.ability.id] = self.ability
+        self.resolver = AbilityResolver(MechanicsEngine(dice=DiceEngine(seed=4)))
+
+    def tearDown(self):
+        DB.skills.pop(self.ability.id, None)
+        DB.pipelines.pop(self.ability.id, None)
+
+    def test_compile_reports_unsupported(self):
+        compiled = compile_ability(self.ability)
+        self.assertEqual(len(compiled.steps), 3)
+        self.assertEqual(compiled.unsupported, ("teleport_everyone",))
+
+    def test_resolve_and_apply(self):
+        attacker = _entity("a", 0, known_skills=["test_shove"])
+        target = _entity("b", 1)
+        result = self.resolver.resolve_ability("test_shove", attacker, target)
+        self.assertTrue(result["success"])
+        self.assertEqual(result["healing"], 4)
+        self.assertEqual(result["applied_statuses"], ["Prone"])
+        self.assertEqual(result["displacements"][0]["path"], [(2, 0), (3, 0), (4, 0)])
+
+        # A wall at x=3 stops the shove after one cell
+        self.resolver.apply_result(result, attacker, target, is_free=lambda x, y: x < 3)
+        self.assertEqual((target.x, target.y), (2, 0))
+        self.assertEqual(attacker.ap, 3)
+        self.assertEqual(attacker.stamina, 7)
+        self.assertIn("Prone", target.status_effects)
+
+    def test_self_effects_land_on_caster(self):
+        # Spirit Mend: heals the ally, costs the caster 1d4 Composure
+        healer = _entity("a", 0, known_skills=["spirit__mend"])
+        ally = _entity("b", 1)
+        result = self.resolver.resolve_ability("spirit__mend", healer, ally)
+        self.assertTrue(result["success"])
+        self.assertEqual(result["composure_damage"], 0)
+        self.assertIn(result["self_effects"]["composure_damage"], range(1, 5))
+        self.resolver.apply_result(result, healer, ally)
+        self.assertEqual(healer.composure, 10 - result["self_effects"]["composure_damage"])
+        self.assertEqual(ally.composure, 10)
+        self.assertEqual(ally.hp, 20 + result["healing"])
+
+    def test_replaced_ability_recompiles(self):
+        first = DB.compiled("test_shove")
+        DB.skills["test_shove"] = self.ability.model_copy(update={"effects": []})
+        self.assertIsNot(DB.compiled("test_shove"), first)
+        self.assertEqual(DB.compiled("test_shove").steps, ())
+
+if __name__ == '__main__':
+    unittest.main()
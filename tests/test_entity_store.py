@@ -0,0 +1,51 @@
+import sys
+import os
+import unittest
+
+# Add parent dir to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.engine.entity_store import EntityStore, EntityProxy
+from backend.engine.simulator import run_simulation
+from backend.engine.turn_manager import EntityState, TurnManager
+
+def _entity(eid, x, y, team):
+    return EntityState(id=eid, name=eid, hp=10, max_hp=10, composure=10, max_composure=10,
+                       x=x, y=y, team=team, stats={"Might": 12})
+
+class TestEntityStore(unittest.TestCase):
+    def setUp(self):
+        self.tm = TurnManager(store=EntityStore(capacity=2))
+        self.tm.add_entity(_entity("P", 0, 0, "Player"))
+        for i in range(10):
+            self.tm.add_entity(_entity(f"E{i}", i + 1, 0, "Enemy"))
+
+    def test_proxies_behave_like_entities(self):
+        e = self.tm.entities["E0"]
+        self.assertIsInstance(e, EntityProxy)
+        e.hp -= 4
+        e.status_effects.append("Marked")
+        self.assertEqual(e.hp, 6)
+        self.assertEqual(e.stats["Might"], 12)
+        state = self.tm.entity_states()["E0"]
+        self.assertIsInstance(state, EntityState)
+        self.assertEqual((state.hp, state.status_effects, state.team), (6, ["Marked"], "Enemy"))
+
+    def test_vectorized_queries_track_changes(self):
+        p = self.tm.entities["P"]
+        self.assertEqual([e.id for e in self.tm.hostiles_within(p, 3)], ["E0", "E1", "E2"])
+        self.tm.entities["E0"].hp = 0
+        self.tm.entities["E1"].x = 50
+        self.assertEqual([e.id for e in self.tm.hostiles_within(p, 3)], ["E2"])
+        self.assertEqual(self.tm.nearest_hostile(p).id, "E2")
+        self.assertEqual(self.tm.living_by_team["Enemy"], 9)
+        self.assertEqual([e.id for e in self.tm.entities_at([(50, 0)])], ["E1"])
+
+    def test_simulation_matches_plain_entities(self):
+        plain = run_simulation(battles=5, workers=1, seed=4, max_rounds=20).to_dict()
+        stored = run_simulation(battles=5, workers=1, seed=4, max_rounds=20, use_store=True).to_dict()
+        self.assertEqual(plain["wins"], stored["wins"])
+        self.assertEqual(plain["damage_per_ability"], stored["damage_per_ability"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import sys
+import os
+import unittest
+
+# Add parent dir to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.brain.fast_parser import FastParser
+from backend.brain.parser_agent import ParserAgent
+from backend.engine.turn_manager import EntityState
+
+def _entity(eid, name, team, skills=()):
+    return EntityState(id=eid, name=name, hp=20, max_hp=20, composure=10, max_composure=10, team=team,
+                       known_skills=list(skills))
+
+class TestFastParser(unittest.TestCase):
+    def setUp(self):
+        self.actor = _entity("P1", "Ursine Warrior", "Player", ["concussive__strike", "focused__blast", "quick__leap"])
+        self.bear = _entity("E1", "Gravity Bear", "Enemy")
+        self.visible = [self.actor, self.bear]
+        self.parser = FastParser()
+
+    def parse(self, text):
+        return self.parser.parse(text, self.actor, self.visible)
+
+    def test_common_commands(self):
+        self.assertEqual(self.parse("move to 2, 2")["params"], {"target_pos": [2, 2]})
+        self.assertEqual(self.parse("Go to (3 -1)")["params"], {"target_pos": [3, -1]})
+        self.assertEqual(self.parse("attack E1")["params"], {"target_id": "E1"})
+        self.assertEqual(self.parse("please hit the bear")["params"], {"target_id": "E1"})
+        self.assertEqual(self.parse("attack")["params"], {"target_id": "E1"}) # Only one hostile in sight
+        intent = self.parse("cast focused blast on the bear")
+        self.assertEqual((intent["action"], intent["params"]["ability_id"]), ("UseAbility", "focused__blast"))
+        self.assertEqual(self.parse("concussive strike on bear")["params"]["ability_id"], "concussive__strike")
+        self.assertEqual(self.parse("use quik leap at bear")["params"]["ability_id"], "quick__leap") # Typo
+        self.assertEqual(self.parse("Say Surrender, beast!")["params"], {"text": "Surrender, beast!"})
+
+    def test_low_confidence_goes_to_llm(self):
+        self.assertIsNone(self.parse("I think we should regroup behind the rocks"))
+        self.assertIsNone(self.parse("attack the dragon"))
+        # Negated, several orders, or a command buried in a longer sentence
+        self.assertIsNone(self.parse("don't attack the bear"))
+        self.assertIsNone(self.parse("hit the bear then move to 3, 3"))
+        self.assertIsNone(self.parse("I won't attack the wolf, move to 1,1"))
+        self.assertIsNone(self.parse("attack the bear and use quick leap"))
+        self.assertIsNone(self.parse("should I attack E1?"))
+        self.visible.append(_entity("E2", "Gravity Bear", "Enemy"))
+        self.assertLess(self.parse("attack the bear")["confidence"], 0.75) # Two bears: don't guess
+
+        class LLM:
+            calls = 0
+            def generate_json(self, prompt, schema, system=""):
+                LLM.calls += 1
+                return {"action": "Unknown", "reason": "unclear"}
+        agent = ParserAgent(LLM())
+        self.assertEqual(agent.parse_command("attack E1", self.actor, self.visible)["source"], "fast")
+        self.assertEqual(agent.parse_command("attack the bear", self.actor, self.visible)["source"], "llm")
+        self.assertEqual(LLM.calls, 1)
+        self.assertEqual(agent.metrics()["fallback_rate"], 0.5)
+
+if __name__ == '__main__':
+    unittest.main()
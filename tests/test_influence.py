@@ -0,0 +1,121 @@
+import sys
+import os
+import unittest
+
+# Add parent dir to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.engine.ai_engine import AIEngine
+from backend.engine.actions import ActionResolver
+from backend.engine.grid import GridManager, Point
+from backend.engine.influence import InfluenceMap, distance_field, layout_for, unit_fields
+from backend.engine.mechanics import MechanicsEngine
+from backend.engine.abilities import AbilityResolver
+from backend.engine.turn_manager import TurnManager, EntityState
+
+def _entity(eid, x, y, team, hp=20):
+    return EntityState(id=eid, name=eid, hp=hp, max_hp=20, composure=10, max_composure=10, x=x, y=y, team=team)
+
+class TestInfluenceMap(unittest.TestCase):
+    def setUp(self):
+        self.grid = GridManager(radius=6)
+        self.grid.generate_empty_map()
+        self.tm = TurnManager()
+        self.tm.add_entity(_entity("P1", 0, 0, "Player"))
+        self.tm.add_entity(_entity("P2", 1, 0, "Player"))
+        self.tm.add_entity(_entity("E1", 6, 6, "Enemy"))
+        self.influence = InfluenceMap(self.grid)
+
+    def test_layers(self):
+        self.assertEqual(self.influence.update(self.tm), 3)
+        near, far = self.influence.threat((0, 1), "Enemy"), self.influence.threat((-6, -6), "Enemy")
+        self.assertGreater(near, far)
+        self.assertEqual(far, 0.0)
+        # A unit is not its own support
+        self.assertGreater(self.influence.support((0, 0), "Player"), self.influence.support((0, 0), "Player", exclude="P1"))
+        self.assertEqual(self.influence.reach((0, 3), "Player"), 3)
+
+    def test_incremental_updates(self):
+        self.influence.update(self.tm)
+        self.assertEqual(self.influence.update(self.tm), 0)
+        before = self.influence.threat((0, 1), "Enemy")
+        self.tm.entities["P2"].hp = 5 # Weaker, same place: no new distance field
+        self.assertEqual(self.influence.update(self.tm), 0)
+        self.assertLess(self.influence.threat((0, 1), "Enemy"), before)
+        self.tm.entities["E1"].x = 5
+        self.assertEqual(self.influence.update(self.tm), 1)
+        self.tm.entities["P1"].hp = 0
+        self.influence.update(self.tm)
+        self.assertNotIn("P1", self.influence.units)
+
+    def test_terrain_costs_shape_reach(self):
+        for y in range(-6, 6):
+            self.grid.cells[(3, y)] = "Water" # Wall with a gap at (3, 6)
+        self.grid.cells[(0, 2)] = "Mountain"
+        self.influence.update(self.tm)
+        self.assertEqual(self.influence.reach((0, 2), "Player"), 1 + 3) # ProcGen's Mountain cost
+        # P2 at (1, 0) must go round through the gap at (3, 6): far beyond its threat horizon
+        self.assertEqual(self.influence.reach((4, 0), "Player"), float("inf"))
+        self.assertEqual(self.influence.reach((2, 5), "Player"), 6)
+        self.assertEqual(self.influence.reach((3, 6), "Player"), 1 + 6 + 1) # The gap, at the edge of the horizon
+
+    def test_unit_fields_match_dijkstra_and_are_shared(self):
+        for y in range(-6, 6):
+            self.grid.cells[(3, y)] = "Water"
+        self.grid.cells[(0, 2)] = "Mountain"
+        layout = layout_for(self.grid.cells)
+        cells = [(0, 0), (1, 0), (6, 6), (4, -2)]
+        fields = unit_fields(layout, cells, 8)
+        for cell, field in zip(cells, fields):
+            self.assertEqual(list(field), list(distance_field(layout, [cell], limit=8)))
+        # A second map on the same terrain reuses them rather than searching again
+        self.influence.update(self.tm)
+        other = InfluenceMap(self.grid)
+        other.update(self.tm)
+        self.assertIs(other.layout, self.influence.layout)
+        self.assertIs(other.units["P1"].field, self.influence.units["P1"].field)
+
+    def test_ai_walks_around_water(self):
+        for y in range(-6, 6):
+            self.grid.cells[(3, y)] = "Water"
+        mechanics = MechanicsEngine()
+        ai = AIEngine(ActionResolver(self.grid), AbilityResolver(mechanics), mechanics)
+        e1 = self.tm.entities["E1"]
+        e1.x, e1.y = 5, 0
+        for _ in range(30):
+            e1.ap = 5
+            res = ai.process_turn(e1, self.tm)
+            self.assertNotEqual(self.grid.cells[(e1.x, e1.y)], "Water")
+            if res["action"] != "Move":
+                break
+        self.assertEqual(res["action"], "Attack")
+        self.assertLessEqual(Point(e1.x, e1.y).distance(Point(1, 0)), 1)
+
+    def test_take_turn_spends_ap_on_shared_path(self):
+        mechanics = MechanicsEngine()
+        ai = AIEngine(ActionResolver(self.grid), AbilityResolver(mechanics), mechanics)
+        e1 = self.tm.entities["E1"]
+        e1.x, e1.y = 4, 0
+        self.tm.add_entity(_entity("E2", 1, 4, "Enemy"))
+        self.tm.entities["P1"].hp = 0 # One target left for both
+        self.tm.entities["P2"].hp = self.tm.entities["P2"].max_hp = 500 # Outlives both turns whatever the rolls
+        updates = []
+        ai._influence(self.tm)
+        update = ai.influence.update
+        ai.influence.update = lambda tm: updates.append(tm) or update(tm)
+        steps = ai.take_turn(e1, self.tm)
+        self.assertEqual(len(updates), 1) # Refreshed once for the whole turn
+        # Two tiles to close in, then attacks with the rest of the AP
+        self.assertEqual([s["action"] for s in steps[:2]], ["Move", "Move"])
+        self.assertEqual(steps[0]["from"], (4, 0))
+        self.assertEqual(steps[1]["to"], (2, 0))
+        self.assertEqual(steps[2]["action"], "Attack")
+        self.assertEqual(e1.ap, 0)
+        # E2 heads for the same target cell: the path field is reused
+        built = ai.influence.paths_built
+        steps = ai.take_turn(self.tm.entities["E2"], self.tm)
+        self.assertEqual(steps[-1]["target"], "P2")
+        self.assertEqual(ai.influence.paths_built, built)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import sys
+import os
+import tempfile
+import unittest
+
+# Add parent dir to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.brain.llm_cache import LLMCache
+from backend.brain.llm_client import LLMClient
+
+class TestLLMCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "llm_cache.sqlite")
+        self.now = 1000.0
+        self.cache = LLMCache(self.path, ttl=60, memory_size=2, clock=lambda: self.now)
+
+    def tearDown(self):
+        self.cache.close()
+        self.tmp.cleanup()
+
+    def test_tiers_and_ttl(self):
+        self.cache.put("llama3", "sys", "Attack  the Bear", "{}")
+        self.assertEqual(self.cache.get("llama3", "sys", "attack the bear"), "{}") # Normalized prompt
+        self.assertIsNone(self.cache.get("other", "sys", "attack the bear")) # Model is part of the key
+
+        # A fresh process only has the disk tier
+        reopened = LLMCache(self.path, clock=lambda: self.now)
+        self.assertEqual(reopened.get("llama3", "sys", "attack the bear"), "{}")
+        self.assertEqual(reopened.metrics()["hits_disk"], 1)
+        reopened.close()
+
+        self.now += 61
+        self.assertIsNone(self.cache.get("llama3", "sys", "attack the bear"))
+        metrics = self.cache.metrics()
+        self.assertEqual((metrics["hits"], metrics["misses"], metrics["expired"]), (1, 2, 2))
+        self.assertEqual(metrics["disk_size"], 0)
+
+    def test_client_skips_ollama_on_hit(self):
+        client = LLMClient(cache=self.cache)
+        calls = []
+        class Ollama:
+            def chat(self, model, messages):
+                calls.append(messages)
+                return {"message": {"content": '{"action": "Attack"}'}}
+        client.client = Ollama()
+        for _ in range(3):
+            self.assertEqual(client.generate_json("attack the bear", {}, "parser"), {"action": "Attack"})
+        self.assertEqual(len(calls), 1)
+
+    def test_unparseable_json_not_cached(self):
+        client = LLMClient(cache=self.cache)
+        replies = ["Sure! Here is your JSON: {action: Attack", '{"action": "Attack"}']
+        class Ollama:
+            def chat(self, model, messages):
+                return {"message": {"content": replies.pop(0)}}
+        client.client = Ollama()
+        self.assertEqual(client.generate_json("attack the bear", {}, "parser"), {})
+        self.assertEqual(self.cache.metrics()["stores"], 0)
+        self.assertEqual(client.generate_json("attack the bear", {}, "parser"), {"action": "Attack"}) # Asked again
+        self.assertEqual(self.cache.metrics()["stores"], 1)
+
+if __name__ == '__main__':
+    unittest.main()
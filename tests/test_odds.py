@@ -0,0 +1,51 @@
+import sys
+import os
+import unittest
+
+# Add parent dir to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.engine.dice import DiceEngine
+from backend.engine.mechanics import MechanicsEngine
+from backend.engine.odds import attack_odds, odds_for_differential, RESULTS
+
+class TestAttackOdds(unittest.TestCase):
+    def test_probabilities_sum_to_one(self):
+        for diff in range(-25, 35):
+            odds = odds_for_differential(diff)
+            self.assertAlmostEqual(sum(odds.probabilities.values()), 1.0)
+
+    def test_saturation(self):
+        self.assertAlmostEqual(odds_for_differential(-40).probabilities["MISS"], 1.0)
+        self.assertAlmostEqual(odds_for_differential(40).probabilities["CRIT"], 1.0)
+        self.assertAlmostEqual(odds_for_differential(40).expected_damage, 9.0)
+
+    def test_clash_at_even_odds(self):
+        # Equal bonuses: CLASH needs identical d20s -> 20/400
+        self.assertAlmostEqual(attack_odds(12, 12).probabilities["CLASH"], 0.05)
+
+    def test_min_damage_counts_chip_on_miss(self):
+        odds, chip = attack_odds(12, 12), attack_odds(12, 12, min_damage=1)
+        no_damage = odds.probabilities["MISS"] + odds.probabilities["CLASH"]
+        self.assertEqual(chip.probabilities, odds.probabilities)
+        self.assertAlmostEqual(chip.expected_damage, odds.expected_damage + no_damage)
+        self.assertAlmostEqual(chip.expected_hp_damage, odds.expected_hp_damage + no_damage)
+        self.assertAlmostEqual(odds_for_differential(-40, min_damage=1).expected_hp_damage, 1.0)
+
+    def test_matches_resolve_attack(self):
+        engine = MechanicsEngine(dice=DiceEngine(seed=5))
+        samples = 20000
+        counts = {r: 0 for r in RESULTS}
+        total_dmg = 0
+        for _ in range(samples):
+            res = engine.resolve_attack(12, 2, 10, 1)
+            counts[res["result"]] += 1
+            total_dmg += res["damage_amount"]
+
+        odds = attack_odds(14, 11)
+        for r in RESULTS:
+            self.assertAlmostEqual(counts[r] / samples, odds.probabilities[r], delta=0.015)
+        self.assertAlmostEqual(total_dmg / samples, odds.expected_damage, delta=0.15)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import sys
+import os
+import unittest
+
+# Add parent dir to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.engine.ai_engine import AIEngine
+from backend.engine.actions import ActionResolver
+from backend.engine.grid import GridManager
+from backend.engine.mechanics import MechanicsEngine
+from backend.engine.abilities import AbilityResolver
+from backend.engine.planner import DIFFICULTY_BUDGETS, TurnPlanner
+from backend.engine.turn_manager import TurnManager, EntityState
+
+class TestTurnPlanner(unittest.TestCase):
+    def setUp(self):
+        self.grid = GridManager(radius=10)
+        self.grid.generate_empty_map()
+        self.mechanics = MechanicsEngine()
+        self.ability_resolver = AbilityResolver(self.mechanics)
+        self.tm = TurnManager()
+        self.p1 = EntityState(id="P1", name="Player", hp=20, max_hp=20, team="Player", x=0, y=0, composure=10, max_composure=10)
+        self.e1 = EntityState(id="E1", name="Enemy", hp=20, max_hp=20, team="Enemy", x=5, y=0, composure=10, max_composure=10)
+        self.tm.add_entity(self.p1)
+        self.tm.add_entity(self.e1)
+
+    def test_closes_distance_then_attacks(self):
+        planner = TurnPlanner(self.ability_resolver, budget=1.0, max_depth=5)
+        plan = planner.plan(self.e1, self.tm, self.grid)
+        self.assertEqual(plan.depth, 5)
+        self.assertEqual([a.kind for a in plan.actions], ["Move"] * 4 + ["Attack"])
+        self.assertEqual(plan.first.to, (4, 0))
+        # Planning never touches the live battle
+        self.assertEqual((self.e1.x, self.e1.ap), (5, 5))
+
+    def test_budget_degrades_to_shallower_plan(self):
+        planner = TurnPlanner(self.ability_resolver, budget=0.0, max_depth=5)
+        plan = planner.plan(self.e1, self.tm, self.grid)
+        self.assertTrue(plan.timed_out)
+        self.assertLess(plan.depth, 5)
+
+    def test_difficulty_levels(self):
+        budgets = [DIFFICULTY_BUDGETS[d] for d in ("easy", "normal", "hard", "nightmare")]
+        self.assertEqual(budgets, sorted(budgets))
+        with self.assertRaises(ValueError):
+            TurnPlanner.for_difficulty(self.ability_resolver, "impossible")
+
+    def test_ai_engine_executes_first_step(self):
+        ai = AIEngine(ActionResolver(self.grid), self.ability_resolver, self.mechanics, difficulty="hard")
+        self.e1.x = 1
+        res = ai.process_turn(self.e1, self.tm)
+        self.assertEqual(res["action"], "Attack")
+        self.assertEqual(res["target"], "P1")
+        self.assertEqual(self.e1.ap, 4)
+        self.assertLess(self.p1.hp + self.p1.composure, 30)
+
+if __name__ == '__main__':
+    unittest.main()
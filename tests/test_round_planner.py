@@ -0,0 +1,64 @@
+import sys
+import os
+import unittest
+
+# Add parent dir to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.engine.ai_engine import AIEngine
+from backend.engine.actions import ActionResolver
+from backend.engine.grid import GridManager
+from backend.engine.mechanics import MechanicsEngine
+from backend.engine.abilities import AbilityResolver
+from backend.engine.round_planner import RoundPlanner
+from backend.engine.turn_manager import TurnManager, EntityState
+
+def _entity(eid, x, y, team, hp=20):
+    return EntityState(id=eid, name=eid, hp=hp, max_hp=hp, composure=10, max_composure=10, x=x, y=y, team=team)
+
+class TestRoundPlanner(unittest.TestCase):
+    def setUp(self):
+        # Player boxed into a corner: E0 holds one side, E1 and E2 both need the other free cell
+        self.grid = GridManager(radius=2)
+        self.grid.generate_empty_map()
+        mechanics = MechanicsEngine()
+        self.ai = AIEngine(ActionResolver(self.grid), AbilityResolver(mechanics), mechanics, difficulty="normal")
+        self.tm = TurnManager()
+        self.tm.add_entity(_entity("P", -2, -2, "Player", hp=500))
+        self.tm.add_entity(_entity("E0", -2, -1, "Enemy"))
+        self.tm.add_entity(_entity("E1", 0, -2, "Enemy"))
+        self.tm.add_entity(_entity("E2", -1, 0, "Enemy"))
+        self.tm.combat_active = True
+        self.tm.turn_order = ["E0", "E1", "E2", "P"]
+        self.tm.current_index = 3
+        self.planner = RoundPlanner(self.ai, budget=5.0, max_workers=3)
+
+    def tearDown(self):
+        self.planner.shutdown()
+
+    def test_plays_every_ai_turn_and_replans_conflicts(self):
+        self.ai.tracer.enabled = True
+        current = self.tm.next_turn()
+        block = self.planner.run(current, self.tm, self.grid)
+        self.assertFalse(self.ai.tracer.active) # Every decision opened was closed, acted on or not
+        self.assertEqual(block.current.id, "P")
+        self.assertFalse(block.pending)
+        self.assertEqual(block.planned, 3)
+        self.assertEqual({a["actor_id"] for a in block.ai_actions}, {"E0", "E1", "E2"})
+        # E1 took the last free cell next to P, so E2's precomputed plan had to be redone
+        self.assertGreaterEqual(block.replans, 1)
+        cells = [(e.x, e.y) for e in self.tm.entities.values()]
+        self.assertEqual(len(cells), len(set(cells)))
+        self.assertEqual((self.tm.entities["E1"].x, self.tm.entities["E1"].y), (-1, -2))
+        self.assertLess(self.tm.entities["P"].hp + self.tm.entities["P"].composure, 510)
+
+    def test_time_budget_leaves_turns_pending(self):
+        self.planner.budget = 0.0
+        current = self.tm.next_turn()
+        block = self.planner.run(current, self.tm, self.grid)
+        self.assertTrue(block.pending)
+        self.assertEqual(block.current.id, "E0")
+        self.assertEqual(block.ai_actions, [])
+
+if __name__ == '__main__':
+    unittest.main()
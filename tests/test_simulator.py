@@ -0,0 +1,29 @@
+import sys
+import os
+import unittest
+
+# Add parent dir to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.engine.simulator import run_simulation
+
+class TestSimulator(unittest.TestCase):
+    def test_battles_complete(self):
+        report = run_simulation(battles=20, workers=1, seed=1, max_rounds=30)
+        self.assertEqual(report.battles, 20)
+        self.assertEqual(sum(report.wins.values()), 20)
+        self.assertGreater(sum(report.damage_by_ability.values()), 0)
+
+    def test_seeded_runs_repeat(self):
+        a = run_simulation(battles=10, workers=1, seed=42).to_dict()
+        b = run_simulation(battles=10, workers=1, seed=42).to_dict()
+        self.assertEqual(a["wins"], b["wins"])
+        self.assertEqual(a["damage_per_ability"], b["damage_per_ability"])
+
+    def test_throughput_floor(self):
+        # ~200 battles/s per core on a dev box; under 100 means per-decision work is back in the loop
+        report = run_simulation(battles=30, workers=1, seed=7).to_dict()
+        self.assertGreater(report["battles_per_second_per_core"], 100)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import sys
+import os
+import unittest
+
+# Add parent dir to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.engine.grid import GridManager
+from backend.engine.snapshot import MAX_CHAIN
+from backend.engine.turn_manager import EntityState, TurnManager
+
+def _entity(eid, x, y, team, init):
+    return EntityState(id=eid, name=eid, hp=10, max_hp=10, composure=10, max_composure=10,
+                       x=x, y=y, team=team, initiative=init)
+
+class TestBattleSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.grid = GridManager(radius=3)
+        self.grid.generate_empty_map()
+        self.tm = TurnManager()
+        self.tm.add_entity(_entity("P", 0, 0, "Player", 20))
+        self.tm.add_entity(_entity("E", 2, 0, "Enemy", 10))
+        self.tm.combat_active = True
+        self.base = self.tm.snapshot(self.grid)
+
+    def test_fork_shares_until_written(self):
+        child = self.base.fork()
+        self.assertEqual(child.units, {})
+        self.assertIs(child.unit("E"), self.base.unit("E"))
+
+        child.update("E", hp=4)
+        child.move("P", 1, 0)
+        child.set_terrain(1, 1, "Fire")
+        self.assertEqual(child.unit("E").hp, 4)
+        self.assertEqual(child.occupant(1, 0), "P")
+        self.assertIsNone(child.occupant(0, 0))
+        self.assertEqual(child.terrain_at(1, 1), "Fire")
+        # The parent is untouched
+        self.assertEqual(self.base.unit("E").hp, 10)
+        self.assertEqual(self.base.occupant(0, 0), "P")
+        self.assertEqual(self.base.terrain_at(1, 1), "Void")
+        self.assertIs(self.base.unit("P").stats, child.unit("P").stats)
+
+    def test_dead_units_vacate_and_commit_folds_up(self):
+        child = self.base.fork()
+        child.update("E", hp=0)
+        self.assertIsNone(child.occupant(2, 0))
+        self.assertEqual([u.id for u in child.living(exclude_team="Player")], [])
+        self.assertIs(child.commit(), self.base)
+        self.assertEqual(self.base.unit("E").hp, 0)
+
+    def test_deep_chains_flatten(self):
+        state = self.base
+        for i in range(MAX_CHAIN * 3):
+            state = state.fork()
+            state.update("E", hp=10 - i % 10)
+        self.assertLessEqual(state.depth, MAX_CHAIN)
+        self.assertEqual(state.unit("E").hp, 10 - (MAX_CHAIN * 3 - 1) % 10)
+        self.assertEqual(state.occupant(0, 0), "P")
+
+    def test_restore_undoes_live_changes(self):
+        p, e = self.tm.entities["P"], self.tm.entities["E"]
+        e.hp = 0
+        p.x = 1
+        self.tm.statuses.apply(p, "Marked", 2)
+        self.grid.cells[(0, 1)] = "Fire"
+        self.assertEqual(self.tm.check_victory_condition(), "Victory")
+
+        self.base.restore(self.tm, self.grid)
+        self.assertEqual((e.hp, p.x, p.status_effects), (10, 0, []))
+        self.assertIsNone(self.tm.statuses.get("P", "Marked"))
+        self.assertEqual(self.grid.cells[(0, 1)], "Void")
+        self.assertEqual([x.id for x in self.tm.entities_at([(0, 0)])], ["P"])
+        self.assertEqual(self.tm.check_victory_condition(), "Ongoing")
+
+if __name__ == '__main__':
+    unittest.main()
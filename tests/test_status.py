@@ -0,0 +1,57 @@
+import sys
+import os
+import unittest
+
+# Add parent dir to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.engine.rng import RNGStream
+from backend.engine.turn_manager import EntityState, TurnManager
+
+def _entity(eid, initiative):
+    return EntityState(id=eid, name=eid, hp=20, max_hp=20, composure=10, max_composure=10, initiative=initiative)
+
+class TestStatusEngine(unittest.TestCase):
+    def setUp(self):
+        self.tm = TurnManager(rng=RNGStream(seed=3))
+        self.a = _entity("A", 95)
+        self.b = _entity("B", 94)
+        self.tm.add_entity(self.a)
+        self.tm.add_entity(self.b)
+        self.tm.start_combat() # A acts first, round 1
+
+    def test_expires_after_duration(self):
+        self.tm.statuses.apply(self.b, "Stunned", 2, source_id="A")
+        self.tm.statuses.apply(self.b, "Marked", "scene")
+        self.assertEqual(self.b.status_effects, ["Stunned", "Marked"])
+
+        self.tm.next_turn() # B, round 1
+        self.tm.next_turn() # A, round 2
+        self.tm.next_turn() # B, round 2
+        self.assertIn("Stunned", self.b.status_effects)
+        self.tm.next_turn() # A, round 3
+        self.tm.next_turn() # B, round 3 -> expires
+        self.assertEqual(self.b.status_effects, ["Marked"])
+        self.assertEqual(self.tm.turn_events, [{"entity_id": "B", "status_id": "Stunned", "expired": True}])
+
+    def test_stacking_and_ticks(self):
+        self.tm.statuses.apply(self.b, "Bleeding (T2)", "scene")
+        self.tm.statuses.apply(self.b, "Bleeding (T2)", "scene")
+        self.assertEqual(self.tm.statuses.get("B", "Bleeding (T2)").stacks, 2)
+        self.assertEqual(self.b.status_effects.count("Bleeding (T2)"), 1)
+
+        self.tm.next_turn() # B's turn start: 2 stacks x 2 damage
+        self.assertEqual(self.b.hp, 16)
+        self.tm.next_turn() # A's turn: B untouched
+        self.assertEqual(self.b.hp, 16)
+
+    def test_refresh_and_remove(self):
+        self.tm.statuses.apply(self.b, "Slowed", 1)
+        self.tm.statuses.apply(self.b, "Slowed", 4)
+        self.assertEqual(self.tm.statuses.get("B", "Slowed").remaining(self.tm.round), 4)
+        self.assertTrue(self.tm.statuses.remove(self.b, "Slowed"))
+        self.assertEqual(self.b.status_effects, [])
+        self.assertEqual(self.tm.statuses.statuses("B"), [])
+
+if __name__ == '__main__':
+    unittest.main()
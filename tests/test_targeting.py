@@ -0,0 +1,70 @@
+import sys
+import os
+import unittest
+
+# Add parent dir to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.engine.dice import DiceEngine
+from backend.engine.mechanics import MechanicsEngine
+from backend.engine.abilities import Ability, AbilityResolver, DB
+from backend.engine.targeting import rasterize, shape_template
+from backend.engine.turn_manager import EntityState, TurnManager
+
+def _entity(eid, x, y, team="Enemy"):
+    return EntityState(id=eid, name=eid, hp=20, max_hp=20, composure=10, max_composure=10,
+                       team=team, x=x, y=y, known_skills=["test_fireball"])
+
+class TestShapes(unittest.TestCase):
+    def test_templates(self):
+        self.assertEqual(len(shape_template("burst", 2)), 13)
+        self.assertEqual(len(shape_template("ring", 2)), 8)
+        self.assertEqual(shape_template("line", 3, (0, -1)), frozenset({(0, -1), (0, -2), (0, -3)}))
+        self.assertEqual(len(shape_template("cone", 3, (1, 0))), 1 + 3 + 5)
+        self.assertIs(shape_template("radius", 2), shape_template("radius", 2)) # cached
+
+    def test_cone_points_at_aim(self):
+        cells = rasterize("cone", 2, (0, 0), (0, 5))
+        self.assertEqual(cells, frozenset({(0, 1), (-1, 2), (0, 2), (1, 2)}))
+
+class TestAreaResolution(unittest.TestCase):
+    def setUp(self):
+        DB.skills["test_fireball"] = Ability(
+            id="test_fireball", name="Fireball", school="Test", costs={"ap": 2, "resource": 2, "type": "focus"},
+            targeting={"type": "Ranged", "range": 6}, narrative="hurls fire",
+            effects=[{"type": "aoe_damage", "shape": "radius", "range": 1, "damage": "3"},
+                     {"type": "aoe_status", "shape": "radius", "range": 1, "status_id": "Burning", "target": "enemy"}],
+        )
+        self.tm = TurnManager()
+        self.caster = _entity("C", 0, 0, team="Player")
+        for e in (self.caster, _entity("A", 4, 0), _entity("B", 5, 0), _entity("F", 4, 1, team="Player"), _entity("Far", 7, 0)):
+            self.tm.add_entity(e)
+        self.resolver = AbilityResolver(MechanicsEngine(dice=DiceEngine(seed=1)))
+
+    def tearDown(self):
+        DB.skills.pop("test_fireball", None)
+
+    def test_spatial_index_follows_moves(self):
+        a = self.tm.entities["A"]
+        a.x = 6
+        self.assertEqual([e.id for e in self.tm.entities_at([(6, 0)])], ["A"])
+        self.assertEqual(self.tm.entities_at([(4, 0)]), [])
+
+    def test_burst_hits_everyone_inside(self):
+        result = self.resolver.resolve_area("test_fireball", self.caster, (4, 0), self.tm)
+        self.assertTrue(result["success"])
+        self.assertEqual([t["target_id"] for t in result["targets"]], ["A", "B", "F"])
+        self.assertEqual(result["total_damage"], 9)
+
+        self.resolver.apply_area_result(result, self.caster, self.tm.entities)
+        self.assertEqual(self.tm.entities["B"].hp, 17)
+        self.assertEqual(self.tm.entities["Far"].hp, 20)
+        self.assertIn("Burning", self.tm.entities["A"].status_effects)
+        self.assertNotIn("Burning", self.tm.entities["F"].status_effects) # enemy-only effect
+        self.assertEqual(self.caster.focus, 8)
+
+        out_of_range = self.resolver.resolve_area("test_fireball", self.caster, (7, 0), self.tm)
+        self.assertFalse(out_of_range["success"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import sys
+import os
+import tempfile
+import unittest
+
+# Add parent dir to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.engine import session
+from backend.engine.grid import GridManager
+from backend.engine.rng import RNGStream
+from backend.engine.turn_manager import EntityState, TurnManager
+
+def _entity(eid, initiative, team="Enemy", hp=10):
+    return EntityState(id=eid, name=eid, hp=hp, max_hp=10, composure=10, max_composure=10,
+                       initiative=initiative, team=team)
+
+class TestTurnOrder(unittest.TestCase):
+    def setUp(self):
+        self.tm = TurnManager(rng=RNGStream(seed=1))
+        for e in (_entity("P", 99, "Player"), _entity("A", 98), _entity("B", 97), _entity("C", 96)):
+            self.tm.add_entity(e)
+        self.tm.start_combat()
+
+    def _walk(self, n):
+        return [self.tm.next_turn().id for _ in range(n)]
+
+    def test_dead_actors_are_skipped(self):
+        self.tm.entities["B"].hp = 0
+        self.assertEqual(self._walk(4), ["A", "C", "P", "A"])
+        self.assertEqual(self.tm.round, 2)
+        self.tm.entities["B"].hp = 5 # Revived
+        self.assertEqual(self._walk(3), ["B", "C", "P"])
+
+    def test_reinforcements_join_at_initiative(self):
+        self.tm.next_turn() # A
+        self.tm.add_entity(_entity("R", 97, "Player"))
+        self.assertEqual(self.tm.turn_order, ["P", "A", "B", "R", "C"])
+        self.assertEqual(self.tm.get_current_actor().id, "A")
+        self.assertEqual(self._walk(4), ["B", "R", "C", "P"])
+
+    def test_victory_counters(self):
+        self.assertEqual(self.tm.living_by_team, {"Player": 1, "Enemy": 3})
+        for eid in ("A", "B"):
+            self.tm.entities[eid].hp = 0
+        self.assertEqual(self.tm.check_victory_condition(), "Ongoing")
+        self.tm.entities["C"].team = "Player"
+        self.assertEqual(self.tm.check_victory_condition(), "Victory")
+
+    def test_all_dead(self):
+        for e in self.tm.entities.values():
+            e.hp = 0
+        self.assertIsNone(self.tm.next_turn())
+
+    def test_restart_mid_combat(self):
+        self._walk(2) # B's turn
+        self.tm.entities = {}
+        self.tm.add_entity(_entity("P", 99, "Player"))
+        self.tm.add_entity(_entity("E", 50))
+        self.assertEqual(self.tm.turn_order, ["P", "E"])
+        self.assertEqual(self.tm.get_current_actor().id, "P")
+        self.assertEqual(self._walk(3), ["E", "P", "E"])
+
+    def test_reload_mid_combat(self):
+        self._walk(1) # A's turn
+        with tempfile.TemporaryDirectory() as tmp:
+            saves, session.SAVE_DIR = session.SAVE_DIR, tmp
+            try:
+                manager = session.SessionManager()
+                manager.save_game("mid", self.tm, GridManager(), [])
+                self._walk(2)
+                self.assertTrue(manager.load_game("mid", self.tm, GridManager()))
+            finally:
+                session.SAVE_DIR = saves
+        self.assertEqual(self.tm.current_index, 1)
+        self.assertEqual(self.tm.get_current_actor().id, "A")
+        self.assertEqual(self._walk(3), ["B", "C", "P"])
+
+if __name__ == '__main__':
+    unittest.main()